@@ -24,10 +24,18 @@
 
 import logging
 from logging.handlers import SysLogHandler, SYSLOG_UDP_PORT
+import atexit
+import errno
 import os
+import socket
+import struct
 import sys
 import types
 import warnings
+import threading
+import time
+import zlib
+from collections import deque
 
 from pyanaconda.flags import flags
 
@@ -46,6 +54,45 @@ PACKAGING_LOG_FILE = "/tmp/packaging.log"
 SENSITIVE_INFO_LOG_FILE = "/tmp/sensitive-info.log"
 ANACONDA_SYSLOG_FACILITY = SysLogHandler.LOG_LOCAL1
 
+# asynchronous logging (the asynclog boot option)
+LOG_WRITER_THREAD = "AnaLogWriterThread"
+# maximum number of records waiting for the log writer thread
+ASYNC_LOG_QUEUE_SIZE = 10000
+# maximum number of records written by the log writer thread in one batch
+ASYNC_LOG_BATCH_SIZE = 512
+# how long to wait for the queued records to be written on flush (in seconds)
+ASYNC_LOG_FLUSH_TIMEOUT = 5
+
+# remote logging
+LOG_SHIPPER_THREAD = "AnaLogShipperThread"
+# local system log, its new lines are shipped together with our records
+SYSTEM_LOG_FILE = "/tmp/syslog"
+# maximum number of records kept while the remote side is not reachable
+LOG_SHIPPER_SPOOL_SIZE = 20000
+# maximum number of records sent in one batch
+LOG_SHIPPER_BATCH_SIZE = 1000
+# how often are the records sent and the followed files checked (in seconds)
+LOG_SHIPPER_INTERVAL = 0.5
+# bounds of the delay between reconnection attempts (in seconds)
+LOG_SHIPPER_MIN_RETRY = 1
+LOG_SHIPPER_MAX_RETRY = 30
+DEFAULT_SYSLOG_PORT = 514
+DEFAULT_LOGSTREAM_PORT = 6080
+
+# wire formats used by the log shipper
+# "HH:MM:SS,mmm LEVEL name: message" lines, used for the virtio port
+SHIP_FORMAT_TEXT = "text"
+# syslog lines over TCP, understood by any rsyslogd
+SHIP_FORMAT_SYSLOG = "syslog"
+# batches of records in length prefixed (and zlib compressed) frames,
+# understood by analog --receive
+SHIP_FORMAT_STREAM = "stream"
+# the stream format starts with a header line ("ANACONDA-LOG <version>
+# <zlib|plain>") followed by frames of a 4 byte big endian length and the
+# data, the uncompressed data are NUL separated "<log name>\t<line>" records
+LOGSTREAM_MAGIC = "ANACONDA-LOG"
+LOGSTREAM_VERSION = 1
+
 from threading import Lock
 program_log_lock = Lock()
 
@@ -59,8 +106,13 @@ def autoSetLevel(handler, value):
 
 # all handlers of given logger with autoSetLevel == True are set to level
 def setHandlersLevel(logr, level):
+    handlers = []
+    for hdlr in logr.handlers:
+        # handlers used by the log writer thread are hidden behind
+        # the AsyncLogHandler
+        handlers.extend(getattr(hdlr, "targets", [hdlr]))
     map(lambda hdlr: hdlr.setLevel(level),
-        filter (lambda hdlr: hasattr(hdlr, "autoSetLevel") and hdlr.autoSetLevel, logr.handlers))
+        filter (lambda hdlr: hasattr(hdlr, "autoSetLevel") and hdlr.autoSetLevel, handlers))
 
 class AnacondaSyslogHandler(SysLogHandler):
     def __init__(self,
@@ -76,13 +128,581 @@ class AnacondaSyslogHandler(SysLogHandler):
         SysLogHandler.emit(self, record)
         record.msg = original_msg
 
+class LogRecordRing(object):
+    """Bounded ring of log records waiting for the log writer thread.
+
+    Putting a record to the ring never blocks. If the ring is full, DEBUG
+    records are dropped first - an incoming DEBUG record is dropped, any other
+    record replaces the oldest queued DEBUG record. Only if there are no DEBUG
+    records queued, the oldest queued record is dropped.
+    """
+
+    def __init__(self, size=ASYNC_LOG_QUEUE_SIZE):
+        self._size = size
+        self._items = deque()
+        self._debug_count = 0
+        # number of records taken from the ring but not written yet
+        self._unfinished = 0
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item, levelno):
+        """Put an item to the ring.
+
+        :param item: the item to queue
+        :param levelno: log level of the record the item carries
+        :type levelno: int
+        """
+        is_debug = levelno <= logging.DEBUG
+        with self._cond:
+            if len(self._items) >= self._size:
+                self.dropped += 1
+                if is_debug:
+                    return
+                elif self._debug_count:
+                    self._removeOldestDebug()
+                else:
+                    self._items.popleft()
+
+            self._items.append((levelno, item))
+            if is_debug:
+                self._debug_count += 1
+            self._cond.notify()
+
+    def _removeOldestDebug(self):
+        for entry in self._items:
+            if entry[0] <= logging.DEBUG:
+                self._items.remove(entry)
+                self._debug_count -= 1
+                return
+
+    def getBatch(self, max_items):
+        """Wait for items and take up to max_items of them from the ring.
+
+        :return: list of the items in the order they were put to the ring
+        :rtype: list
+        """
+        with self._cond:
+            while not self._items:
+                self._cond.wait()
+
+            batch = []
+            while self._items and len(batch) < max_items:
+                (levelno, item) = self._items.popleft()
+                if levelno <= logging.DEBUG:
+                    self._debug_count -= 1
+                batch.append(item)
+            self._unfinished += len(batch)
+            return batch
+
+    def batchDone(self, count):
+        """Mark count items taken by getBatch() as processed."""
+        with self._cond:
+            self._unfinished -= count
+            self._cond.notify_all()
+
+    def join(self, timeout=None):
+        """Wait until all the items are processed.
+
+        :return: whether all the items were processed before the timeout
+        :rtype: bool
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        with self._cond:
+            while self._items or self._unfinished:
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+            return True
+
+class LogWriter(object):
+    """Formats and writes log records queued by AsyncLogHandlers.
+
+    The records are written by a single thread in batches. Output of stream
+    and file handlers is formatted for the whole batch first and then written
+    and flushed with a single write call per handler.
+    """
+
+    def __init__(self, size=ASYNC_LOG_QUEUE_SIZE,
+                 batch_size=ASYNC_LOG_BATCH_SIZE):
+        self._ring = LogRecordRing(size)
+        self._batch_size = batch_size
+        self._reported_drops = 0
+        self._thread = threading.Thread(name=LOG_WRITER_THREAD,
+                                        target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        # atexit handlers run in reverse order, so this runs before
+        # logging.shutdown() closes the handlers
+        atexit.register(self.flush)
+
+    @property
+    def dropped(self):
+        """Number of records dropped because the queue was full."""
+        return self._ring.dropped
+
+    def enqueue(self, targets, record):
+        """Queue a record to be written by the target handlers.
+
+        The message is merged with its arguments and the exception
+        information is formatted right away, as they may not be valid
+        once the writer thread gets to the record.
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        self._ring.put((targets, record), record.levelno)
+
+    def flush(self, timeout=ASYNC_LOG_FLUSH_TIMEOUT):
+        """Wait until all the queued records are written.
+
+        :return: whether the records were written before the timeout
+        :rtype: bool
+        """
+        if threading.current_thread() is self._thread:
+            return True
+        return self._ring.join(timeout)
+
+    def _run(self):
+        while True:
+            batch = self._ring.getBatch(self._batch_size)
+            try:
+                self._write(batch)
+            finally:
+                self._ring.batchDone(len(batch))
+
+            if self._ring.dropped != self._reported_drops:
+                self._reported_drops = self._ring.dropped
+                logging.getLogger("anaconda").warning(
+                        "log queue overflow, %d records dropped so far",
+                        self._reported_drops)
+
+    def _write(self, batch):
+        # stream handler -> formatted lines, in the order of the first use
+        pending = {}
+        order = []
+        for (targets, record) in batch:
+            for hdlr in targets:
+                if record.levelno < hdlr.level:
+                    continue
+
+                if isinstance(hdlr, logging.StreamHandler):
+                    try:
+                        line = hdlr.format(record)
+                    except Exception:
+                        hdlr.handleError(record)
+                        continue
+                    if isinstance(line, unicode):
+                        line = line.encode("utf-8")
+                    if hdlr not in pending:
+                        pending[hdlr] = []
+                        order.append(hdlr)
+                    pending[hdlr].append(line)
+                else:
+                    hdlr.handle(record)
+
+        for hdlr in order:
+            data = "\n".join(pending[hdlr]) + "\n"
+            hdlr.acquire()
+            try:
+                hdlr.stream.write(data)
+                hdlr.flush()
+            except (IOError, ValueError):
+                # the stream is gone, nothing we can do about that
+                pass
+            finally:
+                hdlr.release()
+
+class AsyncLogHandler(logging.Handler):
+    """Handler passing records to the log writer thread.
+
+    It replaces all the handlers of a logger, the replaced handlers (targets)
+    are used by the log writer thread instead.
+
+    Forked processes (e.g. the package transaction) have no log writer
+    thread, records logged in them are written by the targets right away.
+    """
+
+    def __init__(self, writer):
+        logging.Handler.__init__(self, logging.NOTSET)
+        self.writer = writer
+        self.targets = []
+        self._pid = os.getpid()
+
+    def addTarget(self, hdlr):
+        self.targets.append(hdlr)
+
+    def _afterFork(self):
+        # the locks may have been held by the parent's threads when the
+        # process was forked, nobody would ever release them in the child
+        self.createLock()
+        for hdlr in self.targets:
+            hdlr.createLock()
+        self.writer = None
+        self._pid = os.getpid()
+
+    def handle(self, record):
+        if self._pid != os.getpid():
+            self._afterFork()
+        return logging.Handler.handle(self, record)
+
+    def emit(self, record):
+        if self.writer is None:
+            for hdlr in self.targets:
+                if record.levelno >= hdlr.level:
+                    hdlr.handle(record)
+            return
+
+        # don't queue records nobody would write
+        if not any(record.levelno >= hdlr.level for hdlr in self.targets):
+            return
+        try:
+            self.writer.enqueue(self.targets, record)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        if self.writer is None:
+            for hdlr in self.targets:
+                hdlr.flush()
+        else:
+            self.writer.flush()
+
+def syslogSeverity(levelno):
+    """Get the syslog severity for a log level."""
+    if levelno >= logging.CRITICAL:
+        return SysLogHandler.LOG_CRIT
+    elif levelno >= logging.ERROR:
+        return SysLogHandler.LOG_ERR
+    elif levelno >= logging.WARNING:
+        return SysLogHandler.LOG_WARNING
+    elif levelno >= logging.INFO:
+        return SysLogHandler.LOG_INFO
+    else:
+        return SysLogHandler.LOG_DEBUG
+
+class TcpLogTarget(object):
+    """A TCP endpoint the log shipper sends the records to."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._sock = None
+
+    def __str__(self):
+        return "%s:%d" % (self.host, self.port)
+
+    def open(self):
+        self._sock = socket.create_connection((self.host, self.port),
+                                              timeout=LOG_SHIPPER_MAX_RETRY)
+
+    def write(self, data):
+        self._sock.sendall(data)
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except socket.error:
+                pass
+            self._sock = None
+
+class FileLogTarget(object):
+    """A character device (e.g. a virtio port) the log shipper writes to."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def __str__(self):
+        return self.path
+
+    def open(self):
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_NOCTTY)
+
+    def write(self, data):
+        while data:
+            written = os.write(self._fd, data)
+            data = data[written:]
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+def parseLogTarget(spec, defaultPort):
+    """Parse a <host>[:<port>] specification of a remote log target.
+
+    IPv6 addresses have to be enclosed in brackets if a port is given.
+
+    :return: the target
+    :rtype: TcpLogTarget
+    :raise ValueError: if the port is not valid
+    """
+    host = spec
+    port = defaultPort
+    if spec.startswith("["):
+        (host, _sep, rest) = spec[1:].partition("]")
+        if rest.startswith(":"):
+            port = int(rest[1:])
+    elif spec.count(":") == 1:
+        (host, port) = spec.split(":")
+        port = int(port)
+    return TcpLogTarget(host, port)
+
+class LogShipper(object):
+    """Ships log records to a remote target from a background thread.
+
+    Records are kept in a bounded spool until they are written to the
+    target, so nothing is lost while the target is being (re)connected
+    unless the spool overflows, in which case the oldest records are
+    dropped. The records are sent in batches, with a single write per
+    batch.
+    """
+
+    def __init__(self, target, fmt, compress=False,
+                 spoolSize=LOG_SHIPPER_SPOOL_SIZE):
+        """
+        :param target: where to send the records
+        :type target: TcpLogTarget or FileLogTarget
+        :param fmt: wire format, one of the SHIP_FORMAT_* constants
+        :param compress: whether to compress the stream (stream format only)
+        :type compress: bool
+        """
+        self.target = target
+        self._format = fmt
+        self._compress = compress
+        self._spool = deque()
+        self._spoolSize = spoolSize
+        self._cond = threading.Condition()
+        self._connected = False
+        self._unreachable = False
+        self._retryDelay = LOG_SHIPPER_MIN_RETRY
+        self._nextAttempt = 0
+        self._compressor = None
+        # path -> [file object, log name, filter function]
+        self._followed = {}
+        self._hostname = socket.gethostname().split(".")[0] or "anaconda"
+        self.dropped = 0
+
+        self._thread = threading.Thread(name=LOG_SHIPPER_THREAD,
+                                        target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def put(self, levelno, name, created, message):
+        """Add a record to the spool, never blocks.
+
+        :param levelno: log level of the record or None if the message
+                        is an already formatted line
+        """
+        with self._cond:
+            if len(self._spool) >= self._spoolSize:
+                self._spool.popleft()
+                self.dropped += 1
+            self._spool.append((levelno, name, created, message))
+
+    def follow(self, path, name, skip=None):
+        """Ship lines appended to a file (e.g. the local system log).
+
+        :param path: path to the file, it doesn't need to exist yet
+        :param name: log name the lines are shipped under
+        :param skip: function returning True for lines that should not
+                     be shipped
+        """
+        with self._cond:
+            self._followed[path] = [None, name, skip]
+
+    def flush(self, timeout=ASYNC_LOG_FLUSH_TIMEOUT):
+        """Wait until the spooled records are sent.
+
+        Returns at once if the target is not reachable.
+
+        :return: whether the spool was emptied before the timeout
+        :rtype: bool
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._spool and not self._unreachable:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return not self._spool
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait(LOG_SHIPPER_INTERVAL)
+            self._readFollowed()
+
+            if not self._connected and time.time() >= self._nextAttempt:
+                self._connect()
+
+            while self._connected:
+                with self._cond:
+                    batch = list(self._spool)[:LOG_SHIPPER_BATCH_SIZE]
+                if not batch:
+                    break
+                if not self._send(batch):
+                    break
+                with self._cond:
+                    # the records are only removed once they are sent
+                    for _i in range(len(batch)):
+                        self._spool.popleft()
+                    self._cond.notify_all()
+
+    def _connect(self):
+        try:
+            self.target.open()
+            if self._format == SHIP_FORMAT_STREAM:
+                mode = "zlib" if self._compress else "plain"
+                self.target.write("%s %d %s\n" % (LOGSTREAM_MAGIC,
+                                                  LOGSTREAM_VERSION, mode))
+                if self._compress:
+                    self._compressor = zlib.compressobj()
+        except (socket.error, OSError, IOError) as e:
+            self.target.close()
+            with self._cond:
+                self._unreachable = True
+                self._cond.notify_all()
+            self._nextAttempt = time.time() + self._retryDelay
+            self._retryDelay = min(self._retryDelay * 2, LOG_SHIPPER_MAX_RETRY)
+            # don't log through the logging module here, the record
+            # would just be added to the spool again
+            if e.errno not in (errno.ECONNREFUSED, errno.ENOENT):
+                sys.stderr.write("log shipper: can't connect to %s: %s\n" %
+                                 (self.target, e))
+            return
+
+        with self._cond:
+            self._connected = True
+            self._unreachable = False
+        self._retryDelay = LOG_SHIPPER_MIN_RETRY
+
+    def _send(self, batch):
+        try:
+            self.target.write(self._encode(batch))
+            return True
+        except (socket.error, OSError, IOError):
+            # the whole batch is sent again after reconnecting
+            self.target.close()
+            with self._cond:
+                self._connected = False
+                self._unreachable = True
+                self._cond.notify_all()
+            self._nextAttempt = time.time() + self._retryDelay
+            return False
+
+    def _formatLine(self, levelno, name, created, message):
+        if levelno is None:
+            # lines of the followed files are already formatted
+            return message
+        return "%s,%03d %s %s: %s" % (time.strftime(DATE_FORMAT, time.localtime(created)),
+                                      (created - int(created)) * 1000,
+                                      logging.getLevelName(levelno), name, message)
+
+    def _encode(self, batch):
+        if self._format == SHIP_FORMAT_SYSLOG:
+            lines = []
+            for (levelno, name, created, message) in batch:
+                priority = ANACONDA_SYSLOG_FACILITY << 3 | syslogSeverity(levelno or logging.INFO)
+                timestamp = time.strftime("%b %d %H:%M:%S", time.localtime(created))
+                # escape new lines the same way rsyslogd does
+                lines.append("<%d>%s %s %s: %s\n" % (priority, timestamp, self._hostname,
+                                                     name, message.replace("\n", "#012")))
+            return "".join(lines)
+        elif self._format == SHIP_FORMAT_STREAM:
+            data = "\0".join("%s\t%s" % (record[1], self._formatLine(*record))
+                             for record in batch)
+            if self._compressor:
+                data = self._compressor.compress(data) + \
+                       self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            return struct.pack("!I", len(data)) + data
+        else:
+            return "".join(self._formatLine(*record) + "\n" for record in batch)
+
+    def _readFollowed(self):
+        for (path, entry) in self._followed.items():
+            (f, name, skip) = entry
+            if f is None:
+                try:
+                    f = open(path)
+                except IOError:
+                    continue
+                entry[0] = f
+
+            for line in f.readlines():
+                if not line.endswith("\n"):
+                    # incomplete line, read it again next time
+                    f.seek(-len(line), os.SEEK_CUR)
+                    break
+                line = line.rstrip("\n")
+                if skip and skip(line):
+                    continue
+                self.put(None, name, time.time(), line)
+
+class LogShipperHandler(logging.Handler):
+    """Handler adding records to the LogShipper's spool."""
+
+    def __init__(self, shipper, tag):
+        logging.Handler.__init__(self, logging.DEBUG)
+        self.shipper = shipper
+        self.tag = tag
+        self._formatter = logging.Formatter()
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            if record.exc_info and not record.exc_text:
+                record.exc_text = self._formatter.formatException(record.exc_info)
+            if record.exc_text:
+                message = message + "\n" + record.exc_text
+            if isinstance(message, unicode):
+                message = message.encode("utf-8")
+            self.shipper.put(record.levelno, self.tag, record.created, message)
+        except Exception:
+            self.handleError(record)
+
 class AnacondaLog:
-    SYSLOG_CFGFILE  = "/etc/rsyslog.conf"
     VIRTIO_PORT = "/dev/virtio-ports/org.fedoraproject.anaconda.log.0"
 
-    def __init__ (self):
+    def __init__ (self, use_writer_thread=None):
+        """
+        :param use_writer_thread: whether the records should be written by
+                                  a separate log writer thread, the asynclog
+                                  boot option is used if not specified
+        :type use_writer_thread: bool or None
+        """
         self.tty_loglevel = DEFAULT_TTY_LEVEL
         self.remote_syslog = None
+        # loggers forwarded to syslog are also sent to the log shippers
+        self._forwardedLoggers = []
+        self.shippers = []
+        if use_writer_thread is None:
+            use_writer_thread = flags.asynclog
+        self.writer = LogWriter() if use_writer_thread else None
         # Rename the loglevels so they are the same as in syslog.
         logging.addLevelName(logging.WARNING, "WARN")
         logging.addLevelName(logging.ERROR, "ERR")
@@ -173,10 +793,31 @@ class AnacondaLog:
             logfileHandler.setLevel(minLevel)
             logfileHandler.setFormatter(logging.Formatter(fmtStr, DATE_FORMAT))
             autoSetLevel(logfileHandler, autoLevel)
-            addToLogger.addHandler(logfileHandler)
+            if isinstance(dest, types.StringTypes):
+                self.addHandler(addToLogger, logfileHandler)
+            else:
+                # keep the output on stdout and stderr in sync with
+                # the rest of the output written there
+                addToLogger.addHandler(logfileHandler)
         except IOError:
             pass
 
+    def addHandler(self, logr, hdlr):
+        """Add a handler to the logger, or to the logger's AsyncLogHandler
+           if the log writer thread is used.
+        """
+        if self.writer is None:
+            logr.addHandler(hdlr)
+            return
+
+        asyncHandlers = [h for h in logr.handlers if isinstance(h, AsyncLogHandler)]
+        if asyncHandlers:
+            asyncHandler = asyncHandlers[0]
+        else:
+            asyncHandler = AsyncLogHandler(self.writer)
+            logr.addHandler(asyncHandler)
+        asyncHandler.addTarget(hdlr)
+
     def forwardToSyslog(self, logr):
         """Forward everything that goes in the logger to the syslog daemon.
         """
@@ -189,7 +830,11 @@ class AnacondaLog:
             ANACONDA_SYSLOG_FACILITY,
             logr.name)
         syslogHandler.setLevel(logging.DEBUG)
-        logr.addHandler(syslogHandler)
+        self.addHandler(logr, syslogHandler)
+
+        self._forwardedLoggers.append(logr)
+        for shipper in self.shippers:
+            self.addHandler(logr, LogShipperHandler(shipper, logr.name))
 
     # pylint: disable=W0622
     def showwarning(self, message, category, filename, lineno,
@@ -202,37 +847,84 @@ class AnacondaLog:
         self.anaconda_logger.warning("%s" % warnings.formatwarning(
                 message, category, filename, lineno, line))
 
-    def restartSyslog(self):
-        os.system("systemctl restart rsyslog.service")
+    def addShipper(self, target, fmt, compress=False):
+        """Start shipping the logs forwarded to syslog to a remote target.
 
-    def updateRemote(self, remote_syslog):
-        """Updates the location of remote rsyslogd to forward to.
+        New lines of the local system log are shipped as well, so the remote
+        side gets the same messages rsyslogd used to forward.
 
-        Requires updating rsyslogd config and restarting rsyslog
+        :param target: where to send the records
+        :type target: TcpLogTarget or FileLogTarget
+        :param fmt: wire format, one of the SHIP_FORMAT_* constants
+        :param compress: whether to compress the stream (stream format only)
+        :rtype: LogShipper
         """
-        TEMPLATE = "*.* @@%s\n"
+        shipper = LogShipper(target, fmt, compress=compress)
+        for logr in self._forwardedLoggers:
+            self.addHandler(logr, LogShipperHandler(shipper, logr.name))
+
+        # our own records are in the system log too, skip them there
+        tags = set(logr.name for logr in self._forwardedLoggers)
+        def _shippedAlready(line):
+            fields = line.split(" ", 2)
+            return len(fields) == 3 and fields[2].split(":", 1)[0] in tags
+        shipper.follow(SYSTEM_LOG_FILE, "syslog", skip=_shippedAlready)
 
+        self.shippers.append(shipper)
+        self.anaconda_logger.info("shipping logs to %s", target)
+        return shipper
+
+    def updateRemote(self, remote_syslog):
+        """Start sending the logs to a remote rsyslogd.
+
+        The records are sent as syslog messages over TCP directly from
+        anaconda, the local rsyslogd doesn't need to be reconfigured.
+
+        :param remote_syslog: <host>[:<port>] of the remote rsyslogd
+        """
         self.remote_syslog = remote_syslog
-        with open(self.SYSLOG_CFGFILE, 'a') as cfgfile:
-            forward_line = TEMPLATE % remote_syslog
-            cfgfile.write(forward_line)
-        self.restartSyslog()
+        try:
+            target = parseLogTarget(remote_syslog, DEFAULT_SYSLOG_PORT)
+        except ValueError:
+            self.anaconda_logger.error("invalid remote syslog: %s", remote_syslog)
+            return
+        self.addShipper(target, SHIP_FORMAT_SYSLOG)
 
-    def setupVirtio(self):
-        """Setup virtio rsyslog logging.
+    def updateRemoteStream(self, remote_stream):
+        """Start streaming the logs to a remote analog --receive instance.
+
+        :param remote_stream: <host>[:<port>] of the receiver
         """
-        TEMPLATE = "*.* %s;anaconda_syslog\n"
+        try:
+            target = parseLogTarget(remote_stream, DEFAULT_LOGSTREAM_PORT)
+        except ValueError:
+            self.anaconda_logger.error("invalid remote log stream: %s", remote_stream)
+            return
+        self.addShipper(target, SHIP_FORMAT_STREAM, compress=True)
 
+    def setupVirtio(self):
+        """Setup logging to the virtio port.
+        """
         if not os.path.exists(self.VIRTIO_PORT) \
            or not os.access(self.VIRTIO_PORT, os.W_OK):
             return
 
-        with open(self.SYSLOG_CFGFILE, 'a') as cfgfile:
-            cfgfile.write(TEMPLATE % (self.VIRTIO_PORT,))
-        self.restartSyslog()
+        self.addShipper(FileLogTarget(self.VIRTIO_PORT), SHIP_FORMAT_TEXT)
 
+    def flush(self):
+        """Make sure all the records logged so far are written."""
+        if self.writer is not None:
+            if not self.writer.flush():
+                self.anaconda_logger.warning("timed out waiting for the log writer")
+        for shipper in self.shippers:
+            shipper.flush()
 
 logger = None
 def init():
     global logger
     logger = AnacondaLog()
+
+def flush():
+    """Make sure all the records logged so far are written to the log files."""
+    if logger:
+        logger.flush()
@@ -86,6 +86,16 @@ NETWORK_CONNECTED_CHECK_INTERVAL = 0.1  # in seconds
 # DBus
 DEFAULT_DBUS_TIMEOUT = -1       # use default
 
+# iSCSI
+ISCSI_MAX_PARALLEL_LOGINS = 8
+ISCSI_LOGIN_TIMEOUT = 30        # in seconds, for every target
+
+# number of DASDs formatted at the same time by default
+DASDFMT_PARALLEL = 4
+
+# number of ISO images inspected at the same time
+ISO_INSPECT_PARALLEL = 4
+
 # Thread names
 THREAD_EXECUTE_STORAGE = "AnaExecuteStorageThread"
 THREAD_STORAGE = "AnaStorageThread"
@@ -107,10 +117,13 @@ THREAD_CONFIGURATION = "AnaConfigurationThread"
 THREAD_FCOE = "AnaFCOEThread"
 THREAD_ISCSI_DISCOVER = "AnaIscsiDiscoverThread"
 THREAD_ISCSI_LOGIN = "AnaIscsiLoginThread"
+THREAD_ISCSI_BASENAME = "AnaIscsiThread"
 THREAD_GEOLOCATION_REFRESH = "AnaGeolocationRefreshThread"
 THREAD_DATE_TIME = "AnaDateTimeThread"
 THREAD_TIME_INIT = "AnaTimeInitThread"
 THREAD_DASDFMT = "AnaDasdfmtThread"
+THREAD_DASDFMT_BASENAME = "AnaDasdfmtWorker"
+THREAD_ISO_INSPECT_BASENAME = "AnaIsoInspectWorker"
 THREAD_XKL_WRAPPER_INIT = "AnaXklWrapperInitThread"
 THREAD_KEYBOARD_INIT = "AnaKeyboardThread"
 THREAD_ADD_LAYOUTS_INIT = "AnaAddLayoutsInitThread"
@@ -122,6 +135,8 @@ THREAD_ADD_LAYOUTS_INIT = "AnaAddLayoutsInitThread"
 GEOLOC_PROVIDER_FEDORA_GEOIP = "provider_fedora_geoip"
 GEOLOC_PROVIDER_HOSTIP = "provider_hostip"
 GEOLOC_PROVIDER_GOOGLE_WIFI = "provider_google_wifi"
+# - local provider returning a fixed result, used for testing
+GEOLOC_PROVIDER_STUB = "provider_stub"
 # geocoding provider
 GEOLOC_GEOCODER_NOMINATIM = "geocoder_nominatim"
 # default providers
@@ -129,6 +144,23 @@ GEOLOC_DEFAULT_PROVIDER = GEOLOC_PROVIDER_FEDORA_GEOIP
 GEOLOC_DEFAULT_GEOCODER = GEOLOC_GEOCODER_NOMINATIM
 # timeout (in seconds)
 GEOLOC_TIMEOUT = 3
+# hard limit for a single lookup, the lookup is cancelled
+# once it runs for longer than this (in seconds)
+GEOLOC_LOOKUP_DEADLINE = 15
+# geolocation results are cached in a file that survives restart-anaconda
+GEOLOC_CACHE_FILE = "/tmp/geoloc_cache.json"
+# how long are the cached results valid (in seconds)
+GEOLOC_CACHE_TTL = 6 * 60 * 60
+
+# the catalog of the keyboard layouts is stored in a file that survives
+# restart-anaconda, it is rebuilt if the xkeyboard-config rules change
+XKB_LAYOUT_CACHE_FILE = "/tmp/xkb_layouts_cache.json"
+XKB_RULES_FILES = ("/usr/share/X11/xkb/rules/base.xml",
+                   "/usr/share/X11/xkb/rules/evdev.xml")
+
+# index of the classes found in the UI and addon modules, used to skip the
+# modules that don't provide the classes looked for (see ui.common.collect)
+UI_DISCOVERY_INDEX = "/tmp/anaconda-ui-index.json"
 
 
 ANACONDA_ENVIRON = "anaconda"
@@ -0,0 +1,177 @@
+#
+# eventlog.py: machine readable log of installation events
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""
+Append-only log of typed installation events.
+
+Every event is written as a single line containing a JSON object with the
+"time" (seconds since the epoch), "pid" and "type" keys and the fields of
+the given event type (see EVENT_FIELDS). The file is opened with O_APPEND
+and every event is written with a single write call, so events from the
+processes forked during the installation (e.g. the package transaction)
+don't get mixed up.
+
+Nothing is written until the log is enabled, which the anaconda script does
+when it sets up the logging, so that utilities and tests running the same
+code don't append to the installer's event log.
+
+The scripts/anaconda-events tool can be used to summarize the log.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+import logging
+log = logging.getLogger("anaconda")
+
+EVENT_LOG_FILE = "/tmp/anaconda-events.log"
+
+# event types
+EVENT_PHASE_START = "phase_start"
+EVENT_PHASE_END = "phase_end"
+EVENT_EXEC = "exec"
+EVENT_PACKAGE_INSTALLED = "package_installed"
+EVENT_DOWNLOAD = "download"
+
+# fields required for each of the event types
+EVENT_FIELDS = {
+    EVENT_PHASE_START: ("phase",),
+    EVENT_PHASE_END: ("phase", "duration"),
+    EVENT_EXEC: ("argv", "rc", "duration"),
+    EVENT_PACKAGE_INSTALLED: ("package",),
+    EVENT_DOWNLOAD: ("source", "bytes", "duration"),
+}
+
+class EventLog(object):
+    """Writes typed events to the event log file."""
+
+    def __init__(self, path=None):
+        """
+        :param path: path to the event log file, None if the events should
+                     be dropped until the log is enabled
+        :type path: str or None
+        """
+        self._path = path
+        self._fd = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._failed = False
+
+    @property
+    def path(self):
+        return self._path
+
+    def enable(self, path=EVENT_LOG_FILE):
+        """Start writing the events to the given file.
+
+        :param path: path to the event log file
+        :type path: str
+        """
+        with self._lock:
+            if self._fd is not None and self._pid == os.getpid():
+                os.close(self._fd)
+            self._path = path
+            self._fd = None
+            self._failed = False
+
+    def _open(self):
+        # open the file lazily and reopen it in forked processes, so that
+        # the events are appended to the file the parent process uses
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self._path,
+                               os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0600)
+            self._pid = os.getpid()
+        return self._fd
+
+    def emit(self, event_type, **fields):
+        """Write an event to the log.
+
+        :param event_type: one of the EVENT_* constants
+        :type event_type: str
+        :param fields: fields of the event, see EVENT_FIELDS
+        :raise ValueError: if the event type is not known or a required
+                           field is missing
+        """
+        if event_type not in EVENT_FIELDS:
+            raise ValueError("Unknown event type: %s" % event_type)
+
+        missing = [f for f in EVENT_FIELDS[event_type] if f not in fields]
+        if missing:
+            raise ValueError("Missing fields for %s event: %s" %
+                             (event_type, ", ".join(missing)))
+
+        event = {"time": time.time(), "pid": os.getpid(), "type": event_type}
+        event.update(fields)
+        try:
+            line = json.dumps(event) + "\n"
+        except UnicodeDecodeError:
+            # e.g. command arguments that are not valid UTF-8
+            line = json.dumps(event, encoding="latin-1") + "\n"
+
+        with self._lock:
+            if self._path is None or self._failed:
+                return
+            try:
+                os.write(self._open(), line)
+            except (IOError, OSError) as e:
+                # don't let the event log break the installation
+                log.error("Failed to write to the event log %s: %s",
+                          self._path, e)
+                self._failed = True
+
+    @contextmanager
+    def phase(self, name, **fields):
+        """Surround a block of code with phase start and end events.
+
+        :param name: identifier of the phase, not translated
+        :type name: str
+        :param fields: additional fields of the start event (e.g. a message)
+        """
+        self.emit(EVENT_PHASE_START, phase=name, **fields)
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self.emit(EVENT_PHASE_END, phase=name,
+                      duration=time.time() - start_time)
+
+eventLog = EventLog()
+
+def read_events(path=EVENT_LOG_FILE):
+    """Read the events from an event log file.
+
+    Lines that can't be parsed (e.g. a line truncated by a crash) are
+    skipped.
+
+    :param path: path to the event log file
+    :type path: str
+    :return: generator of event dictionaries
+    """
+    with open(path) as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(event, dict) and "type" in event:
+                yield event
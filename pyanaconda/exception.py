@@ -24,7 +24,7 @@
 from meh import Config
 from meh.handler import ExceptionHandler
 from meh.dump import ReverseExceptionDump
-from pyanaconda import isys, iutil, kickstart
+from pyanaconda import isys, iutil, kickstart, anaconda_log
 import sys
 import os
 import shutil
@@ -84,6 +84,8 @@ class AnacondaExceptionHandler(ExceptionHandler):
         log.debug("running handleException")
         exception_lines = traceback.format_exception(*dump_info.exc_info)
         log.debug("\n".join(exception_lines))
+        # make sure the logs attached to the report are complete
+        anaconda_log.flush()
 
         ty = dump_info.exc_info.type
         value = dump_info.exc_info.value
@@ -217,7 +219,8 @@ class AnacondaExceptionHandler(ExceptionHandler):
 def initExceptionHandling(anaconda):
     fileList = [ "/tmp/anaconda.log", "/tmp/packaging.log",
                  "/tmp/program.log", "/tmp/storage.log", "/tmp/ifcfg.log",
-                 "/tmp/yum.log", ROOT_PATH + "/root/install.log",
+                 "/tmp/yum.log", "/tmp/anaconda-events.log",
+                 ROOT_PATH + "/root/install.log",
                  "/proc/cmdline" ]
 
     if os.path.exists("/tmp/syslog"):
@@ -20,7 +20,7 @@
 import selinux
 import shlex
 import glob
-from pyanaconda.constants import SELINUX_DEFAULT
+from pyanaconda.constants import SELINUX_DEFAULT, DASDFMT_PARALLEL
 from collections import OrderedDict
 
 import logging
@@ -69,6 +69,10 @@ class Flags(object):
         self.testing = False
         self.dnf = False
         self.mpathFriendlyNames = True
+        # number of DASDs formatted at the same time
+        self.dasdfmtParallel = DASDFMT_PARALLEL
+        # write the logs from a separate thread
+        self.asynclog = False
         # ksprompt is whether or not to prompt for missing ksdata
         self.ksprompt = True
         # parse the boot commandline
@@ -80,12 +84,19 @@ class Flags(object):
 
     def read_cmdline(self):
         for f in ("selinux", "debug", "leavebootorder", "testing", "extlinux",
-                  "gpt", "dnf"):
+                  "gpt", "dnf", "asynclog"):
             self.set_cmdline_bool(f)
 
         if "rpmarch" in self.cmdline:
             self.targetarch = self.cmdline.get("rpmarch")
 
+        if "dasdfmt.parallel" in self.cmdline:
+            try:
+                self.dasdfmtParallel = max(1, int(self.cmdline.get("dasdfmt.parallel")))
+            except (TypeError, ValueError):
+                log.error("Invalid value of dasdfmt.parallel: %s",
+                          self.cmdline.get("dasdfmt.parallel"))
+
         if not selinux.is_selinux_enabled():
             self.selinux = 0
 
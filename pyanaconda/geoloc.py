@@ -31,6 +31,20 @@ After the look-up thread finishes, the results are stored in the singleton
 and can be retrieved using the get_territory_code() and get_result() methods.
 If you call these methods without calling refresh() first or if the look-up
 is currently in progress, both return None.
+A look-up in progress can be cancelled by calling cancel(), the look-up is
+also cancelled automatically once it runs for longer than
+GEOLOC_LOOKUP_DEADLINE seconds. Results of a cancelled look-up are discarded
+and threads waiting for the look-up are unblocked at once.
+
+Geolocation result cache
+
+Successful look-up results are stored in an on-disk cache
+(GEOLOC_CACHE_FILE) that survives restarts of the installer
+(restart-anaconda). The results of IP based backends are keyed by the local
+IP addresses of the machine (which determine the public IP address the
+backend sees), the results of the WiFi backend are keyed by the set of
+nearby access point BSSIDs. Cached results expire after GEOLOC_CACHE_TTL
+seconds.
 
 Geolocation backends
 
@@ -39,6 +53,9 @@ This module currently supports three geolocation backends:
 * Hostip GeoIP
 * Google WiFi
 
+There is also a local stub backend that returns a fixed result without
+any network access, it is meant to be used for testing.
+
 Fedora GeoIP backend
 This is the default backend. It queries the Fedora GeoIP API for location
 data based on current public IP address. The reply is JSON formated and
@@ -104,6 +121,7 @@ import urllib
 import urllib2
 import json
 import dbus
+import os
 import threading
 import time
 from pyanaconda import network
@@ -212,6 +230,16 @@ def get_result(wait=False):
         return None
 
 
+def cancel():
+    """Cancel the geolocation lookup in progress (if any)
+
+    Threads waiting for the lookup are unblocked at once and results
+    of the cancelled lookup are discarded.
+    """
+    if location_info_instance:
+        location_info_instance.cancel()
+
+
 def get_provider_id_from_option(option_string):
     """Get a valid provider id from a string
     This function is used to parse command line
@@ -224,7 +252,8 @@ def get_provider_id_from_option(option_string):
 
     providers = {
         constants.GEOLOC_PROVIDER_FEDORA_GEOIP,
-        constants.GEOLOC_PROVIDER_HOSTIP
+        constants.GEOLOC_PROVIDER_HOSTIP,
+        constants.GEOLOC_PROVIDER_STUB
     }
     if option_string in providers:
         return option_string
@@ -233,10 +262,12 @@ def get_provider_id_from_option(option_string):
         return None
 
 
-def _get_provider(provider_id):
+def _get_provider(provider_id, cache=None):
     """Return GeoIP provider instance based on the provider id
     If the provider id is unknown, return the default provider.
 
+    :param cache: geolocation result cache the provider should use
+    :type cache: GeolocationCache or None
     :return: GeolocationBackend subclass instance
     :rtype: GeolocationBackend subclass
     """
@@ -244,13 +275,14 @@ def _get_provider(provider_id):
     providers = {
         constants.GEOLOC_PROVIDER_FEDORA_GEOIP: FedoraGeoIPProvider,
         constants.GEOLOC_PROVIDER_HOSTIP: HostipGeoIPProvider,
-        constants.GEOLOC_PROVIDER_GOOGLE_WIFI: GoogleWiFiLocationProvider
+        constants.GEOLOC_PROVIDER_GOOGLE_WIFI: GoogleWiFiLocationProvider,
+        constants.GEOLOC_PROVIDER_STUB: StubGeolocationProvider
     }
     # if unknown provider id is specified,
     # use the Fedora GeoIP provider
     default_provider = FedoraGeoIPProvider
     provider = providers.get(provider_id, default_provider)
-    return provider()
+    return provider(cache=cache)
 
 
 def _get_location_info_instance(wait=False):
@@ -304,6 +336,104 @@ class GeolocationError(Exception):
     pass
 
 
+class GeolocationCancelled(GeolocationError):
+    """Raised when a lookup is cancelled while in progress"""
+    pass
+
+
+class GeolocationCache(object):
+    """On-disk cache of geolocation results
+
+    The cache is a JSON file mapping cache keys to a timestamp and
+    a serialized LocationResult. It is stored in /tmp so that it
+    survives restarts of the installer.
+    """
+
+    def __init__(self, cache_file=constants.GEOLOC_CACHE_FILE,
+                 ttl=constants.GEOLOC_CACHE_TTL):
+        """
+        :param cache_file: path to the cache file
+        :type cache_file: string
+        :param ttl: for how long the results are valid (in seconds)
+        :type ttl: int or float
+        """
+        self._cache_file = cache_file
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self._cache_file) as f:
+                entries = json.load(f)
+        except (IOError, ValueError) as e:
+            if os.path.exists(self._cache_file):
+                log.debug("Geoloc: unable to read the result cache: %s", e)
+            return {}
+
+        if not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def _save(self, entries):
+        # write the new content to a temporary file first and rename it
+        # so that a restarted installer never sees a partially written file
+        tmp_file = self._cache_file + ".tmp"
+        try:
+            with open(tmp_file, "w") as f:
+                json.dump(entries, f)
+            os.rename(tmp_file, self._cache_file)
+        except (IOError, OSError) as e:
+            log.debug("Geoloc: unable to write the result cache: %s", e)
+
+    def get(self, key):
+        """Get a cached result
+
+        :param key: cache key
+        :type key: string
+        :return: the cached result or None if there is no valid result
+        :rtype: LocationResult or None
+        """
+        with self._lock:
+            entry = self._load().get(key)
+
+        if not entry:
+            return None
+
+        try:
+            age = time.time() - entry["timestamp"]
+            if age < 0 or age > self._ttl:
+                return None
+            return LocationResult.from_dict(entry["result"])
+        except (KeyError, TypeError) as e:
+            log.debug("Geoloc: ignoring broken cache entry %s: %s", key, e)
+            return None
+
+    def put(self, key, result):
+        """Store a result in the cache
+
+        Expired entries are dropped while the cache is rewritten.
+
+        :param key: cache key
+        :type key: string
+        :param result: the result to store
+        :type result: LocationResult
+        """
+        now = time.time()
+        with self._lock:
+            entries = self._load()
+            entries = dict((k, v) for (k, v) in entries.items()
+                           if isinstance(v, dict) and
+                           0 <= now - v.get("timestamp", -1) <= self._ttl)
+            entries[key] = {"timestamp": now, "result": result.to_dict()}
+            self._save(entries)
+
+    def clear(self):
+        """Drop all the cached results"""
+        with self._lock:
+            if os.path.exists(self._cache_file):
+                os.unlink(self._cache_file)
+
+
 class LocationInfo(object):
     """Determines current location based on IP address or
     nearby WiFi access points (depending on what backend is used)
@@ -311,14 +441,17 @@ class LocationInfo(object):
 
     def __init__(self,
                  provider_id=constants.GEOLOC_DEFAULT_PROVIDER,
-                 refresh_now=False):
+                 refresh_now=False, use_cache=True):
         """
         :param provider_id: GeoIP provider id specified by module constant
         :param refresh_now: if a GeoIP information refresh should be done
         once the class is initialized
         :type refresh_now: bool
+        :param use_cache: if the on-disk result cache should be used
+        :type use_cache: bool
         """
-        self._provider = _get_provider(provider_id)
+        cache = GeolocationCache() if use_cache else None
+        self._provider = _get_provider(provider_id, cache=cache)
         if refresh_now:
             self.refresh()
 
@@ -333,7 +466,8 @@ class LocationInfo(object):
         if threadMgr.get(constants.THREAD_GEOLOCATION_REFRESH):
             log.debug("Geoloc: refresh already in progress")
         else:  # wait for Internet connectivity
-            if network.wait_for_connectivity():
+            if not self._provider.NEEDS_CONNECTIVITY or \
+                    network.wait_for_connectivity():
                 threadMgr.add(AnacondaThread(
                     name=constants.THREAD_GEOLOCATION_REFRESH,
                     target=self._provider.refresh))
@@ -341,6 +475,11 @@ class LocationInfo(object):
                 log.error("Geolocation refresh failed"
                           " - no connectivity")
 
+    def cancel(self):
+        """Cancel the location info refresh in progress (if any)"""
+        if self._provider is not None:
+            self._provider.cancel()
+
     def get_result(self):
         """Get result from the provider
 
@@ -440,12 +579,58 @@ class LocationResult(object):
         else:
             return "Position unknown"
 
+    def to_dict(self):
+        """Serialize the result to a dictionary
+
+        :return: a JSON serializable dictionary
+        :rtype: dict
+        """
+        return {"territory_code": self._territory_code,
+                "timezone": self._timezone,
+                "timezone_source": self._timezone_source,
+                "public_ip_address": self._public_ip_address,
+                "city": self._city}
+
+    @classmethod
+    def from_dict(cls, result_dict):
+        """Create a result from a dictionary created by to_dict()
+
+        :param result_dict: a serialized result
+        :type result_dict: dict
+        :rtype: LocationResult
+        """
+        def _str(value):
+            # JSON strings are loaded as Unicode, but plain strings
+            # are expected by the rest of Anaconda
+            if isinstance(value, unicode):
+                return value.encode("utf8")
+            return value
+
+        return cls(territory_code=_str(result_dict.get("territory_code")),
+                   timezone=_str(result_dict.get("timezone")),
+                   timezone_source=_str(result_dict.get("timezone_source",
+                                                        "unknown")),
+                   public_ip_address=_str(result_dict.get("public_ip_address")),
+                   city=_str(result_dict.get("city")))
+
 
 class GeolocationBackend(object):
     """Base class for GeoIP backends."""
-    def __init__(self):
+
+    # if the backend needs working Internet connectivity
+    NEEDS_CONNECTIVITY = True
+
+    def __init__(self, cache=None):
+        """
+        :param cache: geolocation result cache or None if no cache
+                      should be used
+        :type cache: GeolocationCache or None
+        """
         self._result = None
         self._result_lock = threading.Lock()
+        self._cache = cache
+        self._cancelled = threading.Event()
+        self._deadline = None
 
     def get_name(self):
         """Get name of the backend
@@ -466,17 +651,28 @@ class GeolocationBackend(object):
             log.info("Starting geolocation lookup")
             log.info("Geolocation provider: %s", self.get_name())
             global refresh_in_progress
+            self._cancelled.clear()
             with refresh_condition:
                 refresh_in_progress = True
 
             start_time = time.time()
-            self._refresh()
+            self._deadline = start_time + constants.GEOLOC_LOOKUP_DEADLINE
+            # make sure a stalled lookup doesn't block anyone waiting for it
+            watchdog = threading.Timer(constants.GEOLOC_LOOKUP_DEADLINE,
+                                       self._deadline_reached)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                self._cached_refresh()
+            except GeolocationCancelled:
+                log.info("Geolocation lookup cancelled")
+            finally:
+                watchdog.cancel()
+                self._deadline = None
             log.info("Geolocation lookup finished in %1.1f seconds",
                      time.time() - start_time)
 
-            with refresh_condition:
-                refresh_in_progress = False
-                refresh_condition.notify_all()
+            self._lookup_done()
             # check if there were any results
             result = self.get_result()
             if result:
@@ -485,15 +681,107 @@ class GeolocationBackend(object):
             else:
                 log.info("no results from geolocation")
 
+    def _cached_refresh(self):
+        """Use a cached result if available, do the lookup otherwise"""
+        cache_key = None
+        if self._cache is not None:
+            cache_key = self._get_cache_key()
+        if cache_key is not None:
+            result = self._cache.get(cache_key)
+            if result:
+                log.info("Geoloc: using cached result")
+                self._set_result(result)
+                return
+
+        self._refresh()
+
+        result = self.get_result()
+        if cache_key is not None and result and not self.cancelled:
+            self._cache.put(cache_key, result)
+
     def _refresh(self):
         pass
 
+    def _get_cache_key(self):
+        """Get a key identifying the current location for the result cache
+
+        By default the local IP addresses are used, as they determine the
+        public IP address the GeoIP backends use for the lookup.
+
+        :return: cache key or None if the result should not be cached
+        :rtype: string or None
+        """
+        try:
+            addresses = network.getIPs()
+        except dbus.DBusException as e:
+            log.debug("Geoloc: can't get IP addresses for the cache key: %s", e)
+            return None
+        if not addresses:
+            return None
+        return "%s:ip:%s" % (self.get_name(), ",".join(sorted(addresses)))
+
+    def _deadline_reached(self):
+        log.info("Geoloc: lookup took longer than %d seconds, cancelling",
+                 constants.GEOLOC_LOOKUP_DEADLINE)
+        self.cancel()
+
+    def _lookup_done(self):
+        """Mark the lookup as finished and wake up anyone waiting for it"""
+        global refresh_in_progress
+        with refresh_condition:
+            refresh_in_progress = False
+            refresh_condition.notify_all()
+
+    def cancel(self):
+        """Cancel the lookup in progress
+
+        The lookup thread stops at the next check of the cancellation flag
+        (at the latest once its current network request times out) and
+        its results are discarded. Threads waiting for the lookup are
+        unblocked at once.
+        """
+        if refresh_in_progress:
+            self._cancelled.set()
+            self._lookup_done()
+
+    @property
+    def cancelled(self):
+        """If the current lookup has been cancelled"""
+        return self._cancelled.is_set()
+
+    def _check_cancelled(self):
+        """:raise GeolocationCancelled: if the lookup has been cancelled"""
+        if self.cancelled:
+            raise GeolocationCancelled()
+
+    def _urlopen(self, url):
+        """Open an URL with the timeout limited by the lookup deadline
+
+        :param url: the URL to open
+        :type url: string
+        :return: the reply
+        :raise GeolocationCancelled: if the lookup has been cancelled
+        """
+        self._check_cancelled()
+        timeout = constants.NETWORK_CONNECTION_TIMEOUT
+        if self._deadline is not None:
+            timeout = max(min(timeout, self._deadline - time.time()), 0.1)
+        reply = urllib2.urlopen(url, timeout=timeout)
+        self._check_cancelled()
+        return reply
+
     def _set_result(self, result):
         """Set current location
 
+        Results of a cancelled lookup are discarded.
+
         :param result: geolocation lookup result
         :type result: LocationResult
         """
+        if self.cancelled:
+            log.debug("Geoloc: discarding result of a cancelled lookup")
+            return
+
         # As the value is set from a thread but read from
         # the main thread, use a lock when accessing it
         with self._result_lock:
@@ -517,16 +805,15 @@ class FedoraGeoIPProvider(GeolocationBackend):
 
     API_URL = "https://geoip.fedoraproject.org/city"
 
-    def __init__(self):
-        GeolocationBackend.__init__(self)
+    def __init__(self, cache=None):
+        GeolocationBackend.__init__(self, cache=cache)
 
     def get_name(self):
         return "Fedora GeoIP"
 
     def _refresh(self):
         try:
-            reply = urllib2.urlopen(self.API_URL, timeout=
-                                    constants.NETWORK_CONNECTION_TIMEOUT)
+            reply = self._urlopen(self.API_URL)
             if reply:
                 json_reply = json.load(reply)
                 territory = json_reply.get("country_code", None)
@@ -562,16 +849,15 @@ class HostipGeoIPProvider(GeolocationBackend):
 
     API_URL = "http://api.hostip.info/get_json.php"
 
-    def __init__(self):
-        GeolocationBackend.__init__(self)
+    def __init__(self, cache=None):
+        GeolocationBackend.__init__(self, cache=cache)
 
     def get_name(self):
         return "Hostip.info"
 
     def _refresh(self):
         try:
-            reply = urllib2.urlopen(self.API_URL, timeout=
-                                    constants.NETWORK_CONNECTION_TIMEOUT)
+            reply = self._urlopen(self.API_URL)
             if reply:
                 reply_dict = json.load(reply)
                 territory = reply_dict.get("country_code", None)
@@ -594,21 +880,36 @@ class GoogleWiFiLocationProvider(GeolocationBackend):
     API_URL = "https://maps.googleapis.com/" \
               "maps/api/browserlocation/json?browser=firefox&sensor=true"
 
-    def __init__(self):
-        GeolocationBackend.__init__(self)
+    def __init__(self, cache=None):
+        GeolocationBackend.__init__(self, cache=cache)
+        self._access_points = None
 
     def get_name(self):
         return "Google WiFi"
 
+    def _scan(self):
+        if self._access_points is None:
+            log.info("Scanning for WiFi access points.")
+            scanner = WifiScanner(scan_now=True)
+            self._access_points = scanner.get_results()
+        return self._access_points
+
+    def _get_cache_key(self):
+        # the location is identified by the set of nearby access points
+        access_points = self._scan()
+        if not access_points:
+            return None
+        bssids = sorted(set(ap.bssid.lower() for ap in access_points))
+        return "%s:wifi:%s" % (self.get_name(), ",".join(bssids))
+
     def _refresh(self):
-        log.info("Scanning for WiFi access points.")
-        scanner = WifiScanner(scan_now=True)
-        access_points = scanner.get_results()
+        access_points = self._scan()
+        # do a new scan during the next refresh
+        self._access_points = None
         if access_points:
             try:
                 url = self._get_url(access_points)
-                reply = urllib2.urlopen(url, timeout=
-                                        constants.NETWORK_CONNECTION_TIMEOUT)
+                reply = self._urlopen(url)
                 result_dict = json.load(reply)
                 status = result_dict.get('status', 'NOT OK')
                 if status == 'OK':
@@ -616,12 +917,13 @@ class GoogleWiFiLocationProvider(GeolocationBackend):
                     lon = result_dict['location']['lng']
                     log.info("Found current location.")
                     coords = Coordinates(lat=lat, lon=lon)
-                    geocoder = Geocoder()
+                    geocoder = Geocoder(urlopen=self._urlopen)
                     geocoding_result = geocoder.reverse_geocode_coords(coords)
                     # for compatibility, return GeoIP result instead
                     # of GeocodingResult
-                    t_code = geocoding_result.territory_code
-                    self._set_result(LocationResult(territory_code=t_code))
+                    if geocoding_result:
+                        t_code = geocoding_result.territory_code
+                        self._set_result(LocationResult(territory_code=t_code))
                 else:
                     log.info("Service couldn't find current location.")
             except urllib2.URLError as e:
@@ -654,6 +956,41 @@ class GoogleWiFiLocationProvider(GeolocationBackend):
                                                quoted_ssid, access_point.rssi)
 
 
+class StubGeolocationProvider(GeolocationBackend):
+    """A local stub provider returning a fixed result
+
+    Meant for testing - it doesn't do any network queries. The returned
+    result and a delay simulating a slow provider can be changed by setting
+    the class attributes.
+    """
+
+    NEEDS_CONNECTIVITY = False
+
+    TERRITORY_CODE = "CZ"
+    TIMEZONE = "Europe/Prague"
+    # how long should the lookup take (in seconds)
+    DELAY = 0
+
+    def __init__(self, cache=None):
+        GeolocationBackend.__init__(self, cache=cache)
+
+    def get_name(self):
+        return "Stub"
+
+    def _get_cache_key(self):
+        return "%s:%s:%s" % (self.get_name(), self.TERRITORY_CODE,
+                             self.TIMEZONE)
+
+    def _refresh(self):
+        if self.DELAY:
+            # waiting on the event makes the delay cancellable
+            self._cancelled.wait(self.DELAY)
+        self._check_cancelled()
+        self._set_result(LocationResult(territory_code=self.TERRITORY_CODE,
+                                        timezone=self.TIMEZONE,
+                                        timezone_source="stub"))
+
+
 class Geocoder(object):
     """Provides online geocoding services
     (only reverse geocoding at the moment).
@@ -665,9 +1002,15 @@ class Geocoder(object):
     # Alternative OSM hosted Nominatim instance (with rate limiting):
     # http://nominatim.openstreetmap.org/reverse?format=json
 
-    def __init__(self, geocoder=constants.GEOLOC_DEFAULT_GEOCODER):
-        """:param geocoder: a constant selecting what geocoder to use"""
+    def __init__(self, geocoder=constants.GEOLOC_DEFAULT_GEOCODER,
+                 urlopen=None):
+        """
+        :param geocoder: a constant selecting what geocoder to use
+        :param urlopen: function used to open URLs, can be used to make
+                        the lookup cancellable (see GeolocationBackend)
+        """
         self._geocoder = geocoder
+        self._urlopen = urlopen
 
     def reverse_geocode_coords(self, coordinates):
         """Turn geographic coordinates to address
@@ -697,8 +1040,11 @@ class Geocoder(object):
             coordinates.latitude,
             coordinates.longitude)
         try:
-            reply = urllib2.urlopen(url, timeout=
-                                    constants.NETWORK_CONNECTION_TIMEOUT)
+            if self._urlopen:
+                reply = self._urlopen(url)
+            else:
+                reply = urllib2.urlopen(url, timeout=
+                                        constants.NETWORK_CONNECTION_TIMEOUT)
             if reply:
                 reply_dict = json.load(reply)
                 territory_code = reply_dict['address']['country_code'].upper()
@@ -20,6 +20,7 @@
 from pyanaconda import isys
 import os, os.path, stat, tempfile
 from pyanaconda.constants import ISO_DIR
+from pyanaconda.isoinspect import IsoInfo, inspect_isos
 
 from pyanaconda.errors import errorHandler, ERROR_RAISE, InvalidImageSizeError, MediaMountError, MediaUnmountError, MissingImageError
 
@@ -32,11 +33,40 @@ log = logging.getLogger("anaconda")
 
 _arch = blivet.arch.getArch()
 
+def _inspectMountedIsoImage(what):
+    """
+    Mount the iso image and read its .discinfo and check for repodata
+
+    This is the fallback for images the isoinspect module can't read.
+
+    Returns IsoInfo or None if the image can't be mounted
+    """
+    log.debug("mounting %s on /mnt/install/cdimage", what)
+    try:
+        blivet.util.mount(what, "/mnt/install/cdimage", fstype="iso9660", options="ro")
+    except OSError:
+        return None
+
+    try:
+        discinfo = None
+        if os.access("/mnt/install/cdimage/.discinfo", os.R_OK):
+            log.debug("Reading .discinfo")
+            with open("/mnt/install/cdimage/.discinfo") as f:
+                discinfo = f.read()
+
+        return IsoInfo(discinfo=discinfo,
+                       has_repodata=os.access("/mnt/install/cdimage/repodata", os.R_OK))
+    finally:
+        blivet.util.umount("/mnt/install/cdimage")
+
 def findFirstIsoImage(path):
     """
     Find the first iso image in path
     This also supports specifying a specific .iso image
 
+    The images are inspected in parallel without mounting them, see the
+    isoinspect module.
+
     Returns the basename of the image
     """
     try:
@@ -52,41 +82,32 @@ def findFirstIsoImage(path):
     else:
         files = os.listdir(path)
 
-    for fn in files:
+    infos = inspect_isos([path + '/' + fn for fn in files])
+
+    for (fn, info) in zip(files, infos):
         what = path + '/' + fn
         log.debug("Checking %s", what)
-        if not isys.isIsoImage(what):
-            continue
+        if info is None:
+            if not isys.isIsoImage(what):
+                continue
 
-        log.debug("mounting %s on /mnt/install/cdimage", what)
-        try:
-            blivet.util.mount(what, "/mnt/install/cdimage", fstype="iso9660", options="ro")
-        except OSError:
-            continue
+            info = _inspectMountedIsoImage(what)
+            if info is None:
+                continue
 
-        if not os.access("/mnt/install/cdimage/.discinfo", os.R_OK):
-            blivet.util.umount("/mnt/install/cdimage")
+        if info.discinfo is None:
             continue
 
-        log.debug("Reading .discinfo")
-        f = open("/mnt/install/cdimage/.discinfo")
-        f.readline() # skip timestamp
-        f.readline() # skip release description
-        discArch = f.readline().strip() # read architecture
-        f.close()
-
-        log.debug("discArch = %s", discArch)
-        if discArch != arch:
+        log.debug("discArch = %s", info.arch)
+        if info.arch != arch:
             log.warning("findFirstIsoImage: architectures mismatch: %s, %s",
-                        discArch, arch)
-            blivet.util.umount("/mnt/install/cdimage")
+                        info.arch, arch)
             continue
 
         # If there's no repodata, there's no point in trying to
         # install from it.
-        if not os.access("/mnt/install/cdimage/repodata", os.R_OK):
+        if not info.has_repodata:
             log.warning("%s doesn't have repodata, skipping", what)
-            blivet.util.umount("/mnt/install/cdimage")
             continue
 
         # warn user if images appears to be wrong size
@@ -97,7 +118,6 @@ def findFirstIsoImage(path):
                 raise exn
 
         log.info("Found disc at %s", fn)
-        blivet.util.umount("/mnt/install/cdimage")
         return fn
 
     return None
@@ -191,6 +211,7 @@ def opticalInstallMedia(devicetree):
     # Search for devices identified as cdrom along with any other
     # device that has an iso9660 filesystem. This will catch USB media
     # created from ISO images.
+    devices = []
     for dev in set(devicetree.getDevicesByType("cdrom") + \
             [d for d in devicetree.devices if d.format.type == "iso9660"]):
         if not dev.controllable:
@@ -201,6 +222,19 @@ def opticalInstallMedia(devicetree):
             # no mountable media
             continue
 
+        devices.append(dev)
+
+    # read the .discinfo files from the devices without mounting them
+    infos = inspect_isos([dev.path for dev in devices])
+
+    for (dev, info) in zip(devices, infos):
+        if info is not None:
+            if info.arch != _arch:
+                continue
+
+            retval = dev
+            break
+
         mountpoint = tempfile.mkdtemp()
         try:
             try:
@@ -24,6 +24,7 @@ from pyanaconda.constants import ROOT_PATH
 from blivet import turnOnFilesystems
 from pyanaconda.bootloader import writeBootLoader
 from pyanaconda.progress import progress_report, progressQ
+from pyanaconda.eventlog import eventLog
 from pyanaconda.users import createLuserConf, getPassAlgo, Users
 from pyanaconda import flags
 from pyanaconda import timezone
@@ -62,7 +63,7 @@ def doConfiguration(storage, payload, ksdata, instClass):
 
     # Now run the execute methods of ksdata that require an installed system
     # to be present first.
-    with progress_report(_("Configuring installed system")):
+    with progress_report(_("Configuring installed system"), phase="configuration"):
         ksdata.authconfig.execute(storage, ksdata, instClass)
         ksdata.selinux.execute(storage, ksdata, instClass)
         ksdata.firstboot.execute(storage, ksdata, instClass)
@@ -75,29 +76,29 @@ def doConfiguration(storage, payload, ksdata, instClass):
         ksdata.skipx.execute(storage, ksdata, instClass)
 
     if not flags.flags.imageInstall and not flags.flags.dirInstall:
-        with progress_report(_("Writing network configuration")):
+        with progress_report(_("Writing network configuration"), phase="network-configuration"):
             ksdata.network.execute(storage, ksdata, instClass)
 
     # Creating users and groups requires some pre-configuration.
-    with progress_report(_("Creating users")):
+    with progress_report(_("Creating users"), phase="users"):
         createLuserConf(ROOT_PATH, algoname=getPassAlgo(ksdata.authconfig.authconfig))
         u = Users()
         ksdata.rootpw.execute(storage, ksdata, instClass, u)
         ksdata.group.execute(storage, ksdata, instClass, u)
         ksdata.user.execute(storage, ksdata, instClass, u)
 
-    with progress_report(_("Configuring addons")):
+    with progress_report(_("Configuring addons"), phase="addons"):
         ksdata.addons.execute(storage, ksdata, instClass, u)
         ksdata.configured_spokes.execute(storage, ksdata, instClass, u)
 
-    with progress_report(_("Generating initramfs")):
+    with progress_report(_("Generating initramfs"), phase="initramfs"):
         payload.recreateInitrds(force=True)
 
     if ksdata.realm.discovered:
-        with progress_report(_("Joining realm: %s") % ksdata.realm.discovered):
+        with progress_report(_("Joining realm: %s") % ksdata.realm.discovered, phase="realm-join"):
             ksdata.realm.execute(storage, ksdata, instClass)
 
-    with progress_report(_("Running post-installation scripts")):
+    with progress_report(_("Running post-installation scripts"), phase="post-scripts"):
         runPostScripts(ksdata.scripts)
 
     # Write the kickstart file to the installed system (or, copy the input
@@ -127,11 +128,11 @@ def doInstall(storage, payload, ksdata, instClass):
 
     # This should be the only thread running, wait for the others to finish if not.
     if threadMgr.running > 1:
-        with progress_report(_("Waiting for %s threads to finish") % (threadMgr.running-1)):
+        with progress_report(_("Waiting for %s threads to finish") % (threadMgr.running-1), phase="wait-for-threads"):
             map(log.debug, ("Thread %s is running" % n for n in threadMgr.names))
             threadMgr.wait_all()
 
-    with progress_report(_("Setting up the installation environment")):
+    with progress_report(_("Setting up the installation environment"), phase="environment-setup"):
         ksdata.firstboot.setup(storage, ksdata, instClass)
         ksdata.addons.setup(storage, ksdata, instClass)
 
@@ -140,16 +141,17 @@ def doInstall(storage, payload, ksdata, instClass):
     # Do partitioning.
     payload.preStorage()
 
-    turnOnFilesystems(storage, mountOnly=flags.flags.dirInstall)
-    if not flags.flags.livecdInstall and not flags.flags.dirInstall:
-        storage.write()
+    with eventLog.phase("storage"):
+        turnOnFilesystems(storage, mountOnly=flags.flags.dirInstall)
+        if not flags.flags.livecdInstall and not flags.flags.dirInstall:
+            storage.write()
 
     # Do packaging.
 
     # Discover information about realms to join,
     # to determine additional packages
     if ksdata.realm.join_realm:
-        with progress_report(_("Discovering realm to join")):
+        with progress_report(_("Discovering realm to join"), phase="realm-discover"):
             ksdata.realm.setup()
 
     # anaconda requires storage packages in order to make sure the target
@@ -159,18 +161,19 @@ def doInstall(storage, payload, ksdata, instClass):
 
     # don't try to install packages from the install class' ignored list
     packages = [p for p in packages if p not in instClass.ignoredPackages]
-    payload.preInstall(packages=packages, groups=payload.languageGroups())
-    payload.install()
+    with eventLog.phase("payload"):
+        payload.preInstall(packages=packages, groups=payload.languageGroups())
+        payload.install()
 
     if flags.flags.livecdInstall:
         storage.write()
 
-    with progress_report(_("Performing post-installation setup tasks")):
+    with progress_report(_("Performing post-installation setup tasks"), phase="post-installation-setup"):
         payload.postInstall()
 
     # Do bootloader.
     if not flags.flags.dirInstall:
-        with progress_report(_("Installing bootloader")):
+        with progress_report(_("Installing bootloader"), phase="bootloader"):
             writeBootLoader(storage, payload, instClass, ksdata)
 
     progressQ.send_complete()
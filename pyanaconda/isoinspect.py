@@ -0,0 +1,279 @@
+#
+# isoinspect.py: inspect ISO 9660 images without mounting them
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""
+Read the installation media metadata directly from ISO 9660 images.
+
+Only the root directory of the image is read: the contents of the
+.discinfo file and whether there is a repodata directory. File names are
+taken from the Rock Ridge NM entries or from the Joliet directory tree if
+the image has them, plain ISO 9660 names are mapped the same way the
+kernel does it (lower case, without the version and the trailing dot).
+
+Results for regular files are cached by path, modification time and size.
+"""
+
+import os
+import stat
+import struct
+import threading
+from collections import namedtuple
+
+from pyanaconda.constants import ISO_INSPECT_PARALLEL, THREAD_ISO_INSPECT_BASENAME
+from pyanaconda.threads import run_in_parallel
+
+import logging
+log = logging.getLogger("anaconda")
+
+ISO_BLOCK_SIZE = 2048
+
+# volume descriptors start at block 16, isys.isIsoImage looks up to block 100
+_FIRST_DESCRIPTOR = 16
+_LAST_DESCRIPTOR = 100
+
+_PRIMARY_DESCRIPTOR = 1
+_SUPPLEMENTARY_DESCRIPTOR = 2
+_TERMINATOR_DESCRIPTOR = 255
+
+# escape sequences of the Joliet UCS-2 levels
+_JOLIET_ESCAPES = ("%/@", "%/C", "%/E")
+
+_DIRECTORY_FLAG = 0x02
+
+# limits protecting us from reading garbage from broken images
+_MAX_DIRECTORY_SIZE = 16 * 1024 * 1024
+_MAX_DISCINFO_SIZE = 64 * 1024
+
+class IsoInspectError(Exception):
+    pass
+
+class IsoInfo(namedtuple("IsoInfo", ["discinfo", "has_repodata"])):
+    """Installation media metadata of an ISO image.
+
+       discinfo is the contents of the .discinfo file or None if there is
+       no such file, has_repodata tells if there is a repodata directory.
+    """
+
+    __slots__ = ()
+
+    def _discinfo_line(self, num):
+        if self.discinfo is None:
+            return None
+        lines = self.discinfo.splitlines()
+        if len(lines) <= num:
+            return ""
+        return lines[num].strip()
+
+    @property
+    def stamp(self):
+        """The media timestamp, the first line of .discinfo"""
+        return self._discinfo_line(0)
+
+    @property
+    def arch(self):
+        """The architecture, the third line of .discinfo"""
+        return self._discinfo_line(2)
+
+def _read_blocks(f, block, size):
+    f.seek(block * ISO_BLOCK_SIZE)
+    data = f.read(size)
+    if len(data) != size:
+        raise IsoInspectError("unexpected end of the image")
+    return data
+
+def _root_record(descriptor):
+    """Return the (extent, size) of the root directory of the volume."""
+    # the root directory record is at offset 156 of the volume descriptor
+    (extent, size) = struct.unpack_from("<I4xI", descriptor, 158)
+    return (extent, size)
+
+def _rock_ridge_name(system_use):
+    """Return the alternate name from the Rock Ridge NM entries, or None."""
+    name = None
+    offset = 0
+    while offset + 4 <= len(system_use):
+        signature = system_use[offset:offset + 2]
+        length = ord(system_use[offset + 2])
+        if length < 4:
+            break
+        if signature == "NM" and length >= 5:
+            flags = ord(system_use[offset + 4])
+            # flags 0x2 and 0x4 are the current and parent directory
+            if not flags & 0x6:
+                name = (name or "") + system_use[offset + 5:offset + length]
+        elif signature == "ST":
+            break
+        offset += length
+    return name
+
+def _plain_name(name):
+    """Map a plain ISO 9660 file name like the kernel's map=normal does."""
+    name = name.split(";", 1)[0]
+    if name.endswith("."):
+        name = name[:-1]
+    return name.lower()
+
+def _read_directory(f, extent, size, joliet):
+    """Return a dict mapping the names in the directory to
+       (extent, size, is_dir) tuples.
+    """
+    if size > _MAX_DIRECTORY_SIZE:
+        raise IsoInspectError("directory too big: %d bytes" % size)
+
+    data = _read_blocks(f, extent, size)
+    entries = {}
+    offset = 0
+    while offset < len(data):
+        length = ord(data[offset])
+        if length == 0:
+            # records don't span blocks, the rest of the block is padding
+            offset = (offset // ISO_BLOCK_SIZE + 1) * ISO_BLOCK_SIZE
+            continue
+
+        record = data[offset:offset + length]
+        offset += length
+        if len(record) < 34:
+            raise IsoInspectError("invalid directory record")
+
+        (rec_extent, rec_size) = struct.unpack_from("<I4xI", record, 2)
+        flags = ord(record[25])
+        name_len = ord(record[32])
+        raw_name = record[33:33 + name_len]
+        if raw_name in ("\0", "\1"):
+            # the current and parent directory
+            continue
+
+        if joliet:
+            name = raw_name.decode("utf-16-be", "replace").encode("utf-8")
+            name = name.split(";", 1)[0]
+        else:
+            # the system use area is padded to start at an even offset
+            name = _rock_ridge_name(record[33 + name_len + (1 - name_len % 2):])
+            if name is None:
+                name = _plain_name(raw_name)
+
+        entries[name] = (rec_extent, rec_size, bool(flags & _DIRECTORY_FLAG))
+
+    return entries
+
+def _inspect(path):
+    with open(path, "rb") as f:
+        primary = None
+        joliet = None
+        for block in range(_FIRST_DESCRIPTOR, _LAST_DESCRIPTOR):
+            f.seek(block * ISO_BLOCK_SIZE)
+            descriptor = f.read(ISO_BLOCK_SIZE)
+            if len(descriptor) != ISO_BLOCK_SIZE or descriptor[1:6] != "CD001":
+                if primary is None:
+                    # the descriptors may start later, like isIsoImage allows
+                    continue
+                break
+
+            vd_type = ord(descriptor[0])
+            if vd_type == _TERMINATOR_DESCRIPTOR:
+                break
+            elif vd_type == _PRIMARY_DESCRIPTOR and primary is None:
+                primary = _root_record(descriptor)
+            elif vd_type == _SUPPLEMENTARY_DESCRIPTOR and joliet is None and \
+                    descriptor[88:91] in _JOLIET_ESCAPES:
+                joliet = _root_record(descriptor)
+
+        if primary is None:
+            raise IsoInspectError("%s is not an ISO 9660 image" % path)
+
+        # prefer the Joliet names to the mapped plain names, the Rock Ridge
+        # names are just as good and they are already in the primary tree
+        (extent, size) = primary
+        entries = _read_directory(f, extent, size, joliet=False)
+        if joliet is not None and ".discinfo" not in entries:
+            (extent, size) = joliet
+            entries = _read_directory(f, extent, size, joliet=True)
+
+        discinfo = None
+        entry = entries.get(".discinfo")
+        if entry is not None and not entry[2]:
+            (extent, size, _is_dir) = entry
+            discinfo = _read_blocks(f, extent, min(size, _MAX_DISCINFO_SIZE))
+
+        repodata = entries.get("repodata")
+        return IsoInfo(discinfo=discinfo,
+                       has_repodata=repodata is not None and repodata[2])
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def inspect_iso(path):
+    """Read the installation media metadata from an ISO image.
+
+       :param path: path to the image file or device
+       :type path: str
+       :return: the metadata
+       :rtype: IsoInfo
+       :raise IsoInspectError: if the file is not a readable ISO 9660 image
+       :raise IOError, OSError: if the file can't be read
+    """
+    st = os.stat(path)
+    # block devices have no useful size and modification time
+    cacheable = stat.S_ISREG(st.st_mode)
+    stamp = (st.st_mtime, st.st_size)
+
+    if cacheable:
+        with _cache_lock:
+            cached = _cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+    try:
+        info = _inspect(path)
+    except (struct.error, IndexError) as e:
+        raise IsoInspectError("broken ISO 9660 image %s: %s" % (path, e))
+
+    if cacheable:
+        with _cache_lock:
+            _cache[path] = (stamp, info)
+    return info
+
+def inspect_isos(paths, limit=ISO_INSPECT_PARALLEL):
+    """Inspect multiple ISO images in parallel.
+
+       :param paths: paths to the image files or devices
+       :type paths: list of str
+       :param limit: maximum number of images inspected at the same time
+       :type limit: int
+       :return: list of IsoInfo instances in the order of the paths, None
+                for the paths that couldn't be inspected
+       :rtype: list
+    """
+    results = run_in_parallel(inspect_iso, paths, limit,
+                              prefix=THREAD_ISO_INSPECT_BASENAME)
+
+    infos = []
+    for (path, (info, exc_info)) in zip(paths, results):
+        if exc_info is not None:
+            if not issubclass(exc_info[0], (IsoInspectError, IOError, OSError)):
+                raise exc_info[0], exc_info[1], exc_info[2]
+            log.debug("can't inspect %s: %s", path, exc_info[1])
+        infos.append(info)
+    return infos
+
+def clear_cache():
+    """Forget the cached results."""
+    with _cache_lock:
+        _cache.clear()
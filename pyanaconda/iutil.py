@@ -28,6 +28,7 @@ import errno
 import subprocess
 import unicodedata
 import string
+import time
 import types
 from threading import Thread
 from Queue import Queue, Empty
@@ -35,6 +36,7 @@ from Queue import Queue, Empty
 from pyanaconda.flags import flags
 from pyanaconda.constants import DRACUT_SHUTDOWN_EJECT, ROOT_PATH, TRANSLATIONS_UPDATE_DIR, UNSUPPORTED_HW
 from pyanaconda.regexes import PROXY_URL_PARSE
+from pyanaconda.eventlog import eventLog, EVENT_EXEC
 
 import logging
 log = logging.getLogger("anaconda")
@@ -49,6 +51,12 @@ def augmentEnv():
                })
     return env
 
+# number of the programs started by _run_program and the number of the
+# program whose lines were logged last, used to tell if the output of a
+# program would follow the lines of another one in the log
+_program_log_serial = 0
+_program_log_last = 0
+
 def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_output=True, binary_output=False):
     """ Run an external program, log the output and return it to the caller
         :param argv: The command to run and argument
@@ -68,41 +76,61 @@ def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_ou
             os.chroot(root)
             os.chdir("/")
 
+    # The lock is only held while logging, so that programs run from
+    # different threads (e.g. dasdfmt on several DASDs) run at the same time.
+    # The output is logged when the program finishes, with the command
+    # repeated if another program was logged in the meantime.
+    global _program_log_serial, _program_log_last
     with program_log_lock:
         program_log.info("Running... %s", " ".join(argv))
+        _program_log_serial += 1
+        serial = _program_log_serial
+        _program_log_last = serial
 
-        env = augmentEnv()
-        for var in env_prune:
-            env.pop(var, None)
+    env = augmentEnv()
+    for var in env_prune:
+        env.pop(var, None)
 
-        try:
-            proc = subprocess.Popen(argv,
-                                    stdin=stdin,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.STDOUT,
-                                    preexec_fn=chroot, cwd=root, env=env)
-
-            output_string = proc.communicate()[0]
-            if output_string:
-                if binary_output:
-                    output_lines = [output_string]
-                else:
-                    if output_string[-1] != "\n":
-                        output_string = output_string + "\n"
-                    output_lines = output_string.splitlines(True)
-
-                for line in output_lines:
-                    if log_output:
-                        program_log.info(line.strip())
-
-                    if stdout:
-                        stdout.write(line)
+    try:
+        start_time = time.time()
+        proc = subprocess.Popen(argv,
+                                stdin=stdin,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT,
+                                preexec_fn=chroot, cwd=root, env=env)
 
-        except OSError as e:
-            program_log.error("Error running %s: %s", argv[0], e.strerror)
-            raise
+        output_string = proc.communicate()[0]
+        eventLog.emit(EVENT_EXEC, argv=argv, rc=proc.returncode,
+                      duration=time.time() - start_time)
+    except OSError as e:
+        program_log.error("Error running %s: %s", argv[0], e.strerror)
+        raise
 
-        program_log.debug("Return code: %d", proc.returncode)
+    with program_log_lock:
+        interleaved = _program_log_last != serial
+        _program_log_last = serial
+        if interleaved and output_string and log_output:
+            program_log.info("Output of %s:", " ".join(argv))
+
+        if output_string:
+            if binary_output:
+                output_lines = [output_string]
+            else:
+                if output_string[-1] != "\n":
+                    output_string = output_string + "\n"
+                output_lines = output_string.splitlines(True)
+
+            for line in output_lines:
+                if log_output:
+                    program_log.info(line.strip())
+
+                if stdout:
+                    stdout.write(line)
+
+        if interleaved:
+            program_log.debug("Return code of %s: %d", argv[0], proc.returncode)
+        else:
+            program_log.debug("Return code: %d", proc.returncode)
 
     return (proc.returncode, output_string)
 
@@ -182,6 +210,7 @@ def execReadlines(command, argv, stdin=None, root='/', env_prune=None):
     for var in env_prune:
         env.pop(var, None)
     try:
+        start_time = time.time()
         proc = subprocess.Popen(argv,
                                 stdin=stdin,
                                 stdout=subprocess.PIPE,
@@ -206,6 +235,8 @@ def execReadlines(command, argv, stdin=None, root='/', env_prune=None):
             if proc.poll() is not None:
                 break
     q.join()
+    eventLog.emit(EVENT_EXEC, argv=argv, rc=proc.returncode,
+                  duration=time.time() - start_time)
 
 
 ## Run a shell.
@@ -34,6 +34,7 @@ keymaps.
 
 import os
 import re
+import json
 import shutil
 import gettext
 import threading
@@ -45,6 +46,7 @@ from pyanaconda import flags
 from pyanaconda.safe_dbus import dbus_call_safe_sync, dbus_get_property_safe_sync
 from pyanaconda.safe_dbus import DBUS_SYSTEM_BUS_ADDR, DBusPropertyError
 from pyanaconda.constants import DEFAULT_VC_FONT, DEFAULT_KEYBOARD, THREAD_XKL_WRAPPER_INIT
+from pyanaconda.constants import XKB_LAYOUT_CACHE_FILE, XKB_RULES_FILES
 from pyanaconda.threads import threadMgr, AnacondaThread
 
 from gi.repository import Gio, GLib
@@ -65,6 +67,9 @@ LAYOUT_VARIANT_RE = re.compile(r'^\s*(\w+)\s*' # layout plus
 # namedtuple for information about a keyboard layout (its language and description)
 LayoutInfo = namedtuple("LayoutInfo", ["lang", "desc"])
 
+# version of the format of the layout catalog file, bump when it changes
+LAYOUT_CATALOG_FORMAT = 1
+
 Xkb_ = lambda x: gettext.ldgettext("xkeyboard-config", x)
 iso_ = lambda x: gettext.ldgettext("iso_639", x)
 
@@ -340,6 +345,322 @@ def activate_keyboard(keyboard):
         # write out keyboard configuration for the X session
         write_keyboard_config(keyboard, root="/", convert=False)
 
+def xkb_config_version(rules_files=XKB_RULES_FILES):
+    """
+    Get a string identifying the installed xkeyboard-config data. Sizes and
+    modification times of the rules files change with every update of the
+    data.
+
+    :param rules_files: paths of the xkeyboard-config rules files
+    :type rules_files: iterable of str
+    :return: the version string or None if there are no rules files
+    :rtype: str or None
+
+    """
+
+    stamps = []
+    for path in rules_files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stamps.append("%s:%d:%d" % (path, stat.st_size, int(stat.st_mtime)))
+
+    if not stamps:
+        return None
+
+    return "%d;%s" % (LAYOUT_CATALOG_FORMAT, ";".join(stamps))
+
+def _str(value):
+    # JSON strings are loaded as Unicode, but plain strings are expected by
+    # the rest of Anaconda (and the gettext functions)
+    if isinstance(value, unicode):
+        return value.encode("utf-8")
+    return value
+
+class LayoutCatalog(object):
+    """
+    Catalog of the keyboard layouts (with their languages and descriptions)
+    and layout switching options.
+
+    Building the catalog from the Xkl config registry takes quite a long time,
+    so it is stored to a file and loaded from it next time if the
+    xkeyboard-config data didn't change.
+
+    """
+
+    def __init__(self, layout_infos, switch_opt_infos):
+        """
+        :param layout_infos: layout-variant -> LayoutInfo
+        :type layout_infos: dict
+        :param switch_opt_infos: switching option -> its description
+        :type switch_opt_infos: dict
+
+        """
+
+        self._layout_infos = layout_infos
+        self._switch_opt_infos = switch_opt_infos
+
+        self._lock = threading.Lock()
+        # translations depend on the locale, so the descriptions and the
+        # search index are only valid for the locale they were made for
+        self._locale = None
+        self._descriptions = dict()
+        self._index = None
+        # (text, matching index entries, matching layouts) of the last search
+        self._last_search = None
+
+    @property
+    def layout_infos(self):
+        return self._layout_infos
+
+    @property
+    def switch_opt_infos(self):
+        return self._switch_opt_infos
+
+    @classmethod
+    def from_registry(cls, configreg):
+        """
+        Build the catalog from a loaded Xkl.ConfigRegistry.
+
+        :rtype: LayoutCatalog
+
+        """
+
+        layout_infos = dict()
+        switch_opt_infos = dict()
+
+        def _layout_name_desc(item, subitem):
+            if subitem:
+                return (item.get_name() + " (" + subitem.get_name() + ")",
+                        subitem.get_description())
+            else:
+                return (item.get_name(), item.get_description())
+
+        def _get_lang_variant(c_reg, item, subitem, lang):
+            name, description = _layout_name_desc(item, subitem)
+
+            #if this layout has already been added for some other language,
+            #do not add it again (would result in duplicates in our lists)
+            if name not in layout_infos:
+                layout_infos[name] = LayoutInfo(lang, description)
+
+        def _get_country_variant(c_reg, item, subitem, country):
+            name, description = _layout_name_desc(item, subitem)
+
+            # if the layout was not added with any language, add it with a country
+            if name not in layout_infos:
+                layout_infos[name] = LayoutInfo(country, description)
+
+        def _get_language_variants(c_reg, item, user_data=None):
+            lang_name, lang_desc = item.get_name(), item.get_description()
+
+            c_reg.foreach_language_variant(lang_name, _get_lang_variant, lang_desc)
+
+        def _get_country_variants(c_reg, item, user_data=None):
+            country_name, country_desc = item.get_name(), item.get_description()
+
+            c_reg.foreach_country_variant(country_name, _get_country_variant,
+                                          country_desc)
+
+        def _get_switch_option(c_reg, item, user_data=None):
+            switch_opt_infos[item.get_name()] = item.get_description()
+
+        #this might take quite a long time
+        configreg.foreach_language(_get_language_variants, None)
+        configreg.foreach_country(_get_country_variants, None)
+
+        #'grp' means that we want layout (group) switching options
+        configreg.foreach_option('grp', _get_switch_option, None)
+
+        return cls(layout_infos, switch_opt_infos)
+
+    @classmethod
+    def load(cls, path, version):
+        """
+        Load the catalog stored by the save method.
+
+        :param path: path of the catalog file
+        :type path: str
+        :param version: version of the xkeyboard-config data the catalog
+                        has to be made from (see xkb_config_version)
+        :type version: str
+        :return: the catalog or None if the file doesn't exist, is broken or
+                 was made from a different version of the data
+        :rtype: LayoutCatalog or None
+
+        """
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (IOError, ValueError) as e:
+            if os.path.exists(path):
+                log.debug("Unable to read the layout catalog: %s", e)
+            return None
+
+        try:
+            if data["version"] != version:
+                return None
+
+            layout_infos = dict((_str(name), LayoutInfo(_str(lang), _str(desc)))
+                                for (name, (lang, desc)) in data["layouts"].iteritems())
+            switch_opt_infos = dict((_str(name), _str(desc))
+                                    for (name, desc) in data["switch_options"].iteritems())
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            log.debug("Ignoring broken layout catalog: %s", e)
+            return None
+
+        return cls(layout_infos, switch_opt_infos)
+
+    def save(self, path, version):
+        """
+        Store the catalog so that it can be loaded by the load method.
+
+        :param path: path of the catalog file
+        :type path: str
+        :param version: version of the xkeyboard-config data the catalog was
+                        made from (see xkb_config_version)
+        :type version: str
+
+        """
+
+        data = {"version": version,
+                "layouts": self._layout_infos,
+                "switch_options": self._switch_opt_infos}
+
+        # write the new content to a temporary file first and rename it so
+        # that a restarted installer never sees a partially written file
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.rename(tmp_path, path)
+        except (IOError, OSError) as e:
+            log.debug("Unable to write the layout catalog: %s", e)
+
+    def _check_locale(self):
+        # needs to be called with the lock held
+        locale = os.environ.get("LANG", "")
+        if locale != self._locale:
+            self._locale = locale
+            self._descriptions = dict()
+            self._index = None
+            self._last_search = None
+
+    def layout_description(self, layout_variant, with_lang=True, xlated=True):
+        """
+        See XklWrapper.get_layout_variant_description.
+
+        :raise KeyError: if the layout-variant is not known
+
+        """
+
+        key = (layout_variant, with_lang, xlated)
+        with self._lock:
+            self._check_locale()
+            if key in self._descriptions:
+                return self._descriptions[key]
+
+        layout_info = self._layout_infos[layout_variant]
+
+        # translate language and upcase its first letter, translate the
+        # layout-variant description
+        if xlated:
+            lang = iutil.upcase_first_letter(iso_(layout_info.lang).decode("utf-8"))
+            description = Xkb_(layout_info.desc).decode("utf-8")
+        else:
+            lang = iutil.upcase_first_letter(layout_info.lang)
+            description = layout_info.desc
+
+        if with_lang and lang and not description.startswith(lang):
+            description = "%s (%s)" % (lang, description)
+
+        with self._lock:
+            self._descriptions[key] = description
+
+        return description
+
+    def switch_opt_description(self, switch_opt):
+        """
+        See XklWrapper.get_switch_opt_description.
+
+        :raise KeyError: if the switching option is not known
+
+        """
+
+        return Xkb_(self._switch_opt_infos[switch_opt])
+
+    def _search_index(self):
+        with self._lock:
+            self._check_locale()
+            if self._index is not None:
+                return self._index
+
+        index = []
+        for name in self._layout_infos:
+            eng_value = self.layout_description(name, xlated=False)
+            if not isinstance(eng_value, unicode):
+                eng_value = eng_value.decode("utf-8")
+            xlated_value = self.layout_description(name).lower()
+            index.append((name, eng_value.lower(), xlated_value,
+                          iutil.strip_accents(xlated_value).lower()))
+
+        with self._lock:
+            if self._index is None:
+                self._index = index
+            return self._index
+
+    def search(self, text):
+        """
+        Find the layouts matching the given text. A layout matches if all the
+        words from the text appear in its english or translated description
+        or all the words from the transliterated text appear in its
+        transliterated translated description (ignoring case).
+
+        Typing usually only extends the searched text, so if the text extends
+        the previously searched one, only the previous results are searched.
+
+        :param text: searched text (e.g. as typed in a search entry)
+        :type text: str or unicode
+        :return: layout-variant specifications of the matching layouts
+        :rtype: frozenset of str
+
+        """
+
+        if not isinstance(text, unicode):
+            text = text.decode("utf-8")
+        text = text.lower()
+
+        index = self._search_index()
+        with self._lock:
+            last_search = self._last_search
+
+        if last_search and last_search[0] == text:
+            return last_search[2]
+
+        if last_search and text.startswith(last_search[0]):
+            # every word of the text either is one of the previous words or
+            # contains one of them, so nothing else can match
+            candidates = last_search[1]
+        else:
+            candidates = index
+
+        words = text.split()
+        translit_words = iutil.strip_accents(text).lower().split()
+
+        entries = [entry for entry in candidates
+                   if all(word in entry[1] for word in words) or
+                      all(word in entry[2] for word in words) or
+                      all(word in entry[3] for word in translit_words)]
+        layouts = frozenset(entry[0] for entry in entries)
+
+        with self._lock:
+            if self._index is index:
+                self._last_search = (text, entries, layouts)
+
+        return layouts
+
 def background_XklWrapper_initialize():
     """
     Create the XklWrapper singleton instance in a separate thread to save time
@@ -411,62 +732,40 @@ class XklWrapper(object):
                     # really wrong
                     raise XklWrapperError("Failed to initialize layouts")
 
-        #needed also for Gkbd.KeyboardDrawingDialog
-        self.configreg = Xkl.ConfigRegistry.get_instance(self._engine)
-        self.configreg.load(False)
+        self._configreg = None
+        self._configreg_lock = threading.Lock()
+        self._catalog = self._load_catalog()
 
-        self._layout_infos = dict()
-        self._switch_opt_infos = dict()
-
-        #this might take quite a long time
-        self.configreg.foreach_language(self._get_language_variants, None)
-        self.configreg.foreach_country(self._get_country_variants, None)
-
-        #'grp' means that we want layout (group) switching options
-        self.configreg.foreach_option('grp', self._get_switch_option, None)
-
-    def _get_lang_variant(self, c_reg, item, subitem, lang):
-        if subitem:
-            name = item.get_name() + " (" + subitem.get_name() + ")"
-            description = subitem.get_description()
-        else:
-            name = item.get_name()
-            description = item.get_description()
-
-        #if this layout has already been added for some other language,
-        #do not add it again (would result in duplicates in our lists)
-        if name not in self._layout_infos:
-            self._layout_infos[name] = LayoutInfo(lang, description)
-
-    def _get_country_variant(self, c_reg, item, subitem, country):
-        if subitem:
-            name = item.get_name() + " (" + subitem.get_name() + ")"
-            description = subitem.get_description()
-        else:
-            name = item.get_name()
-            description = item.get_description()
-
-        # if the layout was not added with any language, add it with a country
-        if name not in self._layout_infos:
-            self._layout_infos[name] = LayoutInfo(country, description)
+    @property
+    def configreg(self):
+        """
+        The loaded Xkl.ConfigRegistry (needed e.g. for the
+        Gkbd.KeyboardDrawingDialog), loaded only when needed because the
+        layouts are usually listed from the layout catalog.
 
-    def _get_language_variants(self, c_reg, item, user_data=None):
-        lang_name, lang_desc = item.get_name(), item.get_description()
+        """
 
-        c_reg.foreach_language_variant(lang_name, self._get_lang_variant, lang_desc)
+        with self._configreg_lock:
+            if self._configreg is None:
+                configreg = self._xkl.ConfigRegistry.get_instance(self._engine)
+                configreg.load(False)
+                self._configreg = configreg
 
-    def _get_country_variants(self, c_reg, item, user_data=None):
-        country_name, country_desc = item.get_name(), item.get_description()
+        return self._configreg
 
-        c_reg.foreach_country_variant(country_name, self._get_country_variant,
-                                      country_desc)
+    def _load_catalog(self):
+        version = xkb_config_version()
+        if version:
+            catalog = LayoutCatalog.load(XKB_LAYOUT_CACHE_FILE, version)
+            if catalog:
+                log.debug("Loaded the layout catalog from %s", XKB_LAYOUT_CACHE_FILE)
+                return catalog
 
-    def _get_switch_option(self, c_reg, item, user_data=None):
-        """Helper function storing layout switching options in foreach cycle"""
-        desc = item.get_description()
-        name = item.get_name()
+        catalog = LayoutCatalog.from_registry(self.configreg)
+        if version:
+            catalog.save(XKB_LAYOUT_CACHE_FILE, version)
 
-        self._switch_opt_infos[name] = desc
+        return catalog
 
     def get_current_layout(self):
         """
@@ -501,12 +800,12 @@ class XklWrapper(object):
     def get_available_layouts(self):
         """A generator yielding layouts (no need to store them as a bunch)"""
 
-        return self._layout_infos.iterkeys()
+        return self._catalog.layout_infos.iterkeys()
 
     def get_switching_options(self):
         """Method returning list of available layout switching options"""
 
-        return self._switch_opt_infos.iterkeys()
+        return self._catalog.switch_opt_infos.iterkeys()
 
     def get_layout_variant_description(self, layout_variant, with_lang=True, xlated=True):
         """
@@ -524,21 +823,7 @@ class XklWrapper(object):
 
         """
 
-        layout_info = self._layout_infos[layout_variant]
-
-        # translate language and upcase its first letter, translate the
-        # layout-variant description
-        if xlated:
-            lang = iutil.upcase_first_letter(iso_(layout_info.lang).decode("utf-8"))
-            description = Xkb_(layout_info.desc).decode("utf-8")
-        else:
-            lang = iutil.upcase_first_letter(layout_info.lang)
-            description = layout_info.desc
-
-        if with_lang and lang and not description.startswith(lang):
-            return "%s (%s)" % (lang, description)
-        else:
-            return description
+        return self._catalog.layout_description(layout_variant, with_lang, xlated)
 
     def get_switch_opt_description(self, switch_opt):
         """
@@ -552,7 +837,7 @@ class XklWrapper(object):
         """
 
         # translate the description of the switching option
-        return Xkb_(self._switch_opt_infos[switch_opt])
+        return self._catalog.switch_opt_description(switch_opt)
 
     def activate_default_layout(self):
         """
@@ -566,7 +851,20 @@ class XklWrapper(object):
     def is_valid_layout(self, layout):
         """Return if given layout is valid layout or not"""
 
-        return layout in self._layout_infos
+        return layout in self._catalog.layout_infos
+
+    def search_layouts(self, text):
+        """
+        Find the layouts matching the given text (see LayoutCatalog.search).
+
+        :param text: searched text
+        :type text: str
+        :return: layout-variant specifications of the matching layouts
+        :rtype: frozenset of str
+
+        """
+
+        return self._catalog.search(text)
 
     def add_layout(self, layout):
         """
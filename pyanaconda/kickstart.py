@@ -60,6 +60,7 @@ from pyanaconda.i18n import _
 from pyanaconda.ui.common import collect
 from pyanaconda.addons import AddonSection, AddonData, AddonRegistry, collect_addon_paths
 from pyanaconda.bootloader import GRUB2, get_bootloader
+from pyanaconda.storage_utils import ISCSITarget, iscsi_add_targets
 
 from pykickstart.constants import CLEARPART_TYPE_NONE, FIRSTBOOT_SKIP, FIRSTBOOT_RECONFIG, KS_SCRIPT_POST, KS_SCRIPT_PRE, \
                                   KS_SCRIPT_TRACEBACK, SELINUX_DISABLED, SELINUX_ENFORCING, SELINUX_PERMISSIVE
@@ -645,6 +646,11 @@ class IgnoreDisk(commands.ignoredisk.RHEL6_IgnoreDisk):
         return retval
 
 class Iscsi(commands.iscsi.F17_Iscsi):
+    def __init__(self, *args, **kwargs):
+        commands.iscsi.F17_Iscsi.__init__(self, *args, **kwargs)
+        # (target data, line number) of the targets not logged into yet
+        self._pending = []
+
     def parse(self, args):
         tg = commands.iscsi.F17_Iscsi.parse(self, args)
 
@@ -660,19 +666,34 @@ class Iscsi(commands.iscsi.F17_Iscsi):
               or (mode == "default" and tg.iface)):
             raise KickstartValueError(formatErrorMsg(self.lineno, msg="iscsi --iface must be specified (binding used) either for all targets or for none"))
 
-        try:
-            blivet.iscsi.iscsi().addTarget(tg.ipaddr, tg.port, tg.user,
-                                            tg.password, tg.user_in,
-                                            tg.password_in,
-                                            target=tg.target,
-                                            iface=tg.iface)
+        # The targets are logged into in batches, see login.
+        self._pending.append((tg, self.lineno))
+
+        return tg
+
+    def login(self):
+        """Log into the targets of the iscsi commands parsed so far.
+
+           The discoveries and logins of all the targets run in parallel.
+           This has to be called before any command that may need the iSCSI
+           disks is parsed.
+        """
+        if not self._pending:
+            return
+
+        (pending, self._pending) = (self._pending, [])
+        targets = [ISCSITarget(tg.ipaddr, tg.port, tg.user, tg.password,
+                               tg.user_in, tg.password_in, tg.target, tg.iface)
+                   for (tg, _lineno) in pending]
+        errors = iscsi_add_targets(blivet.iscsi.iscsi(), targets)
+
+        for ((tg, lineno), error) in zip(pending, errors):
+            if error:
+                raise KickstartValueError(formatErrorMsg(lineno, msg=error))
+
             log.info("added iscsi target %s at %s via %s", tg.target,
                                                            tg.ipaddr,
                                                            tg.iface)
-        except (IOError, ValueError) as e:
-            raise KickstartValueError(formatErrorMsg(self.lineno, msg=str(e)))
-
-        return tg
 
 class IscsiName(commands.iscsiname.FC6_IscsiName):
     def parse(self, args):
@@ -1677,7 +1698,8 @@ class AnacondaKSHandler(superclass):
             if not os.path.isdir(path):
                 continue
 
-            classes = collect(module_name, path, lambda cls: issubclass(cls, self.AddonClassType))
+            classes = collect(module_name, path, lambda cls: issubclass(cls, self.AddonClassType),
+                              hint=lambda info: self.AddonClassType.__name__ in info["bases"])
             if classes:
                 addons[addon_id] = classes[0](name = addon_id)
 
@@ -1718,6 +1740,11 @@ class AnacondaKSParser(KickstartParser):
         if not self.handler:
             return
 
+        # Log into the iSCSI targets of the iscsi commands so far before any
+        # other command (e.g. ignoredisk) needs the disks.
+        if args and args[0] not in ("iscsi", "iscsiname"):
+            self.handler.iscsi.login()
+
         return KickstartParser.handleCommand(self, lineno, args)
 
     def setupSections(self):
@@ -1762,6 +1789,7 @@ def parseKickstart(f):
 
     try:
         ksparser.readKickstart(f)
+        handler.iscsi.login()
     except KickstartError as e:
         # We do not have an interface here yet, so we cannot use our error
         # handling callback.
@@ -26,6 +26,7 @@ import re
 import langtable
 import locale as locale_mod
 import glob
+import threading
 
 from pyanaconda import constants
 from pyanaconda.iutil import upcase_first_letter
@@ -200,6 +201,157 @@ def setup_locale(locale, lang=None):
     os.environ["LANG"] = locale
     locale_mod.setlocale(locale_mod.LC_ALL, locale)
 
+def _locale_key(locale, what="locale"):
+    """
+    Get the (language, territory, script) tuple identifying the given locale
+    in the langtable queries.
+
+    :raise InvalidLocaleSpec: if an invalid locale is given (see LANGCODE_RE)
+
+    """
+
+    parts = parse_langcode(locale)
+    if not parts or not parts["language"]:
+        raise InvalidLocaleSpec("'%s' is not a valid %s" % (locale, what))
+
+    return (parts["language"], parts.get("territory") or "",
+            parts.get("script") or "")
+
+class LocalizationCatalog(object):
+    """
+    Memoized layer over the langtable queries.
+
+    The results are computed lazily for every (language, territory, script)
+    combination when they are asked for the first time and shared then, so
+    that e.g. populating the list of languages or searching in it doesn't
+    query langtable again and again. Lists are returned as copies the caller
+    is free to modify.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (query name, query arguments) -> result
+        self._results = {}
+        # localedir -> tuple of available translations
+        self._translations = {}
+
+    def _query(self, name, args, func):
+        key = (name, args)
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+
+        # run the query without the lock, in the worst case two threads ask
+        # langtable for the same thing
+        result = func(*args)
+        if isinstance(result, list):
+            result = tuple(result)
+
+        with self._lock:
+            return self._results.setdefault(key, result)
+
+    def clear(self):
+        """Drop all the cached results."""
+
+        with self._lock:
+            self._results.clear()
+            self._translations.clear()
+
+    def language_locales(self, lang):
+        key = _locale_key(lang, "language")
+        return list(self._query("language_locales", key,
+                                lambda lang, terr, script:
+                                langtable.list_locales(languageId=lang,
+                                                       territoryId=terr,
+                                                       scriptId=script)))
+
+    def territory_locales(self, territory):
+        return list(self._query("territory_locales", (territory,),
+                                lambda terr:
+                                langtable.list_locales(territoryId=terr)))
+
+    def locale_keyboards(self, locale):
+        key = _locale_key(locale)
+        return list(self._query("locale_keyboards", key,
+                                lambda lang, terr, script:
+                                langtable.list_keyboards(languageId=lang,
+                                                         territoryId=terr,
+                                                         scriptId=script)))
+
+    def locale_timezones(self, locale):
+        key = _locale_key(locale)
+        return list(self._query("locale_timezones", key,
+                                lambda lang, terr, script:
+                                langtable.list_timezones(languageId=lang,
+                                                         territoryId=terr,
+                                                         scriptId=script)))
+
+    def english_name(self, locale):
+        key = _locale_key(locale)
+        return self._query("english_name", key,
+                           lambda lang, terr, script:
+                           upcase_first_letter(
+                               langtable.language_name(languageId=lang,
+                                                       territoryId=terr,
+                                                       scriptId=script,
+                                                       languageIdQuery="en")))
+
+    def native_name(self, locale):
+        key = _locale_key(locale)
+        return self._query("native_name", key,
+                           lambda lang, terr, script:
+                           upcase_first_letter(
+                               langtable.language_name(languageId=lang,
+                                                       territoryId=terr,
+                                                       scriptId=script,
+                                                       languageIdQuery=lang,
+                                                       territoryIdQuery=terr,
+                                                       scriptIdQuery=script)))
+
+    def xlated_timezone(self, tz_spec_part, locale):
+        key = (tz_spec_part,) + _locale_key(locale)
+        return self._query("xlated_timezone", key,
+                           lambda tz, lang, terr, script:
+                           langtable.timezone_name(tz, languageIdQuery=lang,
+                                                   territoryIdQuery=terr,
+                                                   scriptIdQuery=script).encode("utf-8"))
+
+    def available_translations(self, localedir):
+        """
+        Get the languages the installer is translated to in the given
+        localedir and that have some locales.
+
+        :rtype: tuple of strings
+
+        """
+
+        with self._lock:
+            if localedir in self._translations:
+                return self._translations[localedir]
+
+        # usually there are no message files for en
+        messagefiles = sorted(glob.glob(localedir + "/*/LC_MESSAGES/anaconda.mo") +
+                              ["blob/en/blob/blob"])
+        trans_gen = (path.split(os.path.sep)[-3] for path in messagefiles)
+
+        langs = []
+
+        for trans in trans_gen:
+            parts = parse_langcode(trans)
+            lang = parts.get("language", "")
+            if lang and lang not in langs:
+                # check if there are any locales for the language
+                if not self.language_locales(lang):
+                    continue
+
+                langs.append(lang)
+
+        with self._lock:
+            return self._translations.setdefault(localedir, tuple(langs))
+
+localizationCatalog = LocalizationCatalog()
+
 def get_english_name(locale):
     """
     Function returning english name for the given locale.
@@ -212,16 +364,7 @@ def get_english_name(locale):
 
     """
 
-    parts = parse_langcode(locale)
-    if "language" not in parts:
-        raise InvalidLocaleSpec("'%s' is not a valid locale" % locale)
-
-    name = langtable.language_name(languageId=parts["language"],
-                                   territoryId=parts.get("territory", ""),
-                                   scriptId=parts.get("script", ""),
-                                   languageIdQuery="en")
-
-    return upcase_first_letter(name)
+    return localizationCatalog.english_name(locale)
 
 def get_native_name(locale):
     """
@@ -235,18 +378,7 @@ def get_native_name(locale):
 
     """
 
-    parts = parse_langcode(locale)
-    if "language" not in parts:
-        raise InvalidLocaleSpec("'%s' is not a valid locale" % locale)
-
-    name = langtable.language_name(languageId=parts["language"],
-                                   territoryId=parts.get("territory", ""),
-                                   scriptId=parts.get("script", ""),
-                                   languageIdQuery=parts["language"],
-                                   territoryIdQuery=parts.get("territory", ""),
-                                   scriptIdQuery=parts.get("script", ""))
-
-    return upcase_first_letter(name)
+    return localizationCatalog.native_name(locale)
 
 def get_available_translations(localedir=None):
     """
@@ -261,24 +393,8 @@ def get_available_translations(localedir=None):
 
     localedir = localedir or gettext._default_localedir
 
-    # usually there are no message files for en
-    messagefiles = sorted(glob.glob(localedir + "/*/LC_MESSAGES/anaconda.mo") +
-                          ["blob/en/blob/blob"])
-    trans_gen = (path.split(os.path.sep)[-3] for path in messagefiles)
-
-    langs = set()
-
-    for trans in trans_gen:
-        parts = parse_langcode(trans)
-        lang = parts.get("language", "")
-        if lang and lang not in langs:
-            langs.add(lang)
-            # check if there are any locales for the language
-            locales = get_language_locales(lang)
-            if not locales:
-                continue
-
-            yield lang
+    for lang in localizationCatalog.available_translations(localedir):
+        yield lang
 
 def get_language_locales(lang):
     """
@@ -292,13 +408,7 @@ def get_language_locales(lang):
 
     """
 
-    parts = parse_langcode(lang)
-    if "language" not in parts:
-        raise InvalidLocaleSpec("'%s' is not a valid language" % lang)
-
-    return langtable.list_locales(languageId=parts["language"],
-                                  territoryId=parts.get("territory", ""),
-                                  scriptId=parts.get("script", ""))
+    return localizationCatalog.language_locales(lang)
 
 def get_territory_locales(territory):
     """
@@ -313,7 +423,7 @@ def get_territory_locales(territory):
 
     """
 
-    return langtable.list_locales(territoryId=territory)
+    return localizationCatalog.territory_locales(territory)
 
 def get_locale_keyboards(locale):
     """
@@ -327,13 +437,7 @@ def get_locale_keyboards(locale):
 
     """
 
-    parts = parse_langcode(locale)
-    if "language" not in parts:
-        raise InvalidLocaleSpec("'%s' is not a valid locale" % locale)
-
-    return langtable.list_keyboards(languageId=parts["language"],
-                                    territoryId=parts.get("territory", ""),
-                                    scriptId=parts.get("script", ""))
+    return localizationCatalog.locale_keyboards(locale)
 
 def get_locale_timezones(locale):
     """
@@ -347,13 +451,7 @@ def get_locale_timezones(locale):
 
     """
 
-    parts = parse_langcode(locale)
-    if "language" not in parts:
-        raise InvalidLocaleSpec("'%s' is not a valid locale" % locale)
-
-    return langtable.list_timezones(languageId=parts["language"],
-                                    territoryId=parts.get("territory", ""),
-                                    scriptId=parts.get("script", ""))
+    return localizationCatalog.locale_timezones(locale)
 
 def get_locale_territory(locale):
     """
@@ -386,15 +484,7 @@ def get_xlated_timezone(tz_spec_part):
     """
 
     locale = os.environ.get("LANG", constants.DEFAULT_LANG)
-    parts = parse_langcode(locale)
-    if "language" not in parts:
-        raise InvalidLocaleSpec("'%s' is not a valid locale" % locale)
-
-    xlated = langtable.timezone_name(tz_spec_part, languageIdQuery=parts["language"],
-                                     territoryIdQuery=parts.get("territory", ""),
-                                     scriptIdQuery=parts.get("script", ""))
-
-    return xlated.encode("utf-8")
+    return localizationCatalog.xlated_timezone(tz_spec_part, locale)
 
 def write_language_configuration(lang, root):
     """
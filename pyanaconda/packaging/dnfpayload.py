@@ -24,6 +24,7 @@ from blivet.size import Size
 from pyanaconda.flags import flags
 from pyanaconda.i18n import _
 from pyanaconda.progress import progressQ
+from pyanaconda.eventlog import eventLog, EVENT_DOWNLOAD, EVENT_PACKAGE_INSTALLED
 
 import collections
 import itertools
@@ -132,12 +133,17 @@ class PayloadRPMDisplay(dnf.callback.LoggingTransactionDisplay):
                 (package.name, package.arch, ts_current, ts_total)
             self.cnt += 1
             self._queue.put(('install', msg))
+            # this runs in the transaction process, the event log
+            # is safe to be appended to from there
+            eventLog.emit(EVENT_PACKAGE_INSTALLED,
+                          package='%s.%s' % (package.name, package.arch))
         elif action == self.TRANS_POST:
             self._queue.put(('post', None))
 
 class DownloadProgress(dnf.callback.DownloadProgress):
     def __init__(self):
         self.downloads = collections.defaultdict(int)
+        self.download_start = {}
         self.last_time = time.time()
         self.total_files = 0
         self.total_size = Size(0)
@@ -159,12 +165,17 @@ class DownloadProgress(dnf.callback.DownloadProgress):
         nevra = str(payload)
         if status is dnf.callback.STATUS_OK:
             self.downloads[nevra] = payload.download_size
+            start = self.download_start.pop(nevra, None)
+            eventLog.emit(EVENT_DOWNLOAD, source=nevra,
+                          bytes=payload.download_size,
+                          duration=time.time() - start if start else 0)
             self._update()
             return
         log.critical("Failed to download '%s': %d - %s", nevra, status, err_msg)
 
     def progress(self, payload, done):
         nevra = str(payload)
+        self.download_start.setdefault(nevra, time.time())
         self.downloads[nevra] = done
         self._update()
 
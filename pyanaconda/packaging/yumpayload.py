@@ -80,6 +80,7 @@ from pyanaconda.packaging import DependencyError, MetadataError, NoNetworkError,
                                  NoSuchPackage, PackagePayload, PayloadError, PayloadInstallError, \
                                  PayloadSetupError
 from pyanaconda.progress import progressQ
+from pyanaconda.eventlog import eventLog, EVENT_DOWNLOAD, EVENT_PACKAGE_INSTALLED
 
 from pyanaconda.localization import langcode_matches_locale
 
@@ -1448,6 +1449,18 @@ reposdir=%s
                     msg = progress_map[key] + text
                     progressQ.send_message(msg)
                     log.debug(msg)
+                    if key == "PROGRESS_INSTALL":
+                        # text is " <package> (<current>/<total>)"
+                        eventLog.emit(EVENT_PACKAGE_INSTALLED,
+                                      package=text.strip().rsplit(" ", 1)[0])
+                elif line.startswith("DOWNLOAD:"):
+                    # DOWNLOAD: <package> <bytes> <seconds>
+                    try:
+                        (package, size, duration) = line[9:].split()
+                        eventLog.emit(EVENT_DOWNLOAD, source=package,
+                                      bytes=int(size), duration=float(duration))
+                    except ValueError:
+                        log.debug(line)
                 elif line.startswith("DEBUG:"):
                     log.debug(line[6:])
                 elif line.startswith("INFO:"):
@@ -21,9 +21,11 @@
 import logging
 log = logging.getLogger("anaconda")
 
+import re
 from contextlib import contextmanager
 
 from pyanaconda.queue import QueueFactory
+from pyanaconda.eventlog import eventLog
 
 # A queue to be used for communicating progress information between a subthread
 # doing all the hard work and the main thread that does the GTK updates.  This
@@ -40,12 +42,23 @@ progressQ.addMessage("message", 1)          # message
 progressQ.addMessage("complete", 0)
 progressQ.addMessage("quit", 1)             # exit_code
 
+def _phase_id(message):
+    """Make up an event log phase ID from a progress message."""
+    return "-".join(re.findall(r"\w+", message.lower(), re.UNICODE)) or "unknown"
+
 # Surround a block of code with progress updating.  Before the code runs, the
 # message is updated so the user can tell what's about to take so long.
 # Afterwards, the progress bar is updated to reflect that the task is done.
+# The start and the end of the block are also recorded in the event log as
+# the given phase, which should be the same for all the languages.  Without
+# a phase the ID is made up from the message.
 @contextmanager
-def progress_report(message):
+def progress_report(message, phase=None):
+    if phase is None:
+        phase = _phase_id(message)
+
     progressQ.send_message(message)
     log.info(message)
-    yield
+    with eventLog.phase(phase, message=message):
+        yield
     progressQ.send_step()
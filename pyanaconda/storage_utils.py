@@ -20,16 +20,30 @@
 
 """UI-independent storage utility functions"""
 
+import os
 import re
 import locale
+import threading
+import weakref
 
+from collections import defaultdict, namedtuple
 from contextlib import contextmanager
 
+from blivet import storageInitialize, findExistingInstallations, udev
 from blivet.size import Size
 from blivet.errors import SizeParamsError
 from blivet.devicefactory import DEVICE_TYPE_LVM
 from blivet.devicefactory import DEVICE_TYPE_BTRFS
 from blivet.devicefactory import DEVICE_TYPE_MD
+from blivet.devices import PartitionDevice
+from blivet.errors import DasdFormatError
+
+from pyanaconda.constants import ISCSI_MAX_PARALLEL_LOGINS, ISCSI_LOGIN_TIMEOUT
+from pyanaconda.constants import THREAD_ISCSI_BASENAME, THREAD_DASDFMT_BASENAME
+from pyanaconda import iutil
+from pyanaconda.flags import flags
+from pyanaconda.i18n import _, P_
+from pyanaconda.threads import run_in_parallel
 
 import logging
 log = logging.getLogger("anaconda")
@@ -90,3 +104,670 @@ def ui_storage_logger():
     yield
     storage_log.removeFilter(storage_filter)
 
+
+# properties of the devices and their formats the storage sanity check and
+# the bootloader stage1/stage2 checks depend on
+_REVISION_DEVICE_ATTRS = ("name", "type", "exists", "size", "targetSize",
+                          "encrypted", "protected", "partType", "bootable",
+                          "level", "metadataVersion", "memberDevices",
+                          "totalDevices", "spares")
+_REVISION_FORMAT_ATTRS = ("type", "exists", "mountpoint", "label", "labelType",
+                          "hasKey", "mountable", "linuxNative", "mountopts",
+                          "migrate", "fsprofile")
+
+def _revision_value(value):
+    if value is None or isinstance(value, (basestring, bool, int, long, float)):
+        return value
+    if isinstance(value, Size):
+        return int(value)
+    # e.g. sizes and RAID levels
+    return str(value)
+
+def _device_revision(device):
+    device_attrs = tuple(_revision_value(getattr(device, attr, None))
+                         for attr in _REVISION_DEVICE_ATTRS)
+    format_attrs = tuple(_revision_value(getattr(device.format, attr, None))
+                         for attr in _REVISION_FORMAT_ATTRS)
+
+    geometry = None
+    parted_partition = getattr(device, "partedPartition", None)
+    if parted_partition is not None:
+        geometry = (parted_partition.geometry.start, parted_partition.geometry.end)
+
+    return (device_attrs, format_attrs, geometry,
+            tuple(p.name for p in device.parents))
+
+def storage_revision(storage):
+    """Return a description of the storage configuration to check.
+
+       Two storage configurations with the same description give the same
+       results of the storage sanity check.  Devices and actions are described
+       by their names and properties rather than by identity, so that e.g.
+       running automatic partitioning again with the same settings gives the
+       same revision.  Every property of the devices and their formats the
+       sanity check reads (e.g. RAID levels, disk label types or LUKS keys)
+       has to be a part of the description.
+
+       :param storage: the storage to describe
+       :type storage: blivet.Blivet
+       :rtype: tuple
+    """
+    devicetree = storage.devicetree
+    devices = sorted(_device_revision(d) for d in devicetree._devices)
+    actions = tuple((a.typeString, a.objectString, a.device.name)
+                    for a in devicetree._actions)
+
+    bootloader = storage.bootloader
+    stage1 = getattr(bootloader, "stage1_device", None)
+    stage2 = getattr(bootloader, "stage2_device", None)
+    stage1_disk = getattr(bootloader, "stage1_disk", None)
+    bootloader_config = (getattr(stage1, "name", None), getattr(stage2, "name", None),
+                         getattr(stage1_disk, "name", None),
+                         getattr(bootloader, "skip_bootloader", None))
+
+    return (tuple(devices), actions, bootloader_config,
+            bool(storage.encryptionPassphrase))
+
+class FreeSpaceIndex(object):
+    """Free space on the disks of a Blivet instance, keyed by disk name.
+
+       Gives the same results as Blivet.getFreeSpace, but the free space of
+       all the disks is computed in a single pass over the device tree and
+       kept until the device tree changes. Devices added, removed, resized or
+       moved on the disk and actions scheduled or cancelled since the last
+       computation only cause the disks they are on to be computed again.
+    """
+
+    def __init__(self, storage, clearPartType=None):
+        """
+           :param storage: the storage to compute the free space for
+           :type storage: blivet.Blivet
+           :param clearPartType: clearpart type to use instead of the one in
+                                 the storage configuration
+           :type clearPartType: int or None
+        """
+        self._storage = storage
+        self._clearPartType = clearPartType
+        self._lock = threading.RLock()
+
+        self._free = {}
+        self._config = None
+        # id -> (device, geometry), the objects are kept so that their ids
+        # stay unique
+        self._devices = {}
+        self._actions = {}
+
+    def _get_config(self):
+        config = self._storage.config
+        clearPartType = self._clearPartType
+        if clearPartType is None:
+            clearPartType = config.clearPartType
+
+        return (clearPartType, tuple(config.clearPartDevices or []))
+
+    @staticmethod
+    def _geometry(device):
+        """Return the properties of the device the free space depends on.
+
+           Partitioning (e.g. after a device factory resizes a device) changes
+           the size and the position of the new partitions in place.
+        """
+        parted_partition = getattr(device, "partedPartition", None)
+        if parted_partition is not None:
+            geometry = parted_partition.geometry
+            return (int(device.size), geometry.start, geometry.end)
+        return (int(device.size),)
+
+    def _update(self):
+        """Drop the results for the disks changed since the last update."""
+
+        devicetree = self._storage.devicetree
+        config = self._get_config()
+        if config != self._config:
+            self._free = {}
+
+        devices = dict((id(d), (d, self._geometry(d))) for d in devicetree._devices)
+        actions = dict((id(a), a) for a in devicetree._actions)
+
+        changed = [d for (i, (d, geometry)) in devices.iteritems()
+                   if i not in self._devices or self._devices[i][1] != geometry]
+        changed.extend(d for (i, (d, _geometry)) in self._devices.iteritems()
+                       if i not in devices)
+        changed.extend(a.device for (i, a) in actions.iteritems() if i not in self._actions)
+        changed.extend(a.device for (i, a) in self._actions.iteritems() if i not in actions)
+
+        for device in changed:
+            for disk in device.disks:
+                self._free.pop(disk.name, None)
+
+        self._config = config
+        self._devices = devices
+        self._actions = actions
+
+    def _compute(self, disks):
+        storage = self._storage
+        clearPartType = self._config[0]
+
+        partitions = defaultdict(list)
+        for device in storage.devicetree._devices:
+            if isinstance(device, PartitionDevice):
+                partitions[device.disk.name].append(device)
+
+        for disk in disks:
+            should_clear = storage.shouldClear(disk, clearPartType=clearPartType,
+                                               clearPartDisks=[disk.name])
+            if should_clear:
+                self._free[disk.name] = (disk.size, Size(bytes=0))
+                continue
+
+            disk_free = Size(bytes=0)
+            fs_free = Size(bytes=0)
+            if disk.partitioned:
+                disk_free = disk.format.free
+                for partition in partitions[disk.name]:
+                    # only check actual filesystems since lvm &c require a
+                    # bunch of operations to translate free filesystem space
+                    # into free disk space
+                    should_clear = storage.shouldClear(partition,
+                                                       clearPartType=clearPartType,
+                                                       clearPartDisks=[disk.name])
+                    if should_clear:
+                        disk_free += partition.size
+                    elif hasattr(partition.format, "free"):
+                        fs_free += partition.format.free
+            elif hasattr(disk.format, "free"):
+                fs_free = disk.format.free
+            elif disk.format.type is None:
+                disk_free = disk.size
+
+            self._free[disk.name] = (disk_free, fs_free)
+
+    def getFreeSpace(self, disks=None):
+        """Return free space info for the given disks.
+
+           :param disks: disks to get the info for, all the disks by default
+           :type disks: list of blivet.devices.StorageDevice
+           :return: disk name -> (disk_free, fs_free) dictionary (see
+                    Blivet.getFreeSpace)
+           :rtype: dict
+        """
+        with self._lock:
+            if disks is None:
+                disks = self._storage.disks
+
+            self._update()
+            missing = [d for d in disks if d.name not in self._free]
+            if missing:
+                # compute all the missing disks at once, the disks are usually
+                # requested one by one when the UI is populated
+                known = set(d.name for d in missing)
+                missing.extend(d for d in self._storage.disks
+                               if d.name not in self._free and d.name not in known)
+                self._compute(missing)
+
+            return dict((d.name, self._free[d.name]) for d in disks)
+
+# storage -> {clearPartType -> FreeSpaceIndex}
+_free_space_indexes = weakref.WeakKeyDictionary()
+
+def free_space_index(storage, clearPartType=None):
+    """Get the free space index for the given storage instance.
+
+       The indexes are shared by all the users of the same storage instance.
+
+       :param storage: the storage to get the index for
+       :type storage: blivet.Blivet
+       :param clearPartType: clearpart type to use instead of the one in the
+                             storage configuration
+       :type clearPartType: int or None
+       :rtype: FreeSpaceIndex
+    """
+    indexes = _free_space_indexes.setdefault(storage, {})
+    if clearPartType not in indexes:
+        indexes[clearPartType] = FreeSpaceIndex(storage, clearPartType)
+    return indexes[clearPartType]
+
+DeviceTreeChanges = namedtuple("DeviceTreeChanges", ["added", "removed", "changed"])
+
+# udev properties describing the contents and the position of disks and
+# partitions, a change in any of them means the device has to be probed again
+_UDEV_SIGNATURE_PROPERTIES = ("ID_FS_TYPE", "ID_FS_UUID",
+                              "ID_PART_TABLE_TYPE", "ID_PART_TABLE_UUID",
+                              "ID_PART_ENTRY_TYPE", "ID_PART_ENTRY_NUMBER",
+                              "ID_PART_ENTRY_OFFSET", "ID_PART_ENTRY_SIZE")
+
+# storage -> {sysfs path -> signature} of the disks and partitions seen by
+# the last full scan of the storage
+_disk_snapshots = weakref.WeakKeyDictionary()
+
+# storage -> (ignored disks, exclusive disks) used by the last full scan
+_disk_configs = weakref.WeakKeyDictionary()
+
+def _disk_config(storage):
+    config = storage.config
+    return (sorted(config.ignoredDisks or []), sorted(config.exclusiveDisks or []))
+
+def _sysfs_size(sysfs_path):
+    if not sysfs_path.startswith("/sys/"):
+        sysfs_path = "/sys" + sysfs_path
+    try:
+        with open(os.path.join(sysfs_path, "size")) as f:
+            return int(f.read())
+    except (IOError, ValueError):
+        return None
+
+def _disk_snapshot(udev_devices):
+    """Return sysfs path -> (signature, udev info) of the disks and partitions.
+
+       Only disks and partitions are visible in udev no matter if the devices
+       on them are active, LVs, MD arrays or LUKS devices are torn down after
+       the storage is scanned and they can't be compared.
+    """
+    snapshot = {}
+    for info in udev_devices:
+        if not (udev.udev_device_is_disk(info) or udev.udev_device_is_partition(info)):
+            continue
+
+        path = udev.udev_device_get_sysfs_path(info)
+        signature = (tuple(info.get(prop) or None for prop in _UDEV_SIGNATURE_PROPERTIES),
+                     _sysfs_size(path))
+        snapshot[path] = (signature, info)
+    return snapshot
+
+def initialize_storage(storage, data, protectedDevNames):
+    """Initialize the storage with storageInitialize and remember the disks.
+
+       The disks and partitions are remembered so that rescan_storage can
+       tell what changed since then.
+
+       :param storage: the storage to initialize
+       :type storage: blivet.Blivet
+       :param data: kickstart data
+       :param protectedDevNames: names of the devices to protect
+       :type protectedDevNames: list of str
+    """
+    # Take the snapshot first. Anything that changes while the storage is
+    # probed is then seen as a change by the next rescan, so the worst case
+    # is an unneeded full rescan.
+    udev.udev_settle()
+    snapshot = _disk_snapshot(udev.udev_get_block_devices())
+    storageInitialize(storage, data, protectedDevNames)
+    _disk_snapshots[storage] = dict((path, signature)
+                                    for (path, (signature, _info)) in snapshot.iteritems())
+    _disk_configs[storage] = _disk_config(storage)
+
+def device_tree_changes(storage, udev_devices=None):
+    """Compare the disks and partitions known to udev with the last full scan.
+
+       :param storage: the storage to compare
+       :type storage: blivet.Blivet
+       :param udev_devices: udev info of the block devices, the current
+                            block devices by default
+       :type udev_devices: list of dict
+       :return: udev info of the new disks and partitions, sysfs paths of the
+                disks and partitions udev doesn't know anymore and of those
+                whose size, partition table entry or format changed; None if
+                the storage was not initialized with initialize_storage
+       :rtype: DeviceTreeChanges or None
+    """
+    known = _disk_snapshots.get(storage)
+    if known is None:
+        return None
+
+    if udev_devices is None:
+        udev_devices = udev.udev_get_block_devices()
+
+    current = _disk_snapshot(udev_devices)
+
+    added = []
+    changed = []
+    for (path, (signature, info)) in current.iteritems():
+        if path not in known:
+            added.append(info)
+        elif known[path] != signature:
+            changed.append(path)
+
+    removed = [path for path in known if path not in current]
+
+    return DeviceTreeChanges(added, removed, changed)
+
+def _can_rescan_incrementally(storage, changes):
+    """Can the changes be applied to the device tree without a full reset?
+
+       Only new disks (and their partitions) can be added to the device
+       tree, anything else may change the devices already probed.  No
+       changes at all mean the change can't be seen from udev (e.g. a new
+       LV on a known PV), so a full reset is needed too.
+    """
+    if changes is None:
+        return False
+
+    if not changes.added or changes.removed or changes.changed:
+        return False
+
+    # the actions scheduled so far are dropped by a full reset
+    if storage.devicetree.findActions():
+        return False
+
+    added = set(udev.udev_device_get_sysfs_path(info) for info in changes.added)
+    for info in changes.added:
+        if udev.udev_device_is_partition(info):
+            disk_path = os.path.dirname(udev.udev_device_get_sysfs_path(info))
+            if disk_path not in added:
+                # a new partition on a disk we already know
+                return False
+
+    return True
+
+def rescan_storage(storage, data, protectedDevNames):
+    """Rescan the storage, only probing the new disks if possible.
+
+       If the only change since the storage was initialized is that some
+       disks were attached (e.g. new iSCSI LUNs), just the new disks are
+       added to the device tree.  Otherwise, or if the ignored or exclusive
+       disks changed, the storage is initialized again with
+       initialize_storage.
+
+       :param storage: the storage to rescan
+       :type storage: blivet.Blivet
+       :param data: kickstart data
+       :param protectedDevNames: names of the devices to protect
+       :type protectedDevNames: list of str
+    """
+    udev.udev_trigger(subsystem="block", action="change")
+    udev.udev_settle()
+
+    # storageInitialize updates the configuration for a full rescan, the new
+    # disks have to be added with the current one too
+    storage.config.update(data)
+    if _disk_configs.get(storage) != _disk_config(storage):
+        log.info("rescanning all the storage: the ignored or exclusive disks changed")
+        initialize_storage(storage, data, protectedDevNames)
+        return
+
+    changes = device_tree_changes(storage)
+    if not _can_rescan_incrementally(storage, changes):
+        if changes is None:
+            log.info("rescanning all the storage: no previous scan to compare to")
+        else:
+            log.info("rescanning all the storage: %d devices added, %d removed, "
+                     "%d changed", len(changes.added), len(changes.removed),
+                     len(changes.changed))
+        initialize_storage(storage, data, protectedDevNames)
+        return
+
+    add_new_devices(storage, changes)
+
+def add_new_devices(storage, changes=None):
+    """Add the disks and partitions udev knows, but the device tree doesn't.
+
+       Unlike DeviceTree.populate, only the new devices are probed.  The
+       device tree is populated again if any of them is a multipath member,
+       because the multipath topology needs all the devices.
+
+       :param storage: the storage to add the devices to
+       :type storage: blivet.Blivet
+       :param changes: changes found by device_tree_changes, the current ones
+                       by default
+       :type changes: DeviceTreeChanges
+    """
+    if changes is None:
+        udev.udev_settle()
+        changes = device_tree_changes(storage)
+
+    if changes is None:
+        # no previous scan to compare to, the device tree decides below
+        candidates = [info for (_signature, info)
+                      in _disk_snapshot(udev.udev_get_block_devices()).itervalues()]
+    else:
+        candidates = changes.added
+
+    devicetree = storage.devicetree
+    added = [info for info in candidates
+             if devicetree.getDeviceByName(udev.udev_device_get_name(info), hidden=True) is None]
+    if not added:
+        return
+
+    if any(udev.udev_device_is_multipath_member(info) for info in added):
+        devicetree.populate()
+        return
+
+    # add the disks first, their partitions need them
+    added.sort(key=udev.udev_device_is_partition)
+    log.info("adding new block devices to the device tree: %s",
+             ", ".join(udev.udev_device_get_name(info) for info in added))
+    for info in added:
+        devicetree.addUdevDevice(info)
+
+    # the new devices may have been activated while probing them
+    devicetree.teardownAll()
+
+    # the new disks may contain other installations, like after a reset
+    if not flags.imageInstall:
+        storage.roots = findExistingInstallations(devicetree)
+
+    # the next rescan should compare to the devices added now
+    known = _disk_snapshots.get(storage)
+    if known is not None:
+        for (path, (signature, _info)) in _disk_snapshot(candidates).iteritems():
+            known[path] = signature
+
+ISCSITarget = namedtuple("ISCSITarget", ["ipaddr", "port", "username", "password",
+                                         "r_username", "r_password", "target", "iface"])
+
+def _reraise_unexpected(exc_info, expected=()):
+    """Re-raise an exception returned by run_in_parallel unless it's expected."""
+    if exc_info and not issubclass(exc_info[0], expected):
+        raise exc_info[0], exc_info[1], exc_info[2]
+
+def iscsi_login_nodes(iscsi, logins, limit=ISCSI_MAX_PARALLEL_LOGINS,
+                      timeout=ISCSI_LOGIN_TIMEOUT):
+    """Log into iSCSI nodes in parallel.
+
+       :param iscsi: the iSCSI instance
+       :type iscsi: blivet.iscsi.iscsi
+       :param logins: (node, credentials) pairs, the credentials are the
+                      keyword arguments for iscsi.log_into_node
+       :type logins: list of tuples
+       :param limit: maximum number of logins running at the same time
+       :type limit: int
+       :param timeout: login timeout for every node (in seconds)
+       :type timeout: int
+       :return: (rc, msg) tuples returned by iscsi.log_into_node in the
+                order of the logins
+       :rtype: list
+    """
+    def login(item):
+        (node, credentials) = item
+        try:
+            node.setParameter("node.conn[0].timeo.login_timeout", str(timeout))
+        except (AttributeError, IOError) as e:
+            log.debug("iSCSI: failed to set the login timeout of %s: %s", node.name, e)
+
+        return iscsi.log_into_node(node, **credentials)
+
+    results = []
+    for (result, exc_info) in run_in_parallel(login, logins, limit,
+                                              prefix=THREAD_ISCSI_BASENAME):
+        _reraise_unexpected(exc_info)
+        results.append(result)
+
+    return results
+
+def iscsi_add_targets(iscsi, targets, limit=ISCSI_MAX_PARALLEL_LOGINS,
+                      timeout=ISCSI_LOGIN_TIMEOUT):
+    """Discover and log into iSCSI targets.
+
+       Does the same as iscsi.addTarget for each of the targets, but every
+       portal is only asked once and the discoveries and the logins run in
+       parallel. Like addTarget, it waits for udev to create the new disks.
+
+       :param iscsi: the iSCSI instance
+       :type iscsi: blivet.iscsi.iscsi
+       :param targets: the targets to add
+       :type targets: list of ISCSITarget
+       :param limit: maximum number of discoveries or logins running at the
+                     same time
+       :type limit: int
+       :param timeout: login timeout for every node (in seconds)
+       :type timeout: int
+       :return: error message for each of the targets, None for the targets
+                that were added
+       :rtype: list
+    """
+    portal_fields = ("ipaddr", "port", "username", "password", "r_username", "r_password")
+    portals = []
+    for target in targets:
+        portal = tuple(getattr(target, field) for field in portal_fields)
+        if portal not in portals:
+            portals.append(portal)
+
+    def discover(portal):
+        kwargs = dict(zip(portal_fields[1:], portal[1:]))
+        if not kwargs["port"]:
+            del kwargs["port"]
+        nodes = iscsi.discover(portal[0], **kwargs)
+        if nodes is None:
+            raise IOError(_("No iSCSI nodes discovered"))
+        return nodes
+
+    # iscsi.discover starts the iSCSI initiator if it's not running yet,
+    # which is not safe to do from multiple threads at once
+    iscsi.startup()
+
+    discovered = dict(zip(portals, run_in_parallel(discover, portals, limit,
+                                                   prefix=THREAD_ISCSI_BASENAME)))
+
+    errors = [None] * len(targets)
+    logins = []
+    # index of the login -> indexes of the targets it belongs to
+    owners = []
+    login_indexes = {}
+    for (idx, target) in enumerate(targets):
+        portal = tuple(getattr(target, field) for field in portal_fields)
+        (nodes, exc_info) = discovered[portal]
+        _reraise_unexpected(exc_info, (IOError, ValueError))
+        if exc_info:
+            errors[idx] = str(exc_info[1])
+            continue
+
+        matching = [node for node in nodes
+                    if (not target.target or node.name == target.target) and
+                       (not target.iface or iscsi.ifaces.get(node.iface) == target.iface)]
+        if not matching:
+            errors[idx] = _("No new iSCSI nodes discovered")
+            continue
+
+        credentials = {"username": target.username, "password": target.password,
+                       "r_username": target.r_username, "r_password": target.r_password}
+        for node in matching:
+            if id(node) not in login_indexes:
+                login_indexes[id(node)] = len(logins)
+                logins.append((node, credentials))
+                owners.append([])
+            owners[login_indexes[id(node)]].append(idx)
+
+    logged_in = set()
+    messages = {}
+    for ((rc, msg), idxs) in zip(iscsi_login_nodes(iscsi, logins, limit, timeout), owners):
+        for idx in idxs:
+            if rc:
+                logged_in.add(idx)
+            else:
+                messages.setdefault(idx, msg)
+
+    for (idx, target) in enumerate(targets):
+        if errors[idx] is None and idx not in logged_in:
+            errors[idx] = messages.get(idx) or _("Could not log into any iSCSI nodes")
+
+    if logged_in:
+        # wait for the new disks once for all the logins
+        iscsi.stabilize()
+
+    return errors
+
+def dasdfmt_progress_message(formatting, done, total):
+    """Return a message describing the progress of format_dasds.
+
+       :param formatting: names of the DASDs being formatted
+       :type formatting: list of str
+       :param done: number of the DASDs formatted so far
+       :type done: int
+       :param total: number of all the DASDs to format
+       :type total: int
+       :rtype: str
+    """
+    msg = P_("Formatting %(total)d DASD (%(done)d done)",
+             "Formatting %(total)d DASDs (%(done)d done)",
+             total) % {"done": done, "total": total}
+    if formatting:
+        msg += ": " + ", ".join("/dev/" + d for d in sorted(formatting))
+    return msg
+
+def _format_dasd(dasd):
+    """Run dasdfmt on a DASD, like blivet.devicelibs.dasd.format_dasd.
+
+       blivet's run_program holds the program log lock while the program
+       runs, so only one dasdfmt could run at a time. iutil only holds it
+       while logging.
+    """
+    try:
+        rc = iutil.execWithRedirect("dasdfmt", ["-y", "-d", "cdl", "-b", "4096",
+                                                "/dev/" + dasd])
+    except OSError as err:
+        raise DasdFormatError(err)
+
+    if rc:
+        raise DasdFormatError("dasdfmt failed: %s" % rc)
+
+def format_dasds(dasds, progress_cb=None, limit=None):
+    """Run dasdfmt on the given DASDs, several of them at once.
+
+       Failures are logged, but don't stop the formatting of the other DASDs.
+
+       :param dasds: names of the DASDs to format
+       :type dasds: list of str
+       :param progress_cb: function called with the names of the DASDs being
+                           formatted, the number of the DASDs formatted so far
+                           and the number of all the DASDs whenever a DASD
+                           starts or finishes formatting
+       :param limit: maximum number of the DASDs formatted at the same time,
+                     the dasdfmt.parallel boot option by default
+       :type limit: int or None
+       :return: names of the DASDs that failed to format
+       :rtype: list of str
+    """
+    if limit is None:
+        limit = flags.dasdfmtParallel
+
+    lock = threading.Lock()
+    formatting = set()
+    done = [0]
+
+    def report():
+        if progress_cb:
+            progress_cb(sorted(formatting), done[0], len(dasds))
+
+    def format_one(dasd):
+        with lock:
+            formatting.add(dasd)
+            report()
+
+        try:
+            _format_dasd(dasd)
+        finally:
+            with lock:
+                formatting.discard(dasd)
+                done[0] += 1
+                report()
+
+    failed = []
+    for (dasd, (_result, exc_info)) in zip(dasds, run_in_parallel(format_one, dasds, limit,
+                                                                  prefix=THREAD_DASDFMT_BASENAME)):
+        _reraise_unexpected(exc_info, DasdFormatError)
+        if exc_info:
+            # Log errors if formatting fails, but don't halt the installer
+            log.error(str(exc_info[1]))
+            failed.append(dasd)
+
+    return failed
@@ -22,9 +22,12 @@
 import logging
 log = logging.getLogger("anaconda")
 
+import sys
 import threading
+import Queue
 
 _WORKER_THREAD_PREFIX = "AnaWorkerThread"
+_PARALLEL_THREAD_PREFIX = "AnaParallelThread"
 
 class ThreadManager(object):
     """A singleton class for managing threads and processes.
@@ -234,6 +237,53 @@ class AnacondaThread(threading.Thread):
             threadMgr.remove(self.name)
             log.info("Thread Done: %s (%s)", self.name, self.ident)
 
+def run_in_parallel(target, items, limit, prefix=_PARALLEL_THREAD_PREFIX):
+    """Call target for each of the items, in up to limit threads at once.
+
+       Exceptions raised by target are not handled by the exception handling
+       code, they are returned with the results instead so that the caller
+       can decide what a failure for one of the items means.
+
+       :param target: function taking one of the items as its only argument
+       :param items: items to call the target for
+       :type items: list
+       :param limit: maximum number of threads to run at the same time
+       :type limit: int
+       :param prefix: prefix of the names of the threads
+       :type prefix: str
+       :return: list of (result, exc_info) tuples in the order of the items,
+                exc_info is None if target didn't raise an exception
+       :rtype: list
+    """
+    results = [None] * len(items)
+    queue = Queue.Queue()
+    for (idx, item) in enumerate(items):
+        queue.put((idx, item))
+
+    def worker():
+        while True:
+            try:
+                (idx, item) = queue.get_nowait()
+            except Queue.Empty:
+                return
+
+            # pylint: disable=W0703
+            try:
+                results[idx] = (target(item), None)
+            except Exception:
+                results[idx] = (None, sys.exc_info())
+
+    if limit <= 1 or len(items) <= 1:
+        worker()
+        return results
+
+    names = [threadMgr.add(AnacondaThread(prefix=prefix, target=worker))
+             for _i in range(min(limit, len(items)))]
+    for name in names:
+        threadMgr.wait(name)
+
+    return results
+
 def initThreading():
     """Set up threading for anaconda's use. This method must be called before
        any GTK or threading code is called, or else threads will only run when
@@ -25,12 +25,15 @@ configuration, valid timezones recognition etc.
 """
 
 import os
+import re
 import pytz
 import langtable
+import threading
+import locale as locale_mod
 from collections import OrderedDict
 
 from pyanaconda import iutil
-from pyanaconda.constants import THREAD_STORAGE
+from pyanaconda.constants import THREAD_STORAGE, DEFAULT_LANG
 from pyanaconda.flags import flags
 from pyanaconda.threads import threadMgr
 from blivet import arch
@@ -50,6 +53,8 @@ ETC_ZONES = ['GMT+1', 'GMT+2', 'GMT+3', 'GMT+4', 'GMT+5', 'GMT+6', 'GMT+7',
 NTP_PACKAGE = "chrony"
 NTP_SERVICE = "chronyd"
 
+SPLIT_NUMBER_SUFFIX_RE = re.compile(r'([^0-9]*)([-+])([0-9]+)')
+
 class TimezoneConfigError(Exception):
     """Exception class for timezone configuration related problems"""
     pass
@@ -181,26 +186,125 @@ def get_preferred_timezone(territory):
 
     return timezones[0]
 
-def get_all_regions_and_timezones():
+def _region_sort_key(region_xlated):
+    """Sort key for (region, translated name) pairs."""
+
+    (region, xlated) = region_xlated
+
+    # sort the Etc timezones to the end
+    return (region == "Etc", locale_mod.strxfrm(xlated))
+
+def _city_sort_key(city_xlated):
+    """Sort key for (city, translated name) pairs."""
+
+    xlated = city_xlated[1]
+
+    # if there are "cities" ending with numbers (like GMT+-X), we need to sort
+    # them based on their numbers
+    match = SPLIT_NUMBER_SUFFIX_RE.match(xlated)
+    if match is None:
+        return (locale_mod.strxfrm(xlated), 0)
+
+    (prefix, sign, suffix) = match.groups()
+    return (locale_mod.strxfrm(prefix), int(sign + suffix))
+
+class TimezoneCatalog(object):
     """
-    Get a dictionary mapping the regions to the list of their timezones.
+    Catalog of the known timezones, built once and shared.
 
-    :rtype: dict
+    Provides constant-time validity checks, the mapping of regions to their
+    cities and the translated regions and cities sorted for the current
+    locale (computed once for every locale).
 
     """
 
-    result = OrderedDict()
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timezones = None
+        self._regions = None
+        # locale -> (sorted (region, xlated) pairs, sorted (city, xlated) pairs)
+        self._sorted = {}
+
+    def _build(self):
+        with self._lock:
+            if self._regions is not None:
+                return
+
+            regions = OrderedDict()
+            for tz in pytz.common_timezones:
+                parts = tz.split("/", 1)
+
+                if len(parts) > 1:
+                    if parts[0] not in regions:
+                        regions[parts[0]] = set()
+                    regions[parts[0]].add(parts[1])
+
+            regions["Etc"] = set(ETC_ZONES)
+
+            self._timezones = frozenset(pytz.common_timezones) | \
+                              frozenset("Etc/" + zone for zone in ETC_ZONES)
+            self._regions = OrderedDict((region, frozenset(cities))
+                                        for (region, cities) in regions.iteritems())
+
+    @property
+    def timezones(self):
+        """All the valid timezones (frozenset)."""
+
+        self._build()
+        return self._timezones
+
+    @property
+    def regions(self):
+        """Dictionary mapping the regions to the frozensets of their cities."""
 
-    for tz in pytz.common_timezones:
-        parts = tz.split("/", 1)
+        self._build()
+        return self._regions
 
-        if len(parts) > 1:
-            if parts[0] not in result:
-                result[parts[0]] = set()
-            result[parts[0]].add(parts[1])
+    def is_valid(self, timezone):
+        return timezone in self.timezones
 
-    result["Etc"] = set(ETC_ZONES)
-    return result
+    def sorted_xlated(self):
+        """
+        Get the translated regions and cities sorted for displaying them
+        in the current locale.
+
+        :return: a list of (region, translated region) pairs and a list of
+                 (city, translated city) pairs, the Etc region is the last one
+        :rtype: tuple
+
+        """
+
+        # avoid a circular import
+        from pyanaconda.localization import get_xlated_timezone
+
+        locale = os.environ.get("LANG", DEFAULT_LANG)
+        with self._lock:
+            if locale in self._sorted:
+                return self._sorted[locale]
+
+        regions = [(region, get_xlated_timezone(region)) for region in self.regions]
+        regions.sort(key=_region_sort_key)
+
+        cities = set((city, get_xlated_timezone(city))
+                     for region_cities in self.regions.itervalues()
+                     for city in region_cities)
+        cities = sorted(cities, key=_city_sort_key)
+
+        with self._lock:
+            self._sorted[locale] = (regions, cities)
+        return (regions, cities)
+
+timezoneCatalog = TimezoneCatalog()
+
+def get_all_regions_and_timezones():
+    """
+    Get a dictionary mapping the regions to the sets of their timezones.
+
+    :rtype: dict
+
+    """
+
+    return OrderedDict(timezoneCatalog.regions)
 
 def is_valid_timezone(timezone):
     """
@@ -211,7 +315,5 @@ def is_valid_timezone(timezone):
 
     """
 
-    etc_zones = ["Etc/" + zone for zone in ETC_ZONES]
-
-    return timezone in pytz.common_timezones + etc_zones
+    return timezoneCatalog.is_valid(timezone)
 
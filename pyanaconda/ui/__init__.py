@@ -157,7 +157,8 @@ class UserInterface(object):
 
         for module_pattern, path in module_pattern_w_path:
             standalones.extend(collect(module_pattern, path, lambda obj: issubclass(obj, standalone_class) and \
-                                       getattr(obj, "preForHub", False) or getattr(obj, "postForHub", False)))
+                                       getattr(obj, "preForHub", False) or getattr(obj, "postForHub", False),
+                                       hint=lambda info: info["preForHub"] or info["postForHub"]))
 
         return standalones
 
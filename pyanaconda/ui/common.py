@@ -25,8 +25,10 @@ import imp
 import inspect
 import sys
 import types
+import json
+import threading
 
-from pyanaconda.constants import ANACONDA_ENVIRON, FIRSTBOOT_ENVIRON
+from pyanaconda.constants import ANACONDA_ENVIRON, FIRSTBOOT_ENVIRON, UI_DISCOVERY_INDEX
 from pyanaconda.errors import RemovedModuleError
 from pykickstart.constants import FIRSTBOOT_RECONFIG
 
@@ -536,11 +538,177 @@ class Hub(UIObject):
         """
         log.debug("Left hub: %s", self.__class__.__name__)
 
-def collect(module_pattern, path, pred):
+def _module_classes(module):
+    """Return the (name, class) pairs collect() considers in a module."""
+
+    # if __all__ is defined in the module, use it
+    if not hasattr(module, "__all__"):
+        return inspect.getmembers(module, inspect.isclass)
+    else:
+        return [(name, getattr(module, name))
+                for name in module.__all__
+                if inspect.isclass(getattr(module, name))]
+
+def _class_info(cls):
+    """Return the metadata stored for a class in the discovery index.
+
+       The metadata contains names of the class and its bases and the class
+       attributes used to pick spokes, categories and hubs.
+    """
+
+    category = getattr(cls, "category", None)
+    if inspect.isclass(category):
+        category = category.__name__
+    elif category is not None and not isinstance(category, basestring):
+        category = str(category)
+
+    return {"bases": [base.__name__ for base in inspect.getmro(cls)],
+            "category": category,
+            "displayOnHub": getattr(cls, "displayOnHub", None) is not None,
+            "preForHub": bool(getattr(cls, "preForHub", False)),
+            "postForHub": bool(getattr(cls, "postForHub", False))}
+
+class DiscoveryIndex(object):
+    """Persistent index of the classes found by collect().
+
+       The index is a JSON file mapping the searched directories to their
+       contents and the modules to the metadata of their classes (see
+       _class_info). The entries are keyed by the mtimes of the directories
+       and modules, so changed directories are listed again and changed
+       modules are imported again. The index is stored in /tmp so that it
+       survives restarts of the installer.
+    """
+
+    VERSION = 1
+
+    def __init__(self, index_file=UI_DISCOVERY_INDEX):
+        """
+           :param index_file: path to the index file
+           :type index_file: string
+        """
+        self._index_file = index_file
+        self._lock = threading.RLock()
+        self._dirs = None
+        self._modules = None
+        self._dirty = False
+
+    def _load(self):
+        if self._dirs is not None:
+            return
+
+        self._dirs = {}
+        self._modules = {}
+        try:
+            with open(self._index_file) as f:
+                data = json.load(f)
+        except (IOError, ValueError):
+            return
+
+        if isinstance(data, dict) and data.get("version") == self.VERSION:
+            self._dirs = data.get("dirs", {})
+            self._modules = data.get("modules", {})
+
+    @staticmethod
+    def _stamp(path):
+        stat = os.stat(path)
+        return [stat.st_mtime, stat.st_size]
+
+    def listdir(self, path):
+        """List a directory, reusing the contents stored for its mtime.
+
+           :param path: the directory to list
+           :type path: string
+           :raise OSError: if the directory cannot be listed
+        """
+        stamp = self._stamp(path)
+        with self._lock:
+            self._load()
+            entry = self._dirs.get(path)
+            if entry and entry.get("stamp") == stamp:
+                # JSON strings are loaded as unicode, file names are str
+                return [name.encode("utf-8") for name in entry["contents"]]
+
+            contents = os.listdir(path)
+            self._dirs[path] = {"stamp": stamp, "contents": contents}
+            self._dirty = True
+            return contents
+
+    def get_classes(self, module_path):
+        """Get the metadata of the classes found in a module.
+
+           :param module_path: path to the module file
+           :type module_path: string
+           :return: class name -> metadata dictionary or None if the module
+                    is not indexed or changed since it was indexed
+           :rtype: dict or None
+        """
+        try:
+            stamp = self._stamp(module_path)
+        except OSError:
+            return None
+
+        with self._lock:
+            self._load()
+            entry = self._modules.get(module_path)
+            if entry and entry.get("stamp") == stamp:
+                return entry["classes"]
+            return None
+
+    def update(self, module_path, module):
+        """Store the metadata of the classes found in an imported module.
+
+           :param module_path: path to the module file
+           :type module_path: string
+           :param module: the module imported from module_path
+           :type module: module
+        """
+        try:
+            stamp = self._stamp(module_path)
+        except OSError:
+            return
+
+        classes = dict((name, _class_info(cls))
+                       for (name, cls) in _module_classes(module))
+        with self._lock:
+            self._load()
+            self._modules[module_path] = {"stamp": stamp, "classes": classes}
+            self._dirty = True
+
+    def save(self):
+        """Write the index file if the index changed."""
+
+        with self._lock:
+            if not self._dirty:
+                return
+
+            # write the new content to a temporary file first and rename it
+            # so that a restarted installer never sees a partially written file
+            tmp_file = self._index_file + ".tmp"
+            try:
+                with open(tmp_file, "w") as f:
+                    json.dump({"version": self.VERSION, "dirs": self._dirs,
+                               "modules": self._modules}, f)
+                os.rename(tmp_file, self._index_file)
+                self._dirty = False
+            except (IOError, OSError, TypeError, ValueError) as e:
+                log.debug("Unable to write the UI discovery index: %s", e)
+
+discoveryIndex = DiscoveryIndex()
+
+# (module name, directory) -> module for the modules that were already
+# imported and checked by collect()
+_collected_modules = {}
+
+def collect(module_pattern, path, pred, hint=None, index=None):
     """Traverse the directory (given by path), import all files as a module
        module_pattern % filename and find all classes within that match
        the given predicate.  This is then returned as a list of classes.
 
+       Modules that were indexed before (see DiscoveryIndex) and contain no
+       class for which the hint returns True are not imported at all.
+       Modules that were already imported and checked by a previous call
+       are reused.
+
        It is suggested you use collect_categories or collect_spokes instead of
        this lower-level method.
 
@@ -553,11 +721,22 @@ def collect(module_pattern, path, pred):
 
        :param pred: function which marks classes as good to import
        :type pred: function with one argument returning True or False
+
+       :param hint: function which marks class metadata from the index (see
+                    _class_info) as possibly matching the predicate, it must
+                    return True for every class the predicate accepts
+       :type hint: function with one argument returning True or False
+
+       :param index: the discovery index to use, discoveryIndex by default
+       :type index: DiscoveryIndex
     """
 
+    if index is None:
+        index = discoveryIndex
+
     retval = []
     try:
-        contents = os.listdir(path)
+        contents = index.listdir(path)
     # when the directory "path" does not exist
     except OSError:
         return []
@@ -575,6 +754,19 @@ def collect(module_pattern, path, pred):
         except ValueError:
             mod_name = module_file
 
+        full_name = module_pattern % mod_name
+        indexed_path = os.path.join(path, module_file)
+        classes = index.get_classes(indexed_path)
+        if hint and classes is not None and \
+           not any(hint(info) for info in classes.values()):
+            continue
+
+        module = _collected_modules.get((full_name, path))
+        if module is not None and sys.modules.get(full_name) is module:
+            retval.extend(cls for (_name, cls) in _module_classes(module)
+                          if pred(cls))
+            continue
+
         mod_info = None
         module = None
         module_path = None
@@ -658,18 +850,13 @@ def collect(module_pattern, path, pred):
             if mod_info and mod_info[0]:
                 mod_info[0].close()
 
-        p = lambda obj: inspect.isclass(obj) and pred(obj)
-
-        # if __all__ is defined in the module, use it
-        if not hasattr(module, "__all__"):
-            members = inspect.getmembers(module, p)
-        else:
-            members = [(name, getattr(module, name))
-                       for name in module.__all__
-                       if p(getattr(module, name))]
+        _collected_modules[(full_name, path)] = module
+        if classes is None:
+            index.update(indexed_path, module)
 
-        for (name, val) in members:
-            retval.append(val)
+        retval.extend(cls for (_name, cls) in _module_classes(module)
+                      if pred(cls))
 
+    index.save()
     return retval
 
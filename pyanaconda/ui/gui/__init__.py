@@ -485,6 +485,7 @@ class GraphicalUserInterface(UserInterface):
             return
 
         self._currentAction.exit_logger()
+        self._currentAction.teardown()
         nextAction.entry_logger()
 
         nextAction.refresh()
@@ -52,6 +52,7 @@ def collect_categories(mask_paths):
     """
     categories = []
     for mask, path in mask_paths:
-        categories.extend(collect(mask, path, lambda obj: getattr(obj, "displayOnHub", None) != None))
+        categories.extend(collect(mask, path, lambda obj: getattr(obj, "displayOnHub", None) != None,
+                                  hint=lambda info: info["displayOnHub"]))
 
     return categories
@@ -31,7 +31,7 @@ from pyanaconda.ui import common
 from pyanaconda.ui.gui import GUIObject
 from pyanaconda.ui.gui.categories import collect_categories
 from pyanaconda.ui.gui.spokes import StandaloneSpoke, collect_spokes
-from pyanaconda.ui.gui.utils import gtk_call_once, escape_markup
+from pyanaconda.ui.gui.utils import gtk_call_once, escape_markup, uiDispatcher
 from pyanaconda.constants import ANACONDA_ENVIRON
 
 import logging
@@ -308,7 +308,7 @@ class Hub(GUIObject, common.Hub):
             log.info("no spokes available on %s, continuing automatically", self)
             gtk_call_once(self.continueButton.emit, "clicked")
 
-        click_continue = False
+        check_continue = False
         # Grab all messages that may have appeared since last time this method ran.
         while True:
             try:
@@ -323,21 +323,28 @@ class Hub(GUIObject, common.Hub):
                 q.task_done()
                 continue
 
+            # Many spokes report their state at once (e.g. at startup), so the
+            # widget updates are merged per spoke and run in one idle callback
+            # after all the messages are processed. The lists of not ready and
+            # incomplete spokes are updated right away, the decisions below
+            # depend on them.
             if code == hubQ.HUB_CODE_NOT_READY:
-                self._updateCompleteness(spoke)
+                self._handleCompleteness(spoke, update_continue=False)
+                uiDispatcher.queue((spoke, "selector"), self._updateCompleteness, spoke, False)
 
                 if spoke not in self._notReadySpokes:
                     self._notReadySpokes.append(spoke)
 
-                self._updateContinueButton()
+                uiDispatcher.queue((self, "continue"), self._updateContinue)
                 log.info("spoke is not ready: %s", spoke)
             elif code == hubQ.HUB_CODE_READY:
-                self._updateCompleteness(spoke)
+                self._handleCompleteness(spoke, update_continue=False)
+                uiDispatcher.queue((spoke, "selector"), self._updateCompleteness, spoke, False)
 
                 if spoke in self._notReadySpokes:
                     self._notReadySpokes.remove(spoke)
 
-                self._updateContinueButton()
+                uiDispatcher.queue((self, "continue"), self._updateContinue)
                 log.info("spoke is ready: %s", spoke)
 
                 # If this is a real kickstart install (the kind with an input ks file)
@@ -353,32 +360,44 @@ class Hub(GUIObject, common.Hub):
                         spoke.execute()
                         spoke._visitedSinceApplied = False
 
-                    if self.continuePossible:
-                        if self._inSpoke:
-                            self._autoContinue = False
-                        elif self._autoContinue:
-                            click_continue = True
+                    check_continue = True
 
             elif code == hubQ.HUB_CODE_MESSAGE:
-                spoke.selector.set_property("status", args[1])
+                uiDispatcher.queue((spoke, "status"), spoke.selector.set_property,
+                                   "status", args[1])
                 log.info("setting %s status to: %s", spoke, args[1])
 
             q.task_done()
 
-        # queue is now empty, should continue be clicked?
-        if self._autoContinue and click_continue and self.continueButton:
-            # enqueue the emit to the Gtk message queue
-            log.info("_autoContinue clicking continue button")
-            gtk_call_once(self.continueButton.emit, "clicked")
+        # queue is now empty, should continue be clicked?  That depends on the
+        # result of the checker, which is only up to date after _updateContinue
+        # queued above has run.
+        if check_continue:
+            uiDispatcher.queue((self, "autoContinue"), self._tryAutoContinue)
 
         return True
 
+    def _tryAutoContinue(self):
+        if not self.continuePossible:
+            return
+
+        if self._inSpoke:
+            self._autoContinue = False
+        elif self._autoContinue and self.continueButton:
+            log.info("_autoContinue clicking continue button")
+            self.continueButton.emit("clicked")
+
     def refresh(self):
         GUIObject.refresh(self)
         self._createBox()
 
         GLib.timeout_add(100, self._update_spokes)
 
+    def teardown(self):
+        # the hub won't be shown again, neither will its spokes
+        for spoke in self._spokes.itervalues():
+            spoke.teardown()
+
     @property
     def continueButton(self):
         return None
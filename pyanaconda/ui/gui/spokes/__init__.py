@@ -107,6 +107,7 @@ def collect_spokes(mask_paths, category):
     """
     spokes = []
     for mask, path in mask_paths:
-        spokes.extend(collect(mask, path, lambda obj: hasattr(obj, "category") and obj.category != None and obj.category.__name__ == category))
+        spokes.extend(collect(mask, path, lambda obj: hasattr(obj, "category") and obj.category != None and obj.category.__name__ == category,
+                              hint=lambda info: info["category"] == category))
 
     return spokes
@@ -29,6 +29,7 @@ from pyanaconda.ui.gui import GUIObject
 from pyanaconda.ui.gui.utils import escape_markup
 from pyanaconda.i18n import _
 from pyanaconda import nm
+from pyanaconda.storage_utils import add_new_devices, iscsi_login_nodes
 
 __all__ = ["ISCSIDialog"]
 
@@ -169,7 +170,7 @@ class ISCSIDialog(GUIObject):
         # We need to call this to get the device nodes to show up
         # in our devicetree.
         if self._update_devicetree:
-            self.storage.devicetree.populate()
+            add_new_devices(self.storage)
         return rc
 
     ##
@@ -340,6 +341,13 @@ class ISCSIDialog(GUIObject):
         self._store[itr][0] = not self._store[itr][0]
 
     def _login(self, credentials):
+        kwargs = {"username": credentials.username,
+                  "password": credentials.password,
+                  "r_username": credentials.rUsername,
+                  "r_password": credentials.rPassword}
+
+        # (row, node) pairs of all the selected nodes, logged into in parallel
+        selected = []
         for row in self._store:
             obj = NodeStoreRow(*row)
 
@@ -352,17 +360,17 @@ class ISCSIDialog(GUIObject):
                     if self.iscsi.ifaces and \
                        obj.iface != self.iscsi.ifaces[node.iface]:
                         continue
-                    (rc, msg) = self.iscsi.log_into_node(node,
-                                                         username=credentials.username,
-                                                         password=credentials.password,
-                                                         r_username=credentials.rUsername,
-                                                         r_password=credentials.rPassword)
-                    if not rc:
-                        self._loginError = msg
-                        return
-
-                    self._update_devicetree = True
-                    row[1] = False
+                    selected.append((row, node))
+
+        results = iscsi_login_nodes(self.iscsi, [(node, kwargs) for (_row, node) in selected])
+        for ((row, _node), (rc, msg)) in zip(selected, results):
+            if not rc:
+                if not self._loginError:
+                    self._loginError = msg
+                continue
+
+            self._update_devicetree = True
+            row[1] = False
 
     def _check_login(self, *args):
         if threadMgr.get(constants.THREAD_ISCSI_LOGIN):
@@ -64,6 +64,7 @@ from blivet.devicelibs import mdraid
 from blivet.devices import LUKSDevice
 
 from pyanaconda.storage_utils import get_supported_raid_levels, ui_storage_logger
+from pyanaconda.storage_utils import free_space_index
 
 from pyanaconda.ui.communication import hubQ
 from pyanaconda.ui.gui.spokes import NormalSpoke
@@ -313,7 +314,7 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
 
     @property
     def _currentFreeInfo(self):
-        return self._storage_playground.getFreeSpace(clearPartType=CLEARPART_TYPE_NONE)
+        return free_space_index(self._storage_playground, CLEARPART_TYPE_NONE).getFreeSpace()
 
     def _setCurrentFreeSpace(self):
         """Add up all the free space on selected disks and return it as a Size."""
@@ -355,8 +356,30 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
         for disk in reversed(self._hidden_disks):
             self._storage_playground.devicetree.unhide(disk)
 
+    def _copy_storage(self):
+        """Copy the storage for use as the playground.
+
+           The devices hidden in the device tree (the disks that are not
+           selected or are ignored and everything on them) cannot be touched
+           from this spoke, so instead of deep-copying them, the playground
+           shares them with the real device tree. On systems with many LUNs
+           those are the majority of the devices.
+        """
+        devicetree = self.storage.devicetree
+        hidden = devicetree._hidden
+        devicetree._hidden = []
+        try:
+            playground = self.storage.copy()
+        finally:
+            devicetree._hidden = hidden
+
+        # the list itself must not be shared, the playground hides and
+        # unhides devices on its own
+        playground.devicetree._hidden = hidden[:]
+        return playground
+
     def _reset_storage(self):
-        self._storage_playground = self.storage.copy()
+        self._storage_playground = self._copy_storage()
         self._hide_unusable_disks()
         self._devices = self._storage_playground.devices
 
@@ -386,11 +409,7 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
         if not self._current_selector:
             return None
 
-        for page in self._accordion.allPages:
-            if self._current_selector in page.members:
-                return page
-
-        return None
+        return self._accordion.pageForSelector(self._current_selector)
 
     def _clear_current_selector(self):
         """ If something is selected, deselect it
@@ -435,10 +454,11 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
         self._accordion.removeAllPages()
 
         new_devices = self.get_new_devices()
+        unused_devices = self.unusedDevices
 
         # Now it's time to populate the accordion.
         log.debug("ui: devices=%s", [d.name for d in self._devices])
-        log.debug("ui: unused=%s", [d.name for d in self.unusedDevices])
+        log.debug("ui: unused=%s", [d.name for d in unused_devices])
         log.debug("ui: new_devices=%s", [d.name for d in new_devices])
 
         ui_roots = self._storage_playground.roots[:]
@@ -462,26 +482,28 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
             mounts = dict((d.format.mountpoint, d) for d in new_devices
                                 if getattr(d.format, "mountpoint", None))
 
+            bootloader_devices = set(self.bootLoaderDevices)
             for device in new_devices:
-                if device in self.bootLoaderDevices:
+                if device in bootloader_devices:
                     mounts[device.format.type] = device
 
             new_root = Root(mounts=mounts, swaps=swaps, name=translated_new_install_name())
             ui_roots.insert(0, new_root)
 
         # Add in all the existing (or autopart-created) operating systems.
+        devices = set(self._devices)
         for root in ui_roots:
             # Don't make a page if none of the root's devices are left.
             # Also, only include devices in an old page if the format is intact.
             if not any(d for d in root.swaps + root.mounts.values()
-                        if d in self._devices and d.disks and
+                        if d in devices and d.disks and
                            (root.name == translated_new_install_name() or d.format.exists)):
                 continue
 
             page = Page(root.name)
 
             for (mountpoint, device) in root.mounts.iteritems():
-                if device not in self._devices or \
+                if device not in devices or \
                    not device.disks or \
                    (root.name != translated_new_install_name() and not device.format.exists):
                     continue
@@ -491,7 +513,7 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
                 selector.root = root
 
             for device in root.swaps:
-                if device not in self._devices or \
+                if device not in devices or \
                    (root.name != translated_new_install_name() and not device.format.exists):
                     continue
 
@@ -502,10 +524,10 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
             self._accordion.addPage(page, cb=self.on_page_clicked)
 
         # Anything that doesn't go with an OS we understand?  Put it in the Other box.
-        if self.unusedDevices:
+        if unused_devices:
             page = UnknownPage(_("Unknown"))
 
-            for u in sorted(self.unusedDevices, key=lambda d: d.name):
+            for u in sorted(unused_devices, key=lambda d: d.name):
                 page.addSelector(u, self.on_selector_clicked)
 
             page.show_all()
@@ -565,11 +587,8 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
         devices = [device]
         if not page.members:
             # remove the CreateNewPage and replace it with a regular Page
-            expander = self._accordion._find_by_title(translated_new_install_name())
-            expander.remove(expander.get_child())
-
             page = Page(translated_new_install_name())
-            expander.add(page)
+            self._accordion.replacePage(translated_new_install_name(), page)
 
             # also pull in biosboot and prepboot that are on our boot disk
             devices.extend(self.bootLoaderDevices)
@@ -599,23 +618,30 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
                                selector=selector)
 
     def _update_device_in_selectors(self, old_device, new_device):
-        for s in self._accordion.allSelectors:
-            if s._device == old_device:
-                selectorFromDevice(new_device, selector=s)
+        for s in self._accordion.selectorsForDevice(old_device):
+            selectorFromDevice(new_device, selector=s)
 
     def _update_all_devices_in_selectors(self):
-        for s in self._accordion.allSelectors:
-            replaced = False
-            for new_device in self._storage_playground.devices:
-                if ((s._device.name == new_device.name) or
-                    (getattr(s._device, "req_name", 1) == getattr(new_device, "req_name", 2)) and
-                    s._device.type == new_device.type and
-                    s._device.format.type == new_device.format.type):
-                    selectorFromDevice(new_device, selector=s)
-                    replaced = True
-                    break
+        # index the new devices by name and by request name, type and format
+        # type, the first matching device in the list wins
+        by_name = {}
+        by_request = {}
+        for (i, new_device) in enumerate(self._storage_playground.devices):
+            by_name.setdefault(new_device.name, (i, new_device))
+            if hasattr(new_device, "req_name"):
+                key = (new_device.req_name, new_device.type, new_device.format.type)
+                by_request.setdefault(key, (i, new_device))
 
-            if not replaced:
+        for s in self._accordion.allSelectors:
+            matches = [by_name.get(s._device.name)]
+            if hasattr(s._device, "req_name"):
+                key = (s._device.req_name, s._device.type, s._device.format.type)
+                matches.append(by_request.get(key))
+
+            matches = [m for m in matches if m is not None]
+            if matches:
+                selectorFromDevice(min(matches)[1], selector=s)
+            else:
                 log.warning("failed to replace device: %s", s._device)
 
     def _save_right_side(self, selector):
@@ -1012,9 +1038,8 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
                 log.debug("target size: %s", device.targetSize)
 
                 # update the selector's size property
-                for s in self._accordion.allSelectors:
-                    if s._device == device:
-                        s.size = str(device.size)
+                for s in self._accordion.selectorsForDevice(device):
+                    s.size = str(device.size)
 
                 # update size props of all btrfs devices' selectors
                 self._update_selectors()
@@ -1040,7 +1065,7 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
                         self._devices.remove(device)
                         old_device = device
                         device = device.slave
-                        selector.device = device
+                        selectorFromDevice(device, selector=selector)
                         self._update_device_in_selectors(old_device, device)
                 elif encrypted:
                     log.info("applying encryption to %s", device.name)
@@ -1053,7 +1078,7 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
                         self._storage_playground.createDevice(luks_dev)
                         self._devices.append(luks_dev)
                         device = luks_dev
-                        selector.device = device
+                        selectorFromDevice(device, selector=selector)
                         self._update_device_in_selectors(old_device, device)
 
                 self._devices = self._storage_playground.devices
@@ -1079,8 +1104,12 @@ class CustomPartitioningSpoke(NormalSpoke, StorageChecker):
                 else:
                     # first, remove this selector from any old install page(s)
                     new_selector = None
-                    for (page, _selector) in self._accordion.allMembers:
-                        if _selector.device in (device, old_device):
+                    selectors = self._accordion.selectorsForDevice(device)
+                    if old_device:
+                        selectors += self._accordion.selectorsForDevice(old_device)
+                    for _selector in selectors:
+                        page = self._accordion.pageForSelector(_selector)
+                        if page:
                             if page.pageTitle == translated_new_install_name():
                                 new_selector = _selector
                                 continue
@@ -33,6 +33,7 @@ from pyanaconda.ui.gui.utils import enlightbox, gtk_action_nowait, gtk_call_once
 
 from pyanaconda.i18n import _, CN_
 from pyanaconda.timezone import NTP_SERVICE, get_all_regions_and_timezones, is_valid_timezone
+from pyanaconda.timezone import timezoneCatalog
 from pyanaconda.localization import get_xlated_timezone
 from pyanaconda import iutil
 from pyanaconda import isys
@@ -45,9 +46,7 @@ from pyanaconda.threads import threadMgr, AnacondaThread
 
 import datetime
 import os
-import re
 import threading
-import locale as locale_mod
 
 __all__ = ["DatetimeSpoke"]
 
@@ -57,60 +56,6 @@ SERVER_QUERY = 2
 
 DEFAULT_TZ = "America/New_York"
 
-SPLIT_NUMBER_SUFFIX_RE = re.compile(r'([^0-9]*)([-+])([0-9]+)')
-
-def _compare_regions(reg_xlated1, reg_xlated2):
-    """Compare two pairs of regions and their translations."""
-
-    reg1, xlated1 = reg_xlated1
-    reg2, xlated2 = reg_xlated2
-
-    # sort the Etc timezones to the end
-    if reg1 == "Etc" and reg2 == "Etc":
-        return 0
-    elif reg1 == "Etc":
-        return 1
-    elif reg2 == "Etc":
-        return -1
-    else:
-        # otherwise compare the translated names
-        return locale_mod.strcoll(xlated1, xlated2)
-
-def _compare_cities(city_xlated1, city_xlated2):
-    """Compare two paris of cities and their translations."""
-
-    # if there are "cities" ending with numbers (like GMT+-X), we need to sort
-    # them based on their numbers
-    val1 = city_xlated1[1]
-    val2 = city_xlated2[1]
-
-    match1 = SPLIT_NUMBER_SUFFIX_RE.match(val1)
-    match2 = SPLIT_NUMBER_SUFFIX_RE.match(val2)
-
-    if match1 is None and match2 is None:
-        # no +-X suffix, just compare the strings
-        return locale_mod.strcoll(val1, val2)
-
-    if match1 is None or match2 is None:
-        # one with the +-X suffix, compare the prefixes
-        if match1:
-            prefix, _sign, _suffix = match1.groups()
-            return locale_mod.strcoll(prefix, val2)
-        else:
-            prefix, _sign, _suffix = match2.groups()
-            return locale_mod.strcoll(val1, prefix)
-
-    # both have the +-X suffix
-    prefix1, sign1, suffix1 = match1.groups()
-    prefix2, sign2, suffix2 = match2.groups()
-
-    if prefix1 == prefix2:
-        # same prefixes, let signs determine
-        return cmp(int(sign1 + suffix1), int(sign2 + suffix2))
-    else:
-        # compare prefixes
-        return locale_mod.strcoll(prefix1, prefix2)
-
 class NTPconfigDialog(GUIObject):
     builderObjects = ["ntpConfigDialog", "addImage", "serversStore"]
     mainWidgetName = "ntpConfigDialog"
@@ -420,15 +365,11 @@ class DatetimeSpoke(FirstbootSpokeMixIn, NormalSpoke):
         for year in xrange(1990, 2051):
             self.add_to_store(self._yearsStore, year)
 
-        cities = set()
-        xlated_regions = ((region, get_xlated_timezone(region))
-                          for region in self._regions_zones.iterkeys())
-        for region, xlated in sorted(xlated_regions, cmp=_compare_regions):
+        (regions, cities) = timezoneCatalog.sorted_xlated()
+        for region, xlated in regions:
             self.add_to_store_xlated(self._regionsStore, region, xlated)
-            for city in self._regions_zones[region]:
-                cities.add((city, get_xlated_timezone(city)))
 
-        for city, xlated in sorted(cities, cmp=_compare_cities):
+        for city, xlated in cities:
             self.add_to_store_xlated(self._citiesStore, city, xlated)
 
         self._update_datetime_timer_id = None
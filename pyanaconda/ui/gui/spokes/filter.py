@@ -45,6 +45,89 @@ DiskStoreRow = namedtuple("DiskStoreRow", ["visible", "selected", "mutable",
                                            "wwid", "paths", "port", "target",
                                            "lun", "ccw"])
 
+# attributes of a disk used for filtering, precomputed when the disk is
+# indexed so that filtering doesn't need to touch the device objects
+DiskInfo = namedtuple("DiskInfo", ["name", "page", "vendor", "bus", "wwid",
+                                   "port", "tpgt", "initiator", "fcp_lun",
+                                   "byPath"])
+
+NAME_COLUMN = DiskStoreRow._fields.index("name")
+SELECTED_COLUMN = DiskStoreRow._fields.index("selected")
+
+def _by_path_link(disk):
+    for link in disk.deviceLinks:
+        if "by-path" in link:
+            return link
+
+    return None
+
+class DiskIndex(object):
+    """Index of the attributes used for filtering of the disks shown on the
+       filter spoke, keyed by disk name.
+
+       The index is updated incrementally -- only the disks that were not
+       indexed before (or were replaced by a new device object) are inspected
+       when the index is updated.
+    """
+    def __init__(self, pages):
+        """
+           :param pages: the pages the disks are classified into, a disk
+                         belongs to the first page whose ismember method
+                         accepts it
+           :type pages: list of FilterPage
+        """
+        self._pages = pages
+        self._disks = {}
+        self._infos = {}
+
+    def update(self, disks):
+        """Update the index to contain exactly the given disks."""
+        names = set(disk.name for disk in disks)
+        for name in [n for n in self._disks if n not in names]:
+            del self._disks[name]
+            del self._infos[name]
+
+        for disk in disks:
+            if self._disks.get(disk.name) is not disk:
+                self._disks[disk.name] = disk
+                self._infos[disk.name] = self._info(disk)
+
+    def _info(self, disk):
+        page = None
+        for p in self._pages:
+            if p.ismember(disk):
+                page = p
+                break
+
+        byPath = _by_path_link(disk)
+        if byPath:
+            identifier = byPath[byPath.rindex("/")+1:]
+        else:
+            identifier = disk.name
+
+        if hasattr(disk, "node"):
+            port = disk.node.port
+            tpgt = disk.node.tpgt
+        else:
+            port = None
+            tpgt = None
+
+        return DiskInfo(name=disk.name, page=page, vendor=disk.vendor,
+                        bus=disk.bus, wwid=getattr(disk, "wwid", identifier),
+                        port=port, tpgt=tpgt,
+                        initiator=getattr(disk, "initiator", ""),
+                        fcp_lun=getattr(disk, "fcp_lun", None),
+                        byPath=byPath)
+
+    def __getitem__(self, name):
+        return self._infos[name]
+
+    def __contains__(self, name):
+        return name in self._infos
+
+    def infos(self):
+        return self._infos.itervalues()
+
 class FilterPage(object):
     """A FilterPage is the logic behind one of the notebook tabs on the filter
        UI spoke.  Each page has its own specific filtered model overlaid on top
@@ -68,7 +151,7 @@ class FilterPage(object):
            builder      -- A reference to the Gtk.Builder instance containing
                            this page's UI elements.
            filterActive -- Whether the user has chosen to filter results down
-                           on this page.  If set, visible_func should take the
+                           on this page.  If set, visible should take the
                            filter UI elements into account.
            storage      -- An instance of a blivet object.
         """
@@ -78,6 +161,9 @@ class FilterPage(object):
 
         self.filterActive = False
 
+        # names of the disks visible on this page
+        self._visible = set()
+
     def ismember(self, device):
         """Does device belong on this page?  This function should taken into
            account what kind of thing device is.  It should not be concerned
@@ -86,6 +172,13 @@ class FilterPage(object):
         """
         return True
 
+    def row(self, disk, selected):
+        """Return the row of the master store (see DiskStoreRow) for a disk
+           that belongs on this page or None if the page doesn't add its disks
+           to the store.
+        """
+        return None
+
     def setup(self, store, selectedNames, disks):
         """Do whatever setup of the UI is necessary before this page can be
            displayed.  This function is called every time the filter spoke
@@ -96,8 +189,9 @@ class FilterPage(object):
            or via kickstart), and a list of all disk objects that belong on this
            page as determined from the ismember method.
 
-           At the least, this method should add all the disks to the store.  It
-           may also need to populate combos and other lists as appropriate.
+           The rows of the disks are added to the store by the spoke (see the
+           row method), so this method only needs to populate combos and other
+           lists as appropriate.
         """
         pass
 
@@ -107,19 +201,41 @@ class FilterPage(object):
         """
         pass
 
-    def visible_func(self, model, itr, *args):
-        """This method is called for every row (disk) in the store, in order to
-           determine if it should be displayed on this page or not.  This method
-           should take into account whether filterActive is set, perhaps whether
-           something in pyanaconda.flags is setup, and other settings to make
-           a final decision.  Because filtering can be complicated, many pages
-           will want to farm this decision out to another method.
-
-           The return value is a boolean indicating whether the row is visible
+    def visible(self, info):
+        """This method is called for every indexed disk when the page is
+           refiltered, in order to determine if it should be displayed on this
+           page or not.  This method should take into account whether
+           filterActive is set, perhaps whether something in pyanaconda.flags
+           is setup, and other settings to make a final decision.  Because
+           filtering can be complicated, many pages will want to farm this
+           decision out to another method.
+
+           The info argument is the DiskInfo of the disk from the DiskIndex.
+           The return value is a boolean indicating whether the disk is visible
            or not.
         """
         return True
 
+    def update_visible(self, index):
+        """Compute the set of disks visible on this page from the current
+           filter settings.  The model's visible_func only looks the rows up
+           in this set, so the filter settings are evaluated once per disk,
+           not once per row and row change.
+        """
+        self._visible = set(info.name for info in index.infos()
+                            if self.visible(info))
+
+    def refilter(self, index):
+        """Update the set of visible disks and refilter the model."""
+        self.update_visible(index)
+        self.model.refilter()
+
+    def visible_func(self, model, itr, *args):
+        """This method is called for every row (disk) in the store, in order to
+           determine if it should be displayed on this page or not.
+        """
+        return model[itr][NAME_COLUMN] in self._visible
+
     def setupCombo(self, combo, items):
         """Populate a given GtkComboBoxText instance with a list of items.  The
            combo will first be cleared, so this method is suitable for calling
@@ -137,10 +253,10 @@ class FilterPage(object):
         # identifier, but blivet doesn't expose that in any useful way and I don't
         # want to go asking udev.  Instead, we dig around in the deviceLinks and
         # default to the name if we can't figure anything else out.
-        for link in disk.deviceLinks:
-            if "by-path" in link:
-                lastSlash = link.rindex("/")+1
-                return link[lastSlash:]
+        link = _by_path_link(disk)
+        if link:
+            lastSlash = link.rindex("/")+1
+            return link[lastSlash:]
 
         return disk.name
 
@@ -174,31 +290,28 @@ class SearchPage(FilterPage):
         self._targetEntry.set_text("")
         self._wwidEntry.set_text("")
 
-    def _port_equal(self, device):
-        active = self._portCombo.get_active_text()
-        if active and hasattr(device, "node"):
-            return device.node.port == active
+    def _port_equal(self, info, active):
+        if active and info.port is not None:
+            return info.port == active
         else:
             return True
 
-    def _target_equal(self, device):
-        active = self._targetEntry.get_text().strip()
+    def _target_equal(self, info, active):
         if active:
-            return active in getattr(device, "initiator", "")
+            return active in info.initiator
         else:
             return True
 
-    def _lun_equal(self, device):
-        active = self._lunEntry.get_text().strip()
-        if active and hasattr(device, "node"):
+    def _lun_equal(self, info, active):
+        if active and info.tpgt is not None:
             try:
-                return int(active) == device.node.tpgt
+                return int(active) == info.tpgt
             except ValueError:
                 return True
         else:
             return True
 
-    def _filter_func(self, device):
+    def _filter_func(self, info):
         if not self.filterActive:
             return True
 
@@ -207,16 +320,16 @@ class SearchPage(FilterPage):
         if filterBy == 0:
             return True
         elif filterBy == 1:
-            return self._port_equal(device) and self._target_equal(device) and self._lun_equal(device)
+            return self._port_equal(info, self._portCombo.get_active_text()) and \
+                   self._target_equal(info, self._targetEntry.get_text().strip()) and \
+                   self._lun_equal(info, self._lunEntry.get_text().strip())
         elif filterBy == 2:
-            return self._wwidEntry.get_text() in getattr(device, "wwid", self._long_identifier(device))
+            return self._wwidEntry.get_text() in info.wwid
         elif filterBy == 3:
-            return hasattr(device, "fcp_lun") and self._lunEntry.get_text() in device.fcp_lun
+            return info.fcp_lun is not None and self._lunEntry.get_text() in info.fcp_lun
 
-    def visible_func(self, model, itr, *args):
-        obj = DiskStoreRow(*model[itr])
-        device = self.storage.devicetree.getDeviceByName(obj.name, hidden=True)
-        return self._filter_func(device)
+    def visible(self, info):
+        return self._filter_func(info)
 
 class MultipathPage(FilterPage):
     def __init__(self, storage, builder):
@@ -232,24 +345,17 @@ class MultipathPage(FilterPage):
     def ismember(self, device):
         return isinstance(device, MultipathDevice)
 
-    def setup(self, store, selectedNames, disks):
-        vendors = []
-        interconnects = []
+    def row(self, disk, selected):
+        paths = [d.name for d in disk.parents]
+        return [True, selected, not disk.protected,
+                disk.name, "", disk.model, str(disk.size),
+                disk.vendor, disk.bus, disk.serial,
+                disk.wwid, "\n".join(paths), "", "",
+                "", ""]
 
-        for disk in disks:
-            paths = [d.name for d in disk.parents]
-            selected = disk.name in selectedNames
-
-            store.append([True, selected, not disk.protected,
-                          disk.name, "", disk.model, str(disk.size),
-                          disk.vendor, disk.bus, disk.serial,
-                          disk.wwid, "\n".join(paths), "", "",
-                          "", ""])
-            if not disk.vendor in vendors:
-                vendors.append(disk.vendor)
-
-            if not disk.bus in interconnects:
-                interconnects.append(disk.bus)
+    def setup(self, store, selectedNames, disks):
+        vendors = set(disk.vendor for disk in disks)
+        interconnects = set(disk.bus for disk in disks)
 
         self._combo.set_active(0)
         self._combo.emit("changed")
@@ -262,7 +368,7 @@ class MultipathPage(FilterPage):
         self._vendorCombo.set_active(0)
         self._wwidEntry.set_text("")
 
-    def _filter_func(self, device):
+    def _filter_func(self, info):
         if not self.filterActive:
             return True
 
@@ -271,19 +377,17 @@ class MultipathPage(FilterPage):
         if filterBy == 0:
             return True
         elif filterBy == 1:
-            return device.vendor == self._vendorCombo.get_active_text()
+            return info.vendor == self._vendorCombo.get_active_text()
         elif filterBy == 2:
-            return device.bus == self._icCombo.get_active_text()
+            return info.bus == self._icCombo.get_active_text()
         elif filterBy == 3:
-            return self._wwidEntry.get_text() in device.wwid
+            return self._wwidEntry.get_text() in info.wwid
 
-    def visible_func(self, model, itr, *args):
+    def visible(self, info):
         if not flags.mpath:
             return False
 
-        obj = DiskStoreRow(*model[itr])
-        device = self.storage.devicetree.getDeviceByName(obj.name, hidden=True)
-        return self.ismember(device) and self._filter_func(device)
+        return info.page is self and self._filter_func(info)
 
 class OtherPage(FilterPage):
     def __init__(self, storage, builder):
@@ -299,31 +403,23 @@ class OtherPage(FilterPage):
     def ismember(self, device):
         return isinstance(device, iScsiDiskDevice) or isinstance(device, FcoeDiskDevice)
 
-    def setup(self, store, selectedNames, disks):
-        vendors = []
-        interconnects = []
-
-        for disk in disks:
-            selected = disk.name in selectedNames
-
-            if hasattr(disk, "node"):
-                port = str(disk.node.port)
-                lun = str(disk.node.tpgt)
-            else:
-                port = ""
-                lun = ""
-
-            store.append([True, selected, not disk.protected,
-                          disk.name, "", disk.model, str(disk.size),
-                          disk.vendor, disk.bus, disk.serial,
-                          self._long_identifier(disk), "", port, getattr(disk, "initiator", ""),
-                          lun, ""])
+    def row(self, disk, selected):
+        if hasattr(disk, "node"):
+            port = str(disk.node.port)
+            lun = str(disk.node.tpgt)
+        else:
+            port = ""
+            lun = ""
 
-            if not disk.vendor in vendors:
-                vendors.append(disk.vendor)
+        return [True, selected, not disk.protected,
+                disk.name, "", disk.model, str(disk.size),
+                disk.vendor, disk.bus, disk.serial,
+                self._long_identifier(disk), "", port, getattr(disk, "initiator", ""),
+                lun, ""]
 
-            if not disk.bus in interconnects:
-                interconnects.append(disk.bus)
+    def setup(self, store, selectedNames, disks):
+        vendors = set(disk.vendor for disk in disks)
+        interconnects = set(disk.bus for disk in disks)
 
         self._combo.set_active(0)
         self._combo.emit("changed")
@@ -336,7 +432,7 @@ class OtherPage(FilterPage):
         self._idEntry.set_text("")
         self._vendorCombo.set_active(0)
 
-    def _filter_func(self, device):
+    def _filter_func(self, info):
         if not self.filterActive:
             return True
 
@@ -345,20 +441,17 @@ class OtherPage(FilterPage):
         if filterBy == 0:
             return True
         elif filterBy == 1:
-            return device.vendor == self._vendorCombo.get_active_text()
+            return info.vendor == self._vendorCombo.get_active_text()
         elif filterBy == 2:
-            return device.bus == self._icCombo.get_active_text()
+            return info.bus == self._icCombo.get_active_text()
         elif filterBy == 3:
-            for link in device.deviceLinks:
-                if "by-path" in link:
-                    return self._idEntry.get_text().strip() in link
+            if info.byPath:
+                return self._idEntry.get_text().strip() in info.byPath
 
             return False
 
-    def visible_func(self, model, itr, *args):
-        obj = DiskStoreRow(*model[itr])
-        device = self.storage.devicetree.getDeviceByName(obj.name, hidden=True)
-        return self.ismember(device) and self._filter_func(device)
+    def visible(self, info):
+        return info.page is self and self._filter_func(info)
 
 class RaidPage(FilterPage):
     def __init__(self, storage, builder):
@@ -369,13 +462,11 @@ class RaidPage(FilterPage):
     def ismember(self, device):
         return isinstance(device, MDRaidArrayDevice) and device.isDisk
 
-    def visible_func(self, model, itr, *args):
+    def visible(self, info):
         if not flags.dmraid:
             return False
 
-        obj = DiskStoreRow(*model[itr])
-        device = self.storage.devicetree.getDeviceByName(obj.name, hidden=True)
-        return self.ismember(device)
+        return info.page is self
 
 class ZPage(FilterPage):
     def __init__(self, storage, builder):
@@ -392,10 +483,8 @@ class ZPage(FilterPage):
         if not self._isS390:
             return
 
-    def visible_func(self, model, itr, *args):
-        obj = DiskStoreRow(*model[itr])
-        device = self.storage.devicetree.getDeviceByName(obj.name, hidden=True)
-        return self.ismember(device)
+    def visible(self, info):
+        return info.page is self
 
 class FilterSpoke(NormalSpoke):
     builderObjects = ["diskStore", "filterWindow",
@@ -411,10 +500,14 @@ class FilterSpoke(NormalSpoke):
         NormalSpoke.__init__(self, *args)
         self.applyOnSkip = True
 
-        self.ancestors = []
+        self.ancestors = set()
         self.disks = []
         self.selected_disks = []
 
+        self._index = None
+        # disk name -> iter of its row in the master store
+        self._storeIters = {}
+
     @property
     def indirect(self):
         return True
@@ -454,11 +547,41 @@ class FilterSpoke(NormalSpoke):
         self._store = self.builder.get_object("diskStore")
         self._addDisksButton = self.builder.get_object("addDisksButton")
 
+        self._index = DiskIndex(self.pages[1:])
+
     def _real_ancestors(self, disk):
         # Return a list of all the ancestors of a disk, but remove the disk
         # itself from this list.
         return [d for d in disk.ancestors if d.name != disk.name]
 
+    def _update_store(self, disks):
+        """Update the master store to contain the rows of the given disks.
+
+           Only the rows that changed are touched, the rows of the disks that
+           are still present are updated in place and new rows are appended.
+        """
+        selected = set(self.selected_disks)
+        rows = {}
+        for disk in disks:
+            page = self._index[disk.name].page
+            row = page.row(disk, disk.name in selected) if page else None
+            if row is not None:
+                rows[disk.name] = row
+
+        for name in [n for n in self._storeIters if n not in rows]:
+            self._store.remove(self._storeIters.pop(name))
+
+        for disk in disks:
+            row = rows.get(disk.name)
+            if row is None:
+                continue
+
+            itr = self._storeIters.get(disk.name)
+            if itr is None:
+                self._storeIters[disk.name] = self._store.append(row)
+            elif list(self._store[itr]) != row:
+                self._store[itr] = row
+
     def refresh(self):
         NormalSpoke.refresh(self)
 
@@ -466,38 +589,35 @@ class FilterSpoke(NormalSpoke):
         self.selected_disks = self.data.ignoredisk.onlyuse[:]
 
         self.ancestors = itertools.chain(*map(self._real_ancestors, self.disks))
-        self.ancestors = map(lambda d: d.name, self.ancestors)
-
-        self._store.clear()
-
-        allDisks = []
-        multipathDisks = []
-        otherDisks = []
-        raidDisks = []
-        zDisks = []
+        self.ancestors = set(d.name for d in self.ancestors)
 
         # Now all all the non-local disks to the store.  Everything has been set up
-        # ahead of time, so there's no need to configure anything.  We first make
-        # these lists of disks, then call setup on each individual page.  This is
+        # ahead of time, so there's no need to configure anything.  We first index
+        # these disks, then call setup on each individual page.  This is
         # because there could be page-specific setup to do that requires a complete
         # view of all the disks on that page.
-        for disk in itertools.ifilterfalse(isLocalDisk, self.disks):
-            if self.pages[1].ismember(disk):
-                multipathDisks.append(disk)
-            elif self.pages[2].ismember(disk):
-                otherDisks.append(disk)
-            elif self.pages[3].ismember(disk):
-                raidDisks.append(disk)
-            elif self.pages[4].ismember(disk):
-                zDisks.append(disk)
-
-            allDisks.append(disk)
+        allDisks = list(itertools.ifilterfalse(isLocalDisk, self.disks))
+        self._index.update(allDisks)
+
+        pageDisks = dict((page, []) for page in self.pages)
+        for disk in allDisks:
+            page = self._index[disk.name].page
+            if page:
+                pageDisks[page].append(disk)
 
         self.pages[0].setup(self._store, self.selected_disks, allDisks)
-        self.pages[1].setup(self._store, self.selected_disks, multipathDisks)
-        self.pages[2].setup(self._store, self.selected_disks, otherDisks)
-        self.pages[3].setup(self._store, self.selected_disks, raidDisks)
-        self.pages[4].setup(self._store, self.selected_disks, zDisks)
+        for page in self.pages[1:]:
+            page.setup(self._store, self.selected_disks, pageDisks[page])
+
+        # compute the visible disks first, so that the rows added to the store
+        # are filtered right away
+        for page in self.pages:
+            page.update_visible(self._index)
+
+        self._update_store(allDisks)
+
+        for page in self.pages:
+            page.model.refilter()
 
         self._update_summary()
 
@@ -540,16 +660,16 @@ class FilterSpoke(NormalSpoke):
     def on_find_clicked(self, button):
         n = self._notebook.get_current_page()
         self.pages[n].filterActive = True
-        self.pages[n].model.refilter()
+        self.pages[n].refilter(self._index)
 
     def on_clear_clicked(self, button):
         n = self._notebook.get_current_page()
         self.pages[n].filterActive = False
-        self.pages[n].model.refilter()
+        self.pages[n].refilter(self._index)
         self.pages[n].clear()
 
     def on_page_switched(self, notebook, newPage, newPageNum, *args):
-        self.pages[newPageNum].model.refilter()
+        self.pages[newPageNum].refilter(self._index)
         notebook.get_nth_page(newPageNum).show_all()
 
     def on_row_toggled(self, button, path):
@@ -557,14 +677,16 @@ class FilterSpoke(NormalSpoke):
             return
 
         itr = self._store.get_iter(path)
-        self._store[itr][1] = not self._store[itr][1]
+        self._store[itr][SELECTED_COLUMN] = not self._store[itr][SELECTED_COLUMN]
 
-        if self._store[itr][1] and self._store[itr][3] not in self.selected_disks:
-            self.selected_disks.append(self._store[itr][3])
-        elif not self._store[itr][1] and self._store[itr][3] in self.selected_disks:
-            self.selected_disks.remove(self._store[itr][3])
+        name = self._store[itr][NAME_COLUMN]
+        if self._store[itr][SELECTED_COLUMN] and name not in self.selected_disks:
+            self.selected_disks.append(name)
+        elif not self._store[itr][SELECTED_COLUMN] and name in self.selected_disks:
+            self.selected_disks.remove(name)
 
-        self.refresh()
+        # only the toggled row changed, there's no need to rebuild the store
+        self._update_summary()
 
     def on_add_iscsi_clicked(self, widget, *args):
         dialog = ISCSIDialog(self.data, self.storage)
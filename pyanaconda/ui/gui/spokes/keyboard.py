@@ -26,14 +26,13 @@ from pyanaconda.ui.gui import GUIObject
 from pyanaconda.ui.gui.spokes import NormalSpoke
 from pyanaconda.ui.gui.categories.localization import LocalizationCategory
 from pyanaconda.ui.gui.utils import enlightbox, gtk_call_once, escape_markup, gtk_batch_map, timed_action
+from pyanaconda.ui.gui.utils import gtk_action_wait, CancellationToken
 from pyanaconda import keyboard
 from pyanaconda import flags
 from pyanaconda.i18n import _, N_, CN_
 from pyanaconda.constants import DEFAULT_KEYBOARD, THREAD_KEYBOARD_INIT, THREAD_ADD_LAYOUTS_INIT
 from pyanaconda.ui.communication import hubQ
-from pyanaconda.iutil import strip_accents
 from pyanaconda.threads import threadMgr, AnacondaThread
-from pyanaconda.iutil import have_word_match
 
 import locale as locale_mod
 
@@ -58,8 +57,7 @@ def _show_description(column, renderer, model, itr, wrapper):
     renderer.set_property("markup", value)
 
 class AddLayoutDialog(GUIObject):
-    builderObjects = ["addLayoutDialog", "newLayoutStore",
-                      "newLayoutStoreFilter", "newLayoutStoreSort"]
+    builderObjects = ["addLayoutDialog"]
     mainWidgetName = "addLayoutDialog"
     uiFile = "spokes/keyboard.glade"
 
@@ -67,6 +65,7 @@ class AddLayoutDialog(GUIObject):
         GUIObject.__init__(self, *args)
         self._xkl_wrapper = keyboard.XklWrapper.get_instance()
         self._chosen_layouts = []
+        self._cancel_token = CancellationToken()
 
     def matches_entry(self, model, itr, user_data=None):
         entry_text = self._entry.get_text()
@@ -74,14 +73,8 @@ class AddLayoutDialog(GUIObject):
             # everything matches empty string
             return True
 
-        value = model[itr][0]
-        eng_value = self._xkl_wrapper.get_layout_variant_description(value, xlated=False)
-        xlated_value = self._xkl_wrapper.get_layout_variant_description(value)
-        translit_value = strip_accents(xlated_value).lower()
-        translit_text = strip_accents(unicode(entry_text, "utf-8")).lower()
-
-        return have_word_match(entry_text, eng_value) or have_word_match(entry_text, xlated_value) \
-            or have_word_match(translit_text, translit_value)
+        # the search result is cached for the last searched text
+        return model[itr][0] in self._xkl_wrapper.search_layouts(entry_text)
 
     def compare_layouts(self, model, itr1, itr2, user_data=None):
         """
@@ -110,25 +103,41 @@ class AddLayoutDialog(GUIObject):
         layoutRenderer = self.builder.get_object("newLayoutRenderer")
         layoutColumn.set_cell_data_func(layoutRenderer, _show_layout,
                                             self._xkl_wrapper)
-        self._treeModelFilter = self.builder.get_object("newLayoutStoreFilter")
-        self._treeModelFilter.set_visible_func(self.matches_entry, None)
-        self._treeModelSort = self.builder.get_object("newLayoutStoreSort")
-        self._treeModelSort.set_default_sort_func(self.compare_layouts, None)
 
         self._confirmAddButton = self.builder.get_object("confirmAddButton")
         self._newLayoutSelection = self.builder.get_object("newLayoutSelection")
 
-        self._store = self.builder.get_object("newLayoutStore")
+        # the filter and sort models are created in _attach_store once the
+        # store is filled, they would process every single insertion otherwise
+        self._store = Gtk.ListStore(str)
+        self._treeModelFilter = None
+        self._treeModelSort = None
+        self._view = self.builder.get_object("newLayoutView")
         threadMgr.add(AnacondaThread(name=THREAD_ADD_LAYOUTS_INIT,
                                      target=self._initialize))
 
     def _initialize(self):
-        gtk_batch_map(self._addLayout, self._xkl_wrapper.get_available_layouts(),
-                      args=(self._store,), batch_size=20)
+        # there are hundreds of layouts, fill the store before anything uses it
+        if gtk_batch_map(self._addLayout, self._xkl_wrapper.get_available_layouts(),
+                         args=(self._store,), batch_size=20,
+                         cancel_token=self._cancel_token):
+            self._attach_store()
+
+    @gtk_action_wait
+    def _attach_store(self):
+        self._treeModelFilter = self._store.filter_new()
+        self._treeModelFilter.set_visible_func(self.matches_entry, None)
+        self._treeModelSort = Gtk.TreeModelSort(model=self._treeModelFilter)
+        self._treeModelSort.set_default_sort_func(self.compare_layouts, None)
+        self._view.set_model(self._treeModelSort)
 
     def wait_initialize(self):
         threadMgr.wait(THREAD_ADD_LAYOUTS_INIT)
 
+    def cancel_initialize(self):
+        """Stop adding the layouts, the dialog won't be used anymore."""
+        self._cancel_token.cancel()
+
     def run(self):
         self.window.show()
         rc = self.window.run()
@@ -371,6 +380,11 @@ class KeyboardSpoke(NormalSpoke):
         self._ready = True
         hubQ.send_ready(self.__class__.__name__, False)
 
+    def teardown(self):
+        # nobody is going to add any layouts now
+        if self._add_dialog:
+            self._add_dialog.cancel_initialize()
+
     def refresh(self):
         NormalSpoke.refresh(self)
 
@@ -48,6 +48,10 @@ def selectorFromDevice(device, selector=None, mountpoint=""):
        instead of creating a new one.  The optional mountpoint parameter
        allows for specifying the mountpoint if it cannot be determined from
        the device (like for a Root specifying an existing installation).
+
+       The device of a selector that is already in a Page should only be
+       changed with this method, so that the Accordion's index of selectors
+       by device stays valid.
     """
     if hasattr(device.format, "mountpoint") and device.format.mountpoint is not None:
         mp = device.format.mountpoint
@@ -61,12 +65,21 @@ def selectorFromDevice(device, selector=None, mountpoint=""):
     if not selector:
         selector = MountpointSelector(device.name, str(device.size), mp)
         selector._root = None
+        selector._page = None
+        old_device = None
     else:
         selector.props.name = device.name
         selector.props.size = str(device.size)
         selector.props.mountpoint = mp
+        old_device = selector._device
 
     selector._device = device
+
+    page = getattr(selector, "_page", None)
+    if page and page._accordion and old_device is not device:
+        page._accordion._unindexSelector(selector, old_device)
+        page._accordion._indexSelector(selector)
+
     return selector
 
 # An Accordion is a box that goes on the left side of the custom partitioning spoke.  It
@@ -78,6 +91,43 @@ class Accordion(Gtk.Box):
         Gtk.Box.__init__(self, orientation=Gtk.Orientation.VERTICAL, spacing=12)
         self._expanders = []
 
+        # id(device) -> selectors showing the device, the selectors keep
+        # references to the devices so the ids are not reused
+        self._deviceSelectors = {}
+
+    def _indexSelector(self, selector):
+        if selector._device is not None:
+            self._deviceSelectors.setdefault(id(selector._device), []).append(selector)
+
+    def _unindexSelector(self, selector, device):
+        selectors = self._deviceSelectors.get(id(device))
+        if selectors and selector in selectors:
+            selectors.remove(selector)
+            if not selectors:
+                del self._deviceSelectors[id(device)]
+
+    def _attachPage(self, contents):
+        contents._accordion = self
+        for selector in contents.members:
+            self._indexSelector(selector)
+
+    def _detachPage(self, contents):
+        for selector in contents.members:
+            self._unindexSelector(selector, selector._device)
+        contents._accordion = None
+
+    def selectorsForDevice(self, device):
+        """Return the selectors showing the given device."""
+        return list(self._deviceSelectors.get(id(device), []))
+
+    def pageForSelector(self, selector):
+        """Return the page containing the given selector or None."""
+        page = getattr(selector, "_page", None)
+        if page and page._accordion is self:
+            return page
+
+        return None
+
     def addPage(self, contents, cb=None):
         label = Gtk.Label(label="""<span size='large' weight='bold' fgcolor='black'>%s</span>""" %
                           escape_markup(contents.pageTitle), use_markup=True,
@@ -92,6 +142,8 @@ class Accordion(Gtk.Box):
         expander.connect("activate", self._onExpanded, cb)
         expander.show_all()
 
+        self._attachPage(contents)
+
     def _find_by_title(self, title):
         for e in self._expanders:
             if e.get_child().pageTitle == title:
@@ -128,15 +180,31 @@ class Accordion(Gtk.Box):
             return
 
         self._expanders.remove(target)
+        self._detachPage(target.get_child())
 
         # Then, remove it from the box.
         self.remove(target)
 
+    def replacePage(self, pageTitle, contents):
+        """Replace the contents of the page with the given title, keeping
+           its expander.
+        """
+        target = self._find_by_title(pageTitle)
+        if not target:
+            raise LookupError()
+
+        self._detachPage(target.get_child())
+        target.remove(target.get_child())
+        target.add(contents)
+        self._attachPage(contents)
+
     def removeAllPages(self):
         for e in self._expanders:
+            self._detachPage(e.get_child())
             self.remove(e)
 
         self._expanders = []
+        self._deviceSelectors = {}
 
     def _onExpanded(self, obj, cb=None):
         if cb:
@@ -165,6 +233,19 @@ class Page(Gtk.Box):
 
         self.members = []
         self.pageTitle = title
+        self._accordion = None
+
+    def _addMember(self, selector):
+        selector._page = self
+        self.members.append(selector)
+        if self._accordion:
+            self._accordion._indexSelector(selector)
+
+    def _removeMember(self, selector):
+        self.members.remove(selector)
+        selector._page = None
+        if self._accordion:
+            self._accordion._unindexSelector(selector, selector._device)
 
     def _make_category_label(self, name):
         label = Gtk.Label()
@@ -180,7 +261,7 @@ class Page(Gtk.Box):
         selector.connect("key-release-event", self._onSelectorClicked, cb)
         selector.connect("focus-in-event", self._onSelectorFocusIn, cb)
         selector.set_margin_bottom(6)
-        self.members.append(selector)
+        self._addMember(selector)
 
         if self._mountpointType(selector.props.mountpoint) == DATA_DEVICE:
             self._dataBox.add(selector)
@@ -195,7 +276,7 @@ class Page(Gtk.Box):
         else:
             self._systemBox.remove(selector)
 
-        self.members.remove(selector)
+        self._removeMember(selector)
 
     def _mountpointType(self, mountpoint):
         if not mountpoint or mountpoint in ["/", "/boot", "/boot/efi", "/tmp", "/usr", "/var",
@@ -239,20 +320,21 @@ class UnknownPage(Page):
         Gtk.Box.__init__(self, orientation=Gtk.Orientation.VERTICAL, spacing=6)
         self.members = []
         self.pageTitle = title
+        self._accordion = None
 
     def addSelector(self, device, cb, mountpoint=""):
         selector = selectorFromDevice(device, mountpoint=mountpoint)
         selector.connect("button-press-event", self._onSelectorClicked, cb)
         selector.connect("key-release-event", self._onSelectorClicked, cb)
 
-        self.members.append(selector)
+        self._addMember(selector)
         self.add(selector)
 
         return selector
 
     def removeSelector(self, selector):
         self.remove(selector)
-        self.members.remove(selector)
+        self._removeMember(selector)
 
 # This is a special Page that is displayed when no new installation has been automatically
 # created, and shows the user how to go about doing that.  The intention is that an instance
@@ -264,6 +346,7 @@ class CreateNewPage(Page):
         Gtk.Box.__init__(self, orientation=Gtk.Orientation.VERTICAL, spacing=6)
         self.members = []
         self.pageTitle = title
+        self._accordion = None
 
         # Create a box where we store the "Here's how you create a new blah" info.
         self._createBox = Gtk.Grid()
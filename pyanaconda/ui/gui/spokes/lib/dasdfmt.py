@@ -24,12 +24,11 @@ from pyanaconda.threads import threadMgr, AnacondaThread
 from pyanaconda.ui.gui import GUIObject
 from pyanaconda.ui.gui.utils import gtk_action_wait, gtk_call_once
 from pyanaconda import constants
-from pyanaconda.i18n import _
 import threading
 
+from pyanaconda.storage_utils import format_dasds, dasdfmt_progress_message
+
 from blivet import storageInitialize
-from blivet.devicelibs.dasd import format_dasd
-from blivet.errors import DasdFormatError
 
 import logging
 log = logging.getLogger("anaconda")
@@ -87,15 +86,12 @@ class DasdFormatDialog(GUIObject):
         self.window.response(2)
 
     def run_dasdfmt(self, epoch_started, *args):
-        """ Loop through our disks and run dasdfmt against them. """
-        for disk in self.to_format:
-            try:
-                gtk_call_once(self._formatting_label.set_text, _("Formatting /dev/%s. This may take a moment.") % disk)
-                format_dasd(disk)
-            except DasdFormatError as err:
-                # Log errors if formatting fails, but don't halt the installer
-                log.error(str(err))
-                continue
+        """ Run dasdfmt against our disks, several of them at once. """
+        def report_progress(formatting, done, total):
+            gtk_call_once(self._formatting_label.set_text,
+                          dasdfmt_progress_message(formatting, done, total))
+
+        format_dasds(self.to_format, report_progress)
 
         # And now to fire up the storage reinitialization.
         protectedNames = [d.name for d in self.storage.protectedDevices]
@@ -24,8 +24,7 @@ from gi.repository import GLib
 from pyanaconda.threads import threadMgr, AnacondaThread
 from pyanaconda.ui.gui import GUIObject
 from pyanaconda import constants
-
-from blivet import storageInitialize
+from pyanaconda.storage_utils import rescan_storage
 
 __all__ = ["RefreshDialog"]
 
@@ -88,8 +87,9 @@ class RefreshDialog(GUIObject):
         self._ok_button.set_sensitive(False)
         self._notebook.set_current_page(1)
 
-        # And now to fire up the storage reinitialization.
-        threadMgr.add(AnacondaThread(name=constants.THREAD_STORAGE, target=storageInitialize,
+        # And now to fire up the storage rescan.  Only the new devices are
+        # probed if possible, otherwise the storage is reinitialized.
+        threadMgr.add(AnacondaThread(name=constants.THREAD_STORAGE, target=rescan_storage,
                                      args=(self.storage, self.data, self.storage.devicetree.protectedDevNames)))
 
         self._elapsed = 0
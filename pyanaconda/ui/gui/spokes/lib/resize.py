@@ -20,13 +20,15 @@
 #
 
 from __future__ import division
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+import os
 
 from gi.repository import Gdk, Gtk
 
 from pyanaconda.i18n import _, C_, N_, P_
 from pyanaconda.ui.gui import GUIObject
 from pyanaconda.ui.gui.utils import escape_markup, timed_action
+from pyanaconda.storage_utils import free_space_index
 from blivet.size import Size
 
 __all__ = ["ResizeDialog"]
@@ -45,6 +47,12 @@ NAME_COL = 9
 TY_NORMAL = 0
 TY_FREE_SPACE = 1
 TY_PROTECTED = 2
+# child row of a disk whose partition rows were not added yet
+TY_PLACEHOLDER = 3
+
+# disks are expanded by default if they don't have more partition rows
+# than this in total, otherwise the rows are added when a disk is expanded
+EXPAND_ALL_MAX_ROWS = 100
 
 PartStoreRow = namedtuple("PartStoreRow", ["id", "desc", "fs", "reclaimable",
                                            "action", "editable", "ty",
@@ -55,6 +63,13 @@ SHRINK = N_("Shrink")
 DELETE = N_("Delete")
 NOTHING = ""
 
+# number of the reclaimable space strings kept in the cache
+RECLAIMABLE_CACHE_SIZE = 4096
+
+# (language, device id, size, resizable, minimum size) -> (reclaimable size,
+# markup), the least recently used entries are dropped first
+_reclaimableCache = OrderedDict()
+
 class ResizeDialog(GUIObject):
     builderObjects = ["actionStore", "diskStore", "resizeDialog", "resizeAdjustment"]
     mainWidgetName = "resizeDialog"
@@ -68,6 +83,16 @@ class ResizeDialog(GUIObject):
         self._initialFreeSpace = Size(bytes=0)
         self._selectedReclaimableSpace = Size(bytes=0)
 
+        # key -> reclaimable space selected for the row(s), where the key is
+        # the id of the device for rows and ("disk", id) for the partitions
+        # of a disk whose rows were not added yet
+        self._reclaim = {}
+        # disk id -> (partitions, free space) for disks not expanded yet
+        self._pendingRows = {}
+        # id -> device for all the devices in the dialog
+        self._devices = {}
+        self._mountDescriptions = {}
+
         self._actionStore = self.builder.get_object("actionStore")
         self._diskStore = self.builder.get_object("diskStore")
 
@@ -94,10 +119,8 @@ class ResizeDialog(GUIObject):
     def _description(self, part):
         # First, try to find the partition in some known Root.  If we find
         # it, return the mountpoint as the description.
-        for root in self.storage.roots:
-            for (mount, device) in root.mounts.iteritems():
-                if device == part:
-                    return "%s (%s)" % (mount, root.name)
+        if part.id in self._mountDescriptions:
+            return self._mountDescriptions[part.id]
 
         # Otherwise, fall back on increasingly vague information.
         if not part.isleaf:
@@ -115,18 +138,66 @@ class ResizeDialog(GUIObject):
         else:
             return None
 
+    def _reclaimable(self, dev):
+        """Return the reclaimable space of a partition and its markup.
+
+           The strings are cached per language, device and revision of the
+           values they are built from, so repopulating the dialog doesn't
+           format them again.
+        """
+        # the markup is translated, a language change makes it outdated
+        revision = (os.environ.get("LANG"), dev.id, int(dev.size), dev.resizable,
+                    int(dev.minSize) if dev.resizable else None)
+        cached = _reclaimableCache.pop(revision, None)
+        if cached:
+            _reclaimableCache[revision] = cached
+            return cached
+
+        # Devices that are not resizable are still deletable.
+        if dev.resizable:
+            freeSize = dev.size - dev.minSize
+            resizeString = _("%(freeSize)s of %(devSize)s") \
+                           % {"freeSize": freeSize.humanReadable(max_places=1), "devSize": dev.size.humanReadable(max_places=1)}
+        else:
+            freeSize = dev.size
+            resizeString = "<span foreground='grey'>%s</span>" % \
+                    escape_markup(_("Not resizeable"))
+
+        _reclaimableCache[revision] = (freeSize, resizeString)
+        if len(_reclaimableCache) > RECLAIMABLE_CACHE_SIZE:
+            _reclaimableCache.popitem(last=False)
+        return (freeSize, resizeString)
+
+    def _partitions(self, disk):
+        """Return the partitions of a disk that are shown in the dialog."""
+        return [dev for dev in self.storage.devicetree.getChildren(disk)
+                if not (dev.isExtended and disk.format.logicalPartitions)]
+
     def populate(self, disks):
         totalDisks = 0
         totalReclaimableSpace = Size(bytes=0)
 
         self._initialFreeSpace = Size(bytes=0)
         self._selectedReclaimableSpace = Size(bytes=0)
+        self._reclaim = {}
+        self._pendingRows = {}
+        self._devices = {}
+
+        # descriptions of the devices mounted in the known Roots, the first
+        # Root (and mountpoint) the device is found in wins
+        self._mountDescriptions = {}
+        for root in self.storage.roots:
+            for (mount, device) in root.mounts.iteritems():
+                if device is not None:
+                    self._mountDescriptions.setdefault(device.id, "%s (%s)" % (mount, root.name))
 
         canShrinkSomething = False
 
-        free_space = self.storage.getFreeSpace(disks=disks)
+        free_space = free_space_index(self.storage).getFreeSpace(disks=disks)
 
         for disk in disks:
+            self._devices[disk.id] = disk
+
             # First add the disk itself.
             editable = not disk.protected
 
@@ -148,58 +219,30 @@ class ResizeDialog(GUIObject):
                                                 int(disk.size),
                                                 disk.name])
 
+            partitions = []
             if disk.partitioned:
-                # Then add all its partitions.
-                for dev in self.storage.devicetree.getChildren(disk):
-                    if dev.isExtended and disk.format.logicalPartitions:
-                        continue
-
-                    # Devices that are not resizable are still deletable.
-                    if dev.resizable:
-                        freeSize = dev.size - dev.minSize
-                        resizeString = _("%(freeSize)s of %(devSize)s") \
-                                       % {"freeSize": freeSize.humanReadable(max_places=1), "devSize": dev.size.humanReadable(max_places=1)}
-                        if not dev.protected:
-                            canShrinkSomething = True
-                    else:
-                        freeSize = dev.size
-                        resizeString = "<span foreground='grey'>%s</span>" % \
-                                escape_markup(_("Not resizeable"))
-
-                    if dev.protected:
-                        ty = TY_PROTECTED
-                    else:
-                        ty = TY_NORMAL
-
-                    self._diskStore.append(itr, [dev.id,
-                                                 self._description(dev),
-                                                 dev.format.name,
-                                                 resizeString,
-                                                 _(PRESERVE),
-                                                 not dev.protected,
-                                                 ty,
-                                                 self._get_tooltip(dev),
-                                                 int(dev.size),
-                                                 dev.name])
+                # Then compute the reclaimable space of all its partitions.
+                # Their rows are only added once the disk row is expanded.
+                partitions = self._partitions(disk)
+                for dev in partitions:
+                    self._devices[dev.id] = dev
+                    (freeSize, _resizeString) = self._reclaimable(dev)
+                    if dev.resizable and not dev.protected:
+                        canShrinkSomething = True
+
                     diskReclaimableSpace += freeSize
 
-            # And then add another uneditable line that lists how much space is
-            # already free in the disk.
             diskFree = free_space[disk.name][0]
             if diskFree >= Size(spec="1MiB"):
-                freeSpaceString = "<span foreground='grey' style='italic'>%s</span>" % \
-                        escape_markup(_("Free space"))
-                self._diskStore.append(itr, [disk.id,
-                                             freeSpaceString,
-                                             "",
-                                             "<span foreground='grey' style='italic'>%s</span>" % escape_markup(diskFree.humanReadable(max_places=1)),
-                                             NOTHING,
-                                             False,
-                                             TY_FREE_SPACE,
-                                             self._get_tooltip(disk),
-                                             diskFree,
-                                             ""])
                 self._initialFreeSpace += diskFree
+            else:
+                diskFree = None
+
+            if partitions or diskFree is not None:
+                self._pendingRows[disk.id] = (partitions, diskFree)
+                # a placeholder row, so that the disk row can be expanded
+                self._diskStore.append(itr, [disk.id, "", "", "", NOTHING, False,
+                                             TY_PLACEHOLDER, None, 0, ""])
 
             # And then go back and fill in the total reclaimable space for the
             # disk, now that we know what each partition has reclaimable.
@@ -224,6 +267,66 @@ class ResizeDialog(GUIObject):
         self._reclaimDescLabel.set_text(description)
         self._update_reclaim_button(Size(0))
 
+    def _add_partition_rows(self, itr):
+        """Replace the placeholder row of a disk with the rows of its
+           partitions and its free space.
+        """
+        diskRow = PartStoreRow(*self._diskStore[itr])
+        if diskRow.id not in self._pendingRows:
+            return
+
+        (partitions, diskFree) = self._pendingRows.pop(diskRow.id)
+        disk = self._devices[diskRow.id]
+
+        # the partitions inherit the action chosen for the whole disk
+        diskDeleted = diskRow.action == _(DELETE)
+
+        for dev in partitions:
+            (_freeSize, resizeString) = self._reclaimable(dev)
+
+            if dev.protected:
+                ty = TY_PROTECTED
+                action = _(PRESERVE)
+            else:
+                ty = TY_NORMAL
+                action = diskRow.action
+
+            self._diskStore.append(itr, [dev.id,
+                                         self._description(dev),
+                                         dev.format.name,
+                                         resizeString,
+                                         action,
+                                         not dev.protected and not diskDeleted,
+                                         ty,
+                                         self._get_tooltip(dev),
+                                         int(dev.size),
+                                         dev.name])
+            self._set_reclaim(dev.id, dev, action, int(dev.size))
+
+        # And then add another uneditable line that lists how much space is
+        # already free in the disk.
+        if diskFree is not None:
+            freeSpaceString = "<span foreground='grey' style='italic'>%s</span>" % \
+                    escape_markup(_("Free space"))
+            self._diskStore.append(itr, [disk.id,
+                                         freeSpaceString,
+                                         "",
+                                         "<span foreground='grey' style='italic'>%s</span>" % escape_markup(diskFree.humanReadable(max_places=1)),
+                                         NOTHING,
+                                         False,
+                                         TY_FREE_SPACE,
+                                         self._get_tooltip(disk),
+                                         diskFree,
+                                         ""])
+
+        # the pending partitions were accounted for as a whole
+        self._set_reclaim_value(("disk", disk.id), Size(bytes=0))
+
+        # and finally remove the placeholder
+        child = self._diskStore.iter_children(itr)
+        if self._diskStore[child][TYPE_COL] == TY_PLACEHOLDER:
+            self._diskStore.remove(child)
+
     def _update_labels(self, nDisks=None, totalReclaimable=None, selectedReclaimable=None):
         if nDisks is not None and totalReclaimable is not None:
             text = P_("<b>%(count)s disk; %(size)s reclaimable space</b> (in filesystems)",
@@ -278,9 +381,32 @@ class ResizeDialog(GUIObject):
         self._resizeSlider.add_mark(minSize, Gtk.PositionType.BOTTOM, str(device.minSize))
         self._resizeSlider.add_mark(size, Gtk.PositionType.BOTTOM, str(device.size))
 
+    def _device(self, deviceID):
+        device = self._devices.get(deviceID)
+        if device is None:
+            device = self.storage.devicetree.getDeviceByID(deviceID)
+        return device
+
+    def _set_reclaim_value(self, key, value):
+        self._selectedReclaimableSpace += value - self._reclaim.get(key, Size(bytes=0))
+        self._reclaim[key] = value
+
+    def _set_reclaim(self, key, device, action, target):
+        """Update the running total of the selected reclaimable space for a
+           change of the action or target size of a row.
+        """
+        if action == _(SHRINK):
+            value = device.size - Size(bytes=target)
+        elif action == _(DELETE):
+            value = Size(bytes=int(device.size))
+        else:
+            value = Size(bytes=0)
+
+        self._set_reclaim_value(key, value)
+
     def _update_action_buttons(self, row):
         obj = PartStoreRow(*row)
-        device = self.storage.devicetree.getDeviceByID(obj.id)
+        device = self._device(obj.id)
 
         # Disks themselves may be editable in certain ways, but they are never
         # shrinkable.
@@ -320,7 +446,9 @@ class ResizeDialog(GUIObject):
         self._diskStore.clear()
         self.populate(disks)
 
-        self._view.expand_all()
+        rows = sum(len(partitions) + 1 for (partitions, _free) in self._pendingRows.itervalues())
+        if rows <= EXPAND_ALL_MAX_ROWS:
+            self._view.expand_all()
 
     def run(self):
         rc = self.window.run()
@@ -337,22 +465,6 @@ class ResizeDialog(GUIObject):
         if event.keyval == Gdk.KEY_Delete and self._deleteButton.get_sensitive():
             self._deleteButton.emit("clicked")
 
-    def _sumReclaimableSpace(self, model, path, itr, *args):
-        obj = PartStoreRow(*model[itr])
-
-        device = self.storage.devicetree.getDeviceByID(obj.id)
-        if device.isDisk and device.partitioned:
-            return False
-
-        if obj.action == _(PRESERVE):
-            return False
-        if obj.action == _(SHRINK):
-            self._selectedReclaimableSpace += device.size - Size(bytes=obj.target)
-        elif obj.action == _(DELETE):
-            self._selectedReclaimableSpace += int(device.size)
-
-        return False
-
     def on_preserve_clicked(self, button):
         itr = self._selection.get_selected()[1]
         self._actionChanged(itr, PRESERVE)
@@ -375,15 +487,27 @@ class ResizeDialog(GUIObject):
 
         # If that row is a disk header, we need to process all the partitions
         # it contains.
-        device = self.storage.devicetree.getDeviceByID(selectedRow[DEVICE_ID_COL])
+        device = self._device(selectedRow[DEVICE_ID_COL])
         if device.isDisk and device.partitioned:
+            if device.id in self._pendingRows:
+                # The partition rows were not added yet, they will inherit the
+                # disk's action once they are.  Until then, account for them as
+                # a whole.
+                if newAction == DELETE:
+                    partitions = self._pendingRows[device.id][0]
+                    value = sum((part.size for part in partitions if not part.protected),
+                                Size(bytes=0))
+                else:
+                    value = Size(bytes=0)
+                self._set_reclaim_value(("disk", device.id), value)
+
             partItr = self._diskStore.iter_children(itr)
             while partItr:
                 # Immutable entries are those that we can't do anything to - like
                 # the free space lines.  We just want to leave them in the display
                 # for information, but you can't choose to preserve/delete/shrink
                 # them.
-                if self._diskStore[partItr][TYPE_COL] in [TY_FREE_SPACE, TY_PROTECTED]:
+                if self._diskStore[partItr][TYPE_COL] in [TY_FREE_SPACE, TY_PROTECTED, TY_PLACEHOLDER]:
                     partItr = self._diskStore.iter_next(partItr)
                     continue
 
@@ -391,18 +515,22 @@ class ResizeDialog(GUIObject):
 
                 # If the user marked a whole disk for deletion, they can't go in and
                 # un-delete partitions under it.
+                part = self._device(self._diskStore[partItr][DEVICE_ID_COL])
                 if newAction == DELETE:
                     self._diskStore[partItr][EDITABLE_COL] = False
                 elif newAction == PRESERVE:
-                    part = self.storage.devicetree.getDeviceByID(self._diskStore[partItr][DEVICE_ID_COL])
                     self._diskStore[partItr][EDITABLE_COL] = not part.protected
 
+                self._set_reclaim(part.id, part, _(newAction),
+                                  self._diskStore[partItr][RESIZE_TARGET_COL])
+
                 partItr = self._diskStore.iter_next(partItr)
+        elif selectedRow[TYPE_COL] != TY_FREE_SPACE:
+            self._set_reclaim(device.id, device, _(newAction),
+                              selectedRow[RESIZE_TARGET_COL])
 
         # And then we're keeping a running tally of how much space the user
         # has selected to reclaim, so reflect that in the UI.
-        self._selectedReclaimableSpace = Size(bytes=0)
-        self._diskStore.foreach(self._sumReclaimableSpace, None)
         self._update_labels(selectedReclaimable=self._selectedReclaimableSpace)
 
         self._update_reclaim_button(self._selectedReclaimableSpace)
@@ -462,12 +590,17 @@ class ResizeDialog(GUIObject):
                 itr = self._diskStore.iter_next(itr)
                 continue
 
-            device = self.storage.devicetree.getDeviceByID(obj.id)
+            device = self._device(obj.id)
             if device.isDisk:
                 self._actionChanged(itr, action)
 
             itr = self._diskStore.iter_next(itr)
 
+    def on_test_expand_row(self, view, itr, path):
+        # Add the rows of the disk's partitions before it is expanded.
+        self._add_partition_rows(itr)
+        return False
+
     def on_row_clicked(self, view, path, column):
         # This handles when the user clicks on a row in the view.  We use it
         # only for expanding/collapsing disk headers.
@@ -493,15 +626,13 @@ class ResizeDialog(GUIObject):
     def on_resize_value_changed(self, rng):
         (model, itr) = self._selection.get_selected()
 
-        old_delta = Size(bytes=rng.get_adjustment().get_upper()) - int(model[itr][RESIZE_TARGET_COL])
-        self._selectedReclaimableSpace -= old_delta
-
         # Update the target size in the store.
         model[itr][RESIZE_TARGET_COL] = Size(bytes=rng.get_value())
 
         # Update the "Total selected space" label.
-        delta = Size(bytes=rng.get_adjustment().get_upper()) - int(rng.get_value())
-        self._selectedReclaimableSpace += delta
+        device = self._device(model[itr][DEVICE_ID_COL])
+        self._set_reclaim(device.id, device, model[itr][ACTION_COL],
+                          model[itr][RESIZE_TARGET_COL])
         self._update_labels(selectedReclaimable=self._selectedReclaimableSpace)
 
         # And then the reclaim button, in case they've made enough space.
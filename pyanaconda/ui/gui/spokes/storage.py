@@ -58,16 +58,17 @@ from pyanaconda.kickstart import doKickstartStorage, getAvailableDiskSpace
 from blivet import storageInitialize, arch
 from blivet.size import Size
 from blivet.devices import MultipathDevice
-from blivet.errors import StorageError, DasdFormatError
+from blivet.errors import StorageError
 from blivet.platform import platform
 from blivet.devicelibs import swap as swap_lib
-from blivet.devicelibs.dasd import make_unformatted_dasd_list, format_dasd
+from blivet.devicelibs.dasd import make_unformatted_dasd_list
 from pyanaconda.threads import threadMgr, AnacondaThread
 from pyanaconda.product import productName
 from pyanaconda.flags import flags
 from pyanaconda.i18n import _, C_, CN_, P_
 from pyanaconda import constants
 from pyanaconda.bootloader import BootLoaderError
+from pyanaconda.storage_utils import free_space_index, format_dasds, dasdfmt_progress_message
 
 from pykickstart.constants import CLEARPART_TYPE_NONE, AUTOPART_TYPE_LVM
 from pykickstart.errors import KickstartValueError
@@ -474,11 +475,15 @@ class StorageSpoke(NormalSpoke, StorageChecker):
         for child in self.localOverviews + self.advancedOverviews:
             child.destroy()
 
+        # the free space of all the disks is computed in one pass over the
+        # device tree, don't ask for it disk by disk
+        free_space = free_space_index(self.storage).getFreeSpace(disks=self.disks)
+
         # Then deal with local disks, which are really easy.  They need to be
         # handled here instead of refresh to take into account the user pressing
         # the rescan button on custom partitioning.
         for disk in filter(isLocalDisk, self.disks):
-            self._add_disk_overview(disk, self.local_disks_box)
+            self._add_disk_overview(disk, self.local_disks_box, free_space[disk.name][0])
 
         # Advanced disks are different.  Because there can potentially be a lot
         # of them, we do not display them in the box by default.  Instead, only
@@ -491,7 +496,8 @@ class StorageSpoke(NormalSpoke, StorageChecker):
             if isLocalDisk(obj):
                 continue
 
-            self._add_disk_overview(obj, self.specialized_disks_box)
+            self._add_disk_overview(obj, self.specialized_disks_box,
+                                    free_space[obj.name][0])
 
         # update the selections in the ui
         for overview in self.localOverviews + self.advancedOverviews:
@@ -514,7 +520,7 @@ class StorageSpoke(NormalSpoke, StorageChecker):
         threadMgr.add(AnacondaThread(name=constants.THREAD_STORAGE_WATCHER,
                       target=self._initialize))
 
-    def _add_disk_overview(self, disk, box):
+    def _add_disk_overview(self, disk, box, free):
         if disk.removable:
             kind = "drive-removable-media"
         else:
@@ -533,8 +539,6 @@ class StorageSpoke(NormalSpoke, StorageChecker):
         else:
             description = disk.description
 
-        free = self.storage.getFreeSpace(disks=[disk])[disk.name][0]
-
         overview = AnacondaWidgets.DiskOverview(description,
                                                 kind,
                                                 str(disk.size),
@@ -575,7 +579,7 @@ class StorageSpoke(NormalSpoke, StorageChecker):
         free = Size(bytes=0)
 
         # pass in our disk list so hidden disks' free space is available
-        free_space = self.storage.getFreeSpace(disks=self.disks)
+        free_space = free_space_index(self.storage).getFreeSpace(disks=self.disks)
         selected = [d for d in self.disks if d.name in self.selected_disks]
 
         for disk in selected:
@@ -636,14 +640,11 @@ class StorageSpoke(NormalSpoke, StorageChecker):
             # nothing to do here; bail
             return
 
-        hubQ.send_message(self.__class__.__name__, _("Formatting DASDs"))
-        for disk in to_format:
-            try:
-                format_dasd(disk)
-            except DasdFormatError as err:
-                # Log errors if formatting fails, but don't halt the installer
-                log.error(str(err))
-                continue
+        def report_progress(formatting, done, total):
+            hubQ.send_message(self.__class__.__name__,
+                              dasdfmt_progress_message(formatting, done, total))
+
+        format_dasds(to_format, report_progress)
 
         # now re-initialize storage to pick up the newly formatted disks
         protectedNames = [d.name for d in self.storage.protectedDevices]
@@ -657,7 +658,7 @@ class StorageSpoke(NormalSpoke, StorageChecker):
     def on_summary_clicked(self, button):
         # show the selected disks dialog
         # pass in our disk list so hidden disks' free space is available
-        free_space = self.storage.getFreeSpace(disks=self.disks)
+        free_space = free_space_index(self.storage).getFreeSpace(disks=self.disks)
         dialog = SelectedDisksDialog(self.data,)
         dialog.refresh([d for d in self.disks if d.name in self.selected_disks],
                        free_space)
@@ -778,8 +779,7 @@ class StorageSpoke(NormalSpoke, StorageChecker):
             log.debug("Need disklabel: %s have: %s", ", ".join(platform_labels),
                                                      ", ".join(disk_labels))
         else:
-            free_space = self.storage.getFreeSpace(disks=disks,
-                                                   clearPartType=CLEARPART_TYPE_NONE)
+            free_space = free_space_index(self.storage, CLEARPART_TYPE_NONE).getFreeSpace(disks=disks)
             disk_free = sum(f[0] for f in free_space.itervalues())
             fs_free = sum(f[1] for f in free_space.itervalues())
 
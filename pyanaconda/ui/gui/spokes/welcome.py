@@ -167,6 +167,9 @@ class WelcomeLanguageSpoke(LangLocaleHandler, StandaloneSpoke):
         # We can use the territory from geolocation here
         # to preselect the translation, when it's available.
         territory = geoloc.get_territory_code(wait=True)
+        # don't let a lookup that is still in progress change the
+        # preselected values once the user can see them
+        geoloc.cancel()
 
         # bootopts and kickstart have priority over geoip
         if self.data.lang.lang and self.data.lang.seen:
@@ -25,6 +25,7 @@ from pyanaconda.threads import threadMgr, AnacondaThread
 
 from pyanaconda.constants import NOTICEABLE_FREEZE
 from contextlib import contextmanager
+from collections import OrderedDict
 from gi.repository import Gdk, Gtk, GLib, AnacondaWidgets
 import Queue
 import time
@@ -37,6 +38,9 @@ log = logging.getLogger("anaconda")
 # confused with anything else?
 TERMINATOR = object()
 
+# maximum number of items gtk_batch_map processes without checking the time
+BATCH_MAP_MAX_SIZE = 1000
+
 def gtk_call_once(func, *args):
     """Wrapper for GLib.idle_add call that ensures the func is called
        only once.
@@ -47,6 +51,73 @@ def gtk_call_once(func, *args):
 
     GLib.idle_add(wrap, args)
 
+class CoalescingDispatcher(object):
+    """Runs the queued calls in the Gtk main loop, all of them in a single
+       idle callback.
+
+       Calls queued with the same key before the callback runs are merged,
+       only the last one of them is run. Otherwise the calls are run in the
+       order they were queued in, a merged call is run in the position of
+       the last queued one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (func, args)
+        self._pending = OrderedDict()
+        self._scheduled = False
+        self._dispatched = 0
+        self._coalesced = 0
+
+    @property
+    def dispatched(self):
+        """Number of the calls run so far."""
+        return self._dispatched
+
+    @property
+    def coalesced(self):
+        """Number of the calls dropped because of a later call with the same key."""
+        return self._coalesced
+
+    def queue(self, key, func, *args):
+        """Queue a call.
+
+           :param key: calls with the same key are merged, None means the
+                       call is never merged with any other
+           :type key: any hashable object or None
+           :param func: the function to call
+           :param args: arguments for the function
+        """
+        if key is None:
+            # unique key
+            key = object()
+
+        with self._lock:
+            if key in self._pending:
+                # the merged call moves to the end
+                del self._pending[key]
+                self._coalesced += 1
+            self._pending[key] = (func, args)
+
+            if not self._scheduled:
+                self._scheduled = True
+                GLib.idle_add(self._run)
+
+    def _run(self):
+        with self._lock:
+            calls = self._pending.values()
+            self._pending.clear()
+            self._scheduled = False
+
+        for (func, args) in calls:
+            self._dispatched += 1
+            func(*args)
+
+        return False
+
+# dispatcher for the updates of the hubs' spoke selectors
+uiDispatcher = CoalescingDispatcher()
+
 def gtk_action_wait(func):
     """Decorator method which ensures every call of the decorated function to be
        executed in the context of Gtk main loop even if called from a non-main
@@ -132,13 +203,35 @@ class GtkActionList(object):
 
         self._actions = []
 
-def gtk_batch_map(action, items, args=(), pre_func=None, batch_size=1):
+class CancellationToken(object):
+    """
+    Token used to cancel a running gtk_batch_map (e.g. when the items are no
+    longer needed because the user left the screen showing them).
+
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+def gtk_batch_map(action, items, args=(), pre_func=None, batch_size=1,
+                  cancel_token=None):
     """
     Function that maps an action on items in a way that makes the action run in
     the main thread, but without blocking the main thread for a noticeable
     time. If a pre-processing function is given it is mapped on the items first
     before the action happens in the main thread.
 
+    The items are processed in batches, the size of the batches is adapted to
+    the time the action takes so that every run in the main loop uses up to
+    NOTICEABLE_FREEZE seconds without checking the time after every item.
+
     MUST NOT BE CALLED NOR WAITED FOR FROM THE MAIN THREAD.
 
     :param action: any action that has to be done on the items in the main
@@ -151,48 +244,87 @@ def gtk_batch_map(action, items, args=(), pre_func=None, batch_size=1):
     :param pre_func: a function that is mapped on the items before they are
                      passed to the action function
     :type pre_func: item -> action_item
-    :param batch_size: how many items should be processed in one run in the main loop
+    :param batch_size: how many items should be processed in the first batch
+    :param cancel_token: token that can be used to stop the processing, items
+                         not processed by then are skipped
+    :type cancel_token: CancellationToken or None
     :raise AssertionError: if called from the main thread
-    :return: None
+    :return: whether all the items were processed (not cancelled)
+    :rtype: bool
 
     """
 
     assert(not threadMgr.in_main_thread())
 
+    def cancelled():
+        return cancel_token is not None and cancel_token.cancelled
+
     def preprocess(queue):
-        if pre_func:
-            for item in items:
+        for item in items:
+            if cancelled():
+                break
+
+            if pre_func:
                 queue.put(pre_func(item))
-        else:
-            for item in items:
+            else:
                 queue.put(item)
 
         queue.put(TERMINATOR)
 
-    def process_one_batch((queue, action, done_event)):
+    # state shared by the runs in the main loop
+    state = {"batch_size": max(1, batch_size),
+             # estimated time the action takes for one item
+             "item_time": None,
+             "completed": False}
+
+    def finish(completed):
+        state["completed"] = completed
+        done_event.set()
+        return False
+
+    def process_batches((queue, action, done_event)):
         tstamp_start = time.time()
-        tstamp = time.time()
 
         # process as many batches as user shouldn't notice
-        while tstamp - tstamp_start < NOTICEABLE_FREEZE:
-            for _i in xrange(batch_size):
-                try:
+        while True:
+            if cancelled():
+                return finish(False)
+
+            batch_start = time.time()
+            processed = 0
+            try:
+                for _i in xrange(state["batch_size"]):
                     action_item = queue.get_nowait()
                     if action_item is TERMINATOR:
                         # all items processed, tell we are finished and return
-                        done_event.set()
-                        return False
+                        return finish(True)
                     else:
                         # run action on the item
                         action(action_item, *args)
-                except Queue.Empty:
-                    # empty queue, reschedule to run later
-                    return True
-
-            tstamp = time.time()
-
-        # out of time but something left, reschedule to run again later
-        return True
+                        processed += 1
+            except Queue.Empty:
+                # empty queue, reschedule to run later
+                return True
+            finally:
+                tstamp = time.time()
+                if processed:
+                    item_time = (tstamp - batch_start) / processed
+                    if state["item_time"] is not None:
+                        # smooth out the differences between the items
+                        item_time = (item_time + state["item_time"]) / 2
+                    state["item_time"] = item_time
+
+            remaining = NOTICEABLE_FREEZE - (tstamp - tstamp_start)
+            if remaining <= 0 or remaining < state["item_time"]:
+                # out of time but something left, reschedule to run again later
+                return True
+
+            # fill the rest of the time with the next batch
+            if state["item_time"]:
+                state["batch_size"] = max(1, min(BATCH_MAP_MAX_SIZE,
+                                                 int(remaining / state["item_time"])))
+            else:
+                state["batch_size"] = BATCH_MAP_MAX_SIZE
 
     item_queue = Queue.Queue()
     done_event = threading.Event()
@@ -205,9 +337,15 @@ def gtk_batch_map(action, items, args=(), pre_func=None, batch_size=1):
                                  target=preprocess,
                                  args=(item_queue,)))
 
-    GLib.idle_add(process_one_batch, (item_queue, action, done_event))
+    GLib.idle_add(process_batches, (item_queue, action, done_event))
     done_event.wait()
-    log.debug("Finished applying %s on %s", action, object.__repr__(items))
+
+    if state["completed"]:
+        log.debug("Finished applying %s on %s", action, object.__repr__(items))
+    else:
+        log.debug("Cancelled applying %s on %s", action, object.__repr__(items))
+
+    return state["completed"]
 
 def timed_action(delay=300, threshold=750, busy_cursor=True):
     """
@@ -64,6 +64,10 @@ from pyanaconda.i18n import _
 
 import logging
 import copy
+from collections import OrderedDict
+
+# number of the storage sanity check results kept by StorageChecker
+CHECK_STORAGE_CACHE_SIZE = 8
 
 class StorageChecker(object):
     __metaclass__ = ABCMeta
@@ -72,6 +76,9 @@ class StorageChecker(object):
     errors = []
     warnings = []
 
+    # storage revision -> (errors, warnings) of the recent sanity checks
+    _results = OrderedDict()
+
     def __init__(self, mainSpokeClass="StorageSpoke"):
         self._mainSpokeClass = mainSpokeClass
 
@@ -89,12 +96,27 @@ class StorageChecker(object):
 
         threadMgr.wait(constants.THREAD_EXECUTE_STORAGE)
 
+        from pyanaconda.storage_utils import storage_revision
+
         hubQ.send_not_ready(self._mainSpokeClass)
         hubQ.send_message(self._mainSpokeClass, _("Checking storage configuration..."))
-        exns = self.storage.sanityCheck()
-        errors = [exn.message for exn in exns if isinstance(exn, SanityError)]
-        warnings = [exn.message for exn in exns if isinstance(exn, SanityWarning)]
-        (StorageChecker.errors, StorageChecker.warnings) = (errors, warnings)
+
+        # The same storage configuration gives the same results, e.g. when
+        # the storage spoke is left again without any change.
+        revision = storage_revision(self.storage)
+        if revision in StorageChecker._results:
+            self.log.debug("storage configuration not changed, using the results of the last check")
+            (errors, warnings) = StorageChecker._results[revision]
+        else:
+            exns = self.storage.sanityCheck()
+            errors = [exn.message for exn in exns if isinstance(exn, SanityError)]
+            warnings = [exn.message for exn in exns if isinstance(exn, SanityWarning)]
+
+            StorageChecker._results[revision] = (errors, warnings)
+            if len(StorageChecker._results) > CHECK_STORAGE_CACHE_SIZE:
+                StorageChecker._results.popitem(last=False)
+
+        (StorageChecker.errors, StorageChecker.warnings) = (errors[:], warnings[:])
         hubQ.send_ready(self._mainSpokeClass, True)
         for e in StorageChecker.errors:
             self.log.error(e)
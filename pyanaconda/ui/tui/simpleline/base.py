@@ -21,22 +21,178 @@
 
 __all__ = ["App", "UIScreen", "Widget"]
 
+import os
 import sys
 import Queue
+import errno
+import select
 import getpass
+import termios
 import threading
-from pyanaconda.threads import threadMgr, AnacondaThread
 from pyanaconda.ui.communication import hubQ
 from pyanaconda import constants
 from pyanaconda.i18n import _, N_, C_
 
-RAW_INPUT_LOCK = threading.Lock()
-
 
 def send_exception(queue, ex):
     queue.put((hubQ.HUB_CODE_EXCEPTION, [ex]))
 
 
+class InputReader(object):
+    """Reads the user input in one long-lived thread and sends it to the
+       communication queue as (HUB_CODE_INPUT, [input]) messages.
+
+       Every request reads one line. The input is read from stdin with select,
+       so the reading can be cancelled while waiting for the user.
+       """
+
+    def __init__(self, queue):
+        """
+        :param queue: communication queue to send the input to
+        :type queue: Queue.Queue instance
+        """
+
+        self._queue = queue
+        self._lock = threading.Lock()
+        self._thread = None
+        # queue of the thread's requests, (request id, prompt, hidden) or
+        # None to stop the thread
+        self._requests = None
+        # only one thread can read at a time
+        self._read_lock = threading.Lock()
+        self._last_request = 0
+        # requests with ids up to this one are cancelled
+        self._cancelled = 0
+        # data read from stdin but not returned yet (after the first newline)
+        self._buffer = ""
+        # pipe used to wake the thread up from select when cancelling
+        self._wakeup_r = None
+        self._wakeup_w = None
+
+    def request(self, prompt, hidden=False):
+        """Asks for one line of input, the input is sent to the queue.
+
+        :param prompt: prompt to be displayed
+        :type prompt: str
+
+        :param hidden: whether typed characters should be echoed or not
+        :type hidden: bool
+        """
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._wakeup_r is None:
+                    (self._wakeup_r, self._wakeup_w) = os.pipe()
+                self._requests = Queue.Queue()
+                self._thread = threading.Thread(name=constants.THREAD_INPUT_BASENAME,
+                                                target=self._run,
+                                                args=(self._requests,))
+                self._thread.daemon = True
+                self._thread.start()
+
+            self._last_request += 1
+            self._requests.put((self._last_request, prompt, hidden))
+
+    def cancel(self):
+        """Cancels all the requests not finished yet. The input typed so far
+           is left to the next request."""
+
+        with self._lock:
+            self._cancelled = self._last_request
+            if self._wakeup_w is not None:
+                os.write(self._wakeup_w, "x")
+
+    def stop(self):
+        """Cancels all the requests and stops the thread."""
+
+        self.cancel()
+        with self._lock:
+            if self._thread is not None:
+                self._requests.put(None)
+                self._thread = None
+                self._requests = None
+
+    def _is_cancelled(self, request_id):
+        with self._lock:
+            return request_id <= self._cancelled
+
+    def _run(self, requests):
+        while True:
+            request = requests.get()
+            if request is None:
+                return
+
+            (request_id, prompt, hidden) = request
+            if self._is_cancelled(request_id):
+                continue
+
+            try:
+                with self._read_lock:
+                    data = self._read(request_id, prompt, hidden)
+            except Exception:
+                send_exception(self._queue, sys.exc_info())
+                continue
+
+            if data is not None:
+                self._queue.put((hubQ.HUB_CODE_INPUT, [data]))
+
+    def _read(self, request_id, prompt, hidden):
+        """Reads one line, returns None if the request was cancelled."""
+
+        try:
+            fd = sys.stdin.fileno()
+        except (AttributeError, ValueError, IOError):
+            # not a real file (e.g. replaced for testing), it can't be
+            # cancelled
+            if hidden:
+                return getpass.getpass(prompt)
+            return raw_input(prompt)
+
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+
+        if not (hidden and os.isatty(fd)):
+            return self._readline(request_id, fd)
+
+        # turn off echoing the typed characters
+        old_attrs = termios.tcgetattr(fd)
+        new_attrs = old_attrs[:]
+        new_attrs[3] &= ~termios.ECHO
+        termios.tcsetattr(fd, termios.TCSAFLUSH, new_attrs)
+        try:
+            return self._readline(request_id, fd)
+        finally:
+            termios.tcsetattr(fd, termios.TCSAFLUSH, old_attrs)
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+
+    def _readline(self, request_id, fd):
+        while "\n" not in self._buffer:
+            try:
+                (ready, _w, _x) = select.select([fd, self._wakeup_r], [], [])
+            except select.error as e:
+                if e.args[0] == errno.EINTR:
+                    continue
+                raise
+
+            if self._wakeup_r in ready:
+                os.read(self._wakeup_r, 512)
+                if self._is_cancelled(request_id):
+                    return None
+
+            if fd in ready:
+                data = os.read(fd, 4096)
+                if not data:
+                    # end of file, return the last line or behave as raw_input
+                    if self._buffer:
+                        break
+                    raise EOFError()
+                self._buffer += data
+
+        (line, _nl, self._buffer) = self._buffer.partition("\n")
+        return line
+
+
 class ExitMainLoop(Exception):
     """This exception ends the outermost mainloop. Used internally when dialogs
        close."""
@@ -96,6 +252,9 @@ class App(object):
         # value: list of tuples (callback, data)
         self._handlers = {}
 
+        # reader of the user input, sends it to the queue
+        self._input_reader = InputReader(self.queue)
+
         # screen stack contains triplets
         #  UIScreen to show
         #  arguments for it's show method
@@ -126,40 +285,6 @@ class App(object):
             self._handlers[event] = []
         self._handlers[event].append((callback, data))
 
-    def _thread_input(self, queue, prompt, hidden):
-        """This method is responsible for interruptible user input. It is expected
-        to be used in a thread started on demand by the App class and returns the
-        input via the communication Queue.
-
-        :param queue: communication queue to be used
-        :type queue: Queue.Queue instance
-
-        :param prompt: prompt to be displayed
-        :type prompt: str
-
-        :param hidden: whether typed characters should be echoed or not
-        :type hidden: bool
-
-        """
-
-        if hidden:
-            data = getpass.getpass(prompt)
-        else:
-            sys.stdout.write(prompt)
-            sys.stdout.flush()
-            # XXX: only one raw_input can run at a time, don't schedule another
-            # one as it would cause weird behaviour and block other packages'
-            # raw_inputs
-            if not RAW_INPUT_LOCK.acquire(False):
-                # raw_input is already running
-                return
-            else:
-                # lock acquired, we can run raw_input
-                data = raw_input()
-                RAW_INPUT_LOCK.release()
-
-        queue.put((hubQ.HUB_CODE_INPUT, [data]))
-
     def switch_screen(self, ui, args = None):
         """Schedules a screen to replace the current one.
 
@@ -303,6 +428,9 @@ class App(object):
             return True
         except ExitAllMainLoops:
             return False
+        finally:
+            # don't leave a reader of the input behind
+            self._input_reader.stop()
 
     def _mainloop(self):
         """Single mainloop. Do not use directly, start the application using run()."""
@@ -405,12 +533,13 @@ class App(object):
         """This method reads one input from user. Its basic form has only one
         line, but we might need to override it for more complex apps or testing."""
 
-        input_thread = AnacondaThread(prefix=constants.THREAD_INPUT_BASENAME,
-                                      target=self._thread_input,
-                                      args=(self.queue, prompt, hidden))
-        input_thread.daemon = True
-        threadMgr.add(input_thread)
-        event = self.process_events(return_at=hubQ.HUB_CODE_INPUT)
+        self._input_reader.request(prompt, hidden)
+        try:
+            event = self.process_events(return_at=hubQ.HUB_CODE_INPUT)
+        except Exception:
+            # nobody waits for the input anymore
+            self._input_reader.cancel()
+            raise
         return event[1][0] # return the user input
 
     def input(self, args, key):
@@ -638,12 +767,18 @@ class Widget(object):
            :type default: string
            """
 
+        # list of rows, every row is a unicode string
         self._buffer = []
         if default:
-            self._buffer = [[c for c in l] for l in default.split("\n")]
+            self._buffer = [unicode(l) for l in default.split("\n")]
         self._max_width = max_width
         self._cursor = (0, 0) # row, col
 
+        # width the widget was last rendered for and whether its content
+        # changed since then (see damaged)
+        self._render_width = None
+        self._damaged = True
+
     @property
     def height(self):
         """The current height of the internal buffer."""
@@ -653,7 +788,7 @@ class Widget(object):
     def width(self):
         """The current width of the internal buffer
            (id of the first empty column)."""
-        return reduce(lambda acc,l: max(acc, len(l)), self._buffer, 0)
+        return max([len(l) for l in self._buffer] or [0])
 
     def clear(self):
         """Clears this widgets buffer and resets cursor."""
@@ -662,9 +797,31 @@ class Widget(object):
 
     @property
     def content(self):
-        """This has to return list (rows) of lists (columns) with one character elements."""
+        """This has to return list (rows) of unicode strings (one column per character)."""
         return self._buffer
 
+    @property
+    def children(self):
+        """Widgets drawn to this widget's buffer by its render method.
+           Used to find out if this widget needs to be rendered again."""
+        return []
+
+    def damage(self):
+        """Marks the widget as changed, so that it is rendered again
+           next time. Call this when the data the widget shows change."""
+        self._damaged = True
+
+    def damaged(self, width):
+        """Tells if the widget has to be rendered again for the given width.
+
+           :param width: the width of buffer requested by the caller
+           :type width: int
+
+           :rtype: bool
+           """
+        return self._damaged or width != self._render_width or \
+               any(w.damaged(w._render_width) for w in self.children)
+
     def render(self, width):
         """This method has to redraw the widget's self._buffer.
 
@@ -672,9 +829,13 @@ class Widget(object):
            :type width: int
 
            This method will commonly call render of child widgets and then draw and write
-           methods to copy their contents to self._buffer
+           methods to copy their contents to self._buffer. Widgets whose content
+           depends only on their data and width can return early if not
+           self.damaged(width).
            """
         self.clear()
+        self._render_width = width
+        self._damaged = False
 
     def get_lines(self):
         """Get lines to write out in order to show this widget.
@@ -683,7 +844,7 @@ class Widget(object):
            :rtype: list(unicode)
            """
 
-        return [unicode(u"".join(line)) for line in self._buffer]
+        return list(self._buffer)
 
     def setxy(self, row, col):
         """Sets cursor position.
@@ -704,6 +865,21 @@ class Widget(object):
         """Sets the cursor to first column in new line at the end."""
         self._cursor = (self.height, 0)
 
+    def _put(self, row, col, text):
+        """Puts text to the buffer at row, col position, overwriting what was
+           there and filling the gaps with spaces."""
+
+        # if the line is not in buffer, create it
+        if row >= len(self._buffer):
+            self._buffer.extend((row - len(self._buffer) + 1) * [u""])
+
+        # if the line's length is not enough, fill it with spaces
+        line = self._buffer[row]
+        if len(line) < col:
+            line += (col - len(line)) * u" "
+
+        self._buffer[row] = line[:col] + text + line[col + len(text):]
+
     def draw(self, w, row = None, col = None, block = False):
         """This method copies w widget's content to this widget's buffer at row, col position.
 
@@ -730,16 +906,11 @@ class Widget(object):
 
         # fill up rows to accomodate for w.height
         if self.height < row + w.height:
-            for _i in range(row + w.height - self.height):
-                self._buffer.append(list())
+            self._buffer.extend((row + w.height - self.height) * [u""])
 
-        # append columns to accomodate for w.width
-        for l in range(row, row + w.height):
-            l_len = len(self._buffer[l])
-            w_len = len(w.content[l - row])
-            if l_len < col + w_len:
-                self._buffer[l] += ((col + w_len - l_len) * list(u" "))
-            self._buffer[l][col:col + w_len] = w.content[l - row][:]
+        # copy the rows, filling up columns to accomodate for them
+        for (l, w_line) in enumerate(w.content, row):
+            self._put(l, col, w_line)
 
         # move the cursor to new spot
         if block:
@@ -784,41 +955,44 @@ class Widget(object):
         if width is None and self._max_width:
             width = self._max_width - col
 
+        # column to wrap at
+        if width is None:
+            wrap_col = None
+        else:
+            wrap_col = col + width
+
         x = row
         y = col
 
-        # emulate typing machine
-        for c in text:
+        # emulate typing machine, but write whole line segments at once
+        for (i, line) in enumerate(text.split("\n")):
             # process newline
-            if c == "\n":
+            if i > 0:
                 x += 1
                 if block:
                     y = col
                 else:
                     y = 0
-                continue
-
-            # if the line is not in buffer, create it
-            if x >= len(self._buffer):
-                for _i in range(x - len(self._buffer) + 1):
-                    self._buffer.append(list())
-
-            # if the line's length is not enough, fill it with spaces
-            if y >= len(self._buffer[x]):
-                self._buffer[x] += ((y - len(self._buffer[x]) + 1) * list(u" "))
-
 
-            # "type" character
-            self._buffer[x][y] = c
-
-            # shift to the next char
-            y += 1
-            if not width is None and y >= col + width:
-                x += 1
-                if block:
-                    y = col
+            pos = 0
+            while pos < len(line):
+                if wrap_col is None:
+                    segment = line[pos:]
                 else:
-                    y = 0
+                    # at least one character is always written
+                    segment = line[pos:pos + max(wrap_col - y, 1)]
+
+                self._put(x, y, segment)
+                pos += len(segment)
+
+                # shift behind the segment
+                y += len(segment)
+                if wrap_col is not None and y >= wrap_col:
+                    x += 1
+                    if block:
+                        y = col
+                    else:
+                        y = 0
 
         self._cursor = (x, y)
 
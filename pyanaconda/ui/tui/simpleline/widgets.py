@@ -48,6 +48,9 @@ class TextWidget(base.Widget):
         :raises
         """
 
+        if not self.damaged(width):
+            return
+
         base.Widget.render(self, width)
         self.write(self._text, width = width)
 
@@ -62,6 +65,10 @@ class CenterWidget(base.Widget):
         base.Widget.__init__(self)
         self._w = w
 
+    @property
+    def children(self):
+        return [self._w]
+
     def render(self, width):
         """
         Render the centered widget to internal buffer.
@@ -70,9 +77,12 @@ class CenterWidget(base.Widget):
         :type width: int
         """
 
+        if not self.damaged(width):
+            return
+
         base.Widget.render(self, width)
         self._w.render(width)
-        self.draw(self._w, col = (width - self._w.width) / 2)
+        self.draw(self._w, col = max(0, (width - self._w.width) / 2))
 
 class ColumnWidget(base.Widget):
     def __init__(self, columns, spacing = 0):
@@ -89,6 +99,10 @@ class ColumnWidget(base.Widget):
         self._spacing = spacing
         self._columns = columns
 
+    @property
+    def children(self):
+        return [item for (_col_width, col) in self._columns for item in col]
+
     def render(self, width):
         """Render the widget to it's internal buffer
 
@@ -99,6 +113,9 @@ class ColumnWidget(base.Widget):
         :rtype: None
         """
 
+        if not self.damaged(width):
+            return
+
         base.Widget.render(self, width)
 
         # the lefmost empty column
@@ -153,6 +170,9 @@ class CheckboxWidget(base.Widget):
     def render(self, width):
         """Render the widget to internal buffer. It should be max width
            characters wide."""
+        if not self.damaged(width):
+            return
+
         base.Widget.render(self, width)
 
         if self.completed:
@@ -30,11 +30,11 @@ from pyanaconda.ui.tui.tuiobject import YesNoDialog
 from pykickstart.constants import AUTOPART_TYPE_LVM, AUTOPART_TYPE_BTRFS, AUTOPART_TYPE_PLAIN
 from blivet import storageInitialize, arch
 from blivet.size import Size
-from blivet.errors import StorageError, DasdFormatError
+from blivet.errors import StorageError
 from blivet.errors import SanityError
 from blivet.errors import SanityWarning
 from blivet.devices import DASDDevice, FcoeDiskDevice, iScsiDiskDevice, MultipathDevice, ZFCPDiskDevice
-from blivet.devicelibs.dasd import format_dasd, make_unformatted_dasd_list
+from blivet.devicelibs.dasd import make_unformatted_dasd_list
 from pyanaconda.flags import flags
 from pyanaconda.kickstart import doKickstartStorage
 from pyanaconda.threads import threadMgr, AnacondaThread
@@ -42,6 +42,7 @@ from pyanaconda.constants import THREAD_STORAGE, THREAD_STORAGE_WATCHER, THREAD_
 from pyanaconda.constants_text import INPUT_PROCESSED
 from pyanaconda.i18n import _, P_, N_
 from pyanaconda.bootloader import BootLoaderError
+from pyanaconda.storage_utils import format_dasds, dasdfmt_progress_message
 
 from pykickstart.constants import CLEARPART_TYPE_ALL, CLEARPART_TYPE_LINUX, CLEARPART_TYPE_NONE
 from pykickstart.errors import KickstartValueError
@@ -318,14 +319,10 @@ class StorageSpoke(NormalTUISpoke):
                 # no? well fine then, back to the storage spoke with you;
                 return None
 
-        for disk in to_format:
-            try:
-                print(_("Formatting /dev/%s. This may take a moment.") % disk)
-                format_dasd(disk)
-            except DasdFormatError as err:
-                # Log errors if formatting fails, but don't halt the installer
-                log.error(str(err))
-                continue
+        def report_progress(formatting, done, total):
+            print(dasdfmt_progress_message(formatting, done, total))
+
+        format_dasds(to_format, report_progress)
 
         # when finished formatting we need to reinitialize storage
         protectedNames = [d.name for d in self.storage.protectedDevices]
@@ -0,0 +1,116 @@
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from pyanaconda import anaconda_log
+import logging
+import os
+import signal
+import tempfile
+import time
+import unittest
+
+class LogRecordRingTests(unittest.TestCase):
+    def ordering_test(self):
+        """Records should be returned in the order they were queued."""
+
+        ring = anaconda_log.LogRecordRing(10)
+        for i in range(5):
+            ring.put(i, logging.INFO)
+
+        self.assertEqual(ring.getBatch(3), [0, 1, 2])
+        self.assertEqual(ring.getBatch(3), [3, 4])
+        self.assertEqual(ring.dropped, 0)
+
+    def overflow_test(self):
+        """DEBUG records should be dropped first when the ring is full."""
+
+        ring = anaconda_log.LogRecordRing(3)
+        ring.put(0, logging.DEBUG)
+        ring.put(1, logging.INFO)
+        ring.put(2, logging.DEBUG)
+
+        # incoming DEBUG record is dropped
+        ring.put(3, logging.DEBUG)
+        # other records replace the oldest DEBUG record
+        ring.put(4, logging.WARNING)
+        ring.put(5, logging.ERROR)
+        self.assertEqual(ring.getBatch(10), [1, 4, 5])
+
+        # without DEBUG records, the oldest record is dropped
+        ring.batchDone(3)
+        for i in range(4):
+            ring.put(i, logging.INFO)
+        self.assertEqual(ring.getBatch(10), [1, 2, 3])
+        self.assertEqual(ring.dropped, 4)
+
+class AsyncLogHandlerTests(unittest.TestCase):
+    def fork_test(self):
+        """Records logged in a forked process should be written right away."""
+
+        logfile = tempfile.NamedTemporaryFile()
+        target = logging.StreamHandler(open(logfile.name, "w"))
+        handler = anaconda_log.AsyncLogHandler(anaconda_log.LogWriter())
+        handler.addTarget(target)
+        logr = logging.getLogger("anaconda_log_test.fork")
+        logr.propagate = False
+        logr.addHandler(handler)
+
+        logr.warning("parent")
+        handler.flush()
+
+        # fork while the locks are held, like the writer thread could do
+        handler.acquire()
+        target.acquire()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                logr.warning("child")
+                os._exit(0)
+        finally:
+            target.release()
+            handler.release()
+
+        deadline = time.time() + 10
+        while os.waitpid(pid, os.WNOHANG) == (0, 0):
+            if time.time() > deadline:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                self.fail("the forked process got stuck logging")
+            time.sleep(0.01)
+
+        with open(logfile.name) as f:
+            self.assertEqual(f.read(), "parent\nchild\n")
+
+class LogTargetTests(unittest.TestCase):
+    def parse_target_test(self):
+        """Remote log targets should be parsed correctly."""
+
+        target = anaconda_log.parseLogTarget("example.com", 514)
+        self.assertEqual((target.host, target.port), ("example.com", 514))
+
+        target = anaconda_log.parseLogTarget("example.com:1514", 514)
+        self.assertEqual((target.host, target.port), ("example.com", 1514))
+
+        target = anaconda_log.parseLogTarget("[fe80::1]:1514", 514)
+        self.assertEqual((target.host, target.port), ("fe80::1", 1514))
+
+        target = anaconda_log.parseLogTarget("fe80::1", 514)
+        self.assertEqual((target.host, target.port), ("fe80::1", 514))
+
+        self.assertRaises(ValueError, anaconda_log.parseLogTarget,
+                          "example.com:port", 514)
@@ -0,0 +1,78 @@
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from pyanaconda import eventlog
+import unittest
+import os
+import shutil
+from test_constants import ANACONDA_TEST_DIR
+
+class EventLogTests(unittest.TestCase):
+    def setUp(self):
+        if not os.path.exists(ANACONDA_TEST_DIR):
+            os.makedirs(ANACONDA_TEST_DIR)
+        self.path = os.path.join(ANACONDA_TEST_DIR, "events.log")
+        self.event_log = eventlog.EventLog(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(ANACONDA_TEST_DIR)
+
+    def roundtrip_test(self):
+        """Written events should be read back in order."""
+
+        with self.event_log.phase("install", message="Installing"):
+            self.event_log.emit(eventlog.EVENT_EXEC, argv=["true"], rc=0,
+                                duration=0.5)
+
+        events = list(eventlog.read_events(self.path))
+        self.assertEqual([e["type"] for e in events],
+                         [eventlog.EVENT_PHASE_START, eventlog.EVENT_EXEC,
+                          eventlog.EVENT_PHASE_END])
+        self.assertEqual(events[1]["argv"], ["true"])
+        self.assertEqual(events[0]["message"], "Installing")
+        self.assertEqual(events[2]["phase"], "install")
+
+    def invalid_event_test(self):
+        """Unknown events and missing fields should be rejected."""
+
+        self.assertRaises(ValueError, self.event_log.emit, "no_such_event")
+        self.assertRaises(ValueError, self.event_log.emit,
+                          eventlog.EVENT_EXEC, argv=["true"])
+
+    def disabled_test(self):
+        """Nothing should be written until the log is enabled."""
+
+        event_log = eventlog.EventLog()
+        event_log.emit(eventlog.EVENT_PACKAGE_INSTALLED, package="bash")
+        self.assertFalse(os.path.exists(self.path))
+
+        event_log.enable(self.path)
+        event_log.emit(eventlog.EVENT_PACKAGE_INSTALLED, package="glibc")
+        events = list(eventlog.read_events(self.path))
+        self.assertEqual([e["package"] for e in events], ["glibc"])
+
+    def truncated_line_test(self):
+        """Truncated lines should be skipped when reading the log."""
+
+        self.event_log.emit(eventlog.EVENT_PACKAGE_INSTALLED, package="bash")
+        with open(self.path, "a") as f:
+            f.write('{"type": "exec", "ar')
+
+        events = list(eventlog.read_events(self.path))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["package"], "bash")
@@ -0,0 +1,110 @@
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from pyanaconda import geoloc
+import unittest
+import os
+import shutil
+import threading
+import time
+from test_constants import ANACONDA_TEST_DIR
+
+class GeolocationCacheTests(unittest.TestCase):
+    def setUp(self):
+        if not os.path.exists(ANACONDA_TEST_DIR):
+            os.makedirs(ANACONDA_TEST_DIR)
+        self.cache_file = os.path.join(ANACONDA_TEST_DIR, "geoloc_cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(ANACONDA_TEST_DIR)
+
+    def cache_roundtrip_test(self):
+        """Cached results should survive a new cache instance."""
+
+        cache = geoloc.GeolocationCache(cache_file=self.cache_file)
+        cache.put("key", geoloc.LocationResult(territory_code="CZ",
+                                               timezone="Europe/Prague"))
+
+        result = geoloc.GeolocationCache(cache_file=self.cache_file).get("key")
+        self.assertEqual(result.territory_code, "CZ")
+        self.assertEqual(result.timezone, "Europe/Prague")
+        self.assertIsInstance(result.timezone, str)
+        self.assertIsNone(cache.get("other key"))
+
+    def cache_expiration_test(self):
+        """Expired results should not be returned."""
+
+        cache = geoloc.GeolocationCache(cache_file=self.cache_file, ttl=0.1)
+        cache.put("key", geoloc.LocationResult(territory_code="CZ"))
+        time.sleep(0.2)
+        self.assertIsNone(cache.get("key"))
+
+    def broken_cache_test(self):
+        """A broken cache file should be ignored."""
+
+        with open(self.cache_file, "w") as f:
+            f.write("{not json")
+        cache = geoloc.GeolocationCache(cache_file=self.cache_file)
+        self.assertIsNone(cache.get("key"))
+
+        cache.put("key", geoloc.LocationResult(territory_code="CZ"))
+        self.assertEqual(cache.get("key").territory_code, "CZ")
+
+class StubProviderTests(unittest.TestCase):
+    def setUp(self):
+        if not os.path.exists(ANACONDA_TEST_DIR):
+            os.makedirs(ANACONDA_TEST_DIR)
+        cache_file = os.path.join(ANACONDA_TEST_DIR, "geoloc_cache.json")
+        self.cache = geoloc.GeolocationCache(cache_file=cache_file)
+
+    def tearDown(self):
+        geoloc.StubGeolocationProvider.DELAY = 0
+        shutil.rmtree(ANACONDA_TEST_DIR)
+
+    def stub_result_test(self):
+        """The stub provider should return its result and cache it."""
+
+        provider = geoloc.StubGeolocationProvider(cache=self.cache)
+        provider.refresh()
+        self.assertEqual(provider.get_result().territory_code, "CZ")
+
+        # a new provider should get the result from the cache
+        geoloc.StubGeolocationProvider.DELAY = 60
+        provider = geoloc.StubGeolocationProvider(cache=self.cache)
+        start = time.time()
+        provider.refresh()
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(provider.get_result().timezone, "Europe/Prague")
+
+    def cancel_test(self):
+        """Cancelling a lookup should stop it and discard its result."""
+
+        geoloc.StubGeolocationProvider.DELAY = 60
+        provider = geoloc.StubGeolocationProvider()
+        thread = threading.Thread(target=provider.refresh)
+        thread.start()
+
+        # wait for the lookup to start
+        while not geoloc.refresh_in_progress:
+            time.sleep(0.01)
+
+        provider.cancel()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(geoloc.refresh_in_progress)
+        self.assertIsNone(provider.get_result())
@@ -0,0 +1,212 @@
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from pyanaconda import threads
+from pyanaconda.constants import NOTICEABLE_FREEZE
+from pyanaconda.ui.gui import utils
+import threading
+import time
+import unittest
+
+class FakeGLib(object):
+    """GLib replacement keeping the idle callbacks until they are run."""
+
+    def __init__(self):
+        self.idle = []
+
+    def idle_add(self, func, *args):
+        self.idle.append((func, args))
+
+    def run_once(self):
+        """Run the first idle callback."""
+        (func, args) = self.idle.pop(0)
+        if func(*args):
+            self.idle.append((func, args))
+
+    def run_idle(self):
+        """Run the idle callbacks like the main loop does."""
+        while self.idle:
+            self.run_once()
+
+class FakeTime(object):
+    """Clock moving only when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.calls = 0
+
+    def time(self):
+        self.calls += 1
+        return self.now
+
+class CoalescingDispatcherTests(unittest.TestCase):
+    def setUp(self):
+        self._glib = utils.GLib
+        self.glib = FakeGLib()
+        utils.GLib = self.glib
+        self.calls = []
+
+    def tearDown(self):
+        utils.GLib = self._glib
+
+    def _call(self, *args):
+        self.calls.append(args)
+
+    def merge_test(self):
+        """Calls with the same key should be merged into the last one."""
+
+        dispatcher = utils.CoalescingDispatcher()
+        dispatcher.queue("a", self._call, "a", 1)
+        dispatcher.queue("b", self._call, "b", 1)
+        dispatcher.queue("a", self._call, "a", 2)
+        dispatcher.queue("c", self._call, "c", 1)
+
+        # all of them run in a single idle callback
+        self.assertEqual(len(self.glib.idle), 1)
+        self.assertEqual(self.calls, [])
+
+        self.glib.run_idle()
+        self.assertEqual(self.calls, [("b", 1), ("a", 2), ("c", 1)])
+        self.assertEqual(dispatcher.dispatched, 3)
+        self.assertEqual(dispatcher.coalesced, 1)
+
+    def no_key_test(self):
+        """Calls without a key should never be merged."""
+
+        dispatcher = utils.CoalescingDispatcher()
+        dispatcher.queue(None, self._call, 1)
+        dispatcher.queue("a", self._call, 2)
+        dispatcher.queue(None, self._call, 3)
+        dispatcher.queue(None, self._call, 4)
+
+        self.glib.run_idle()
+        self.assertEqual(self.calls, [(1,), (2,), (3,), (4,)])
+        self.assertEqual(dispatcher.dispatched, 4)
+        self.assertEqual(dispatcher.coalesced, 0)
+
+    def reschedule_test(self):
+        """Calls queued after the idle callback started should run in the next one."""
+
+        dispatcher = utils.CoalescingDispatcher()
+
+        def requeue(num):
+            self.calls.append((num,))
+            if num < 3:
+                dispatcher.queue("a", requeue, num + 1)
+
+        dispatcher.queue("a", requeue, 1)
+        self.assertEqual(len(self.glib.idle), 1)
+
+        # every call queues the next one, none of them is merged
+        self.glib.run_idle()
+        self.assertEqual(self.calls, [(1,), (2,), (3,)])
+        self.assertEqual(dispatcher.dispatched, 3)
+        self.assertEqual(dispatcher.coalesced, 0)
+
+        # nothing pending, nothing scheduled
+        self.assertEqual(self.glib.idle, [])
+        dispatcher.queue("a", self._call, 4)
+        self.assertEqual(len(self.glib.idle), 1)
+        self.glib.run_idle()
+        self.assertEqual(self.calls[-1], (4,))
+
+class BatchMapTests(unittest.TestCase):
+    def setUp(self):
+        threads.initThreading()
+        self._saved = (utils.GLib, utils.time, utils.threadMgr)
+        self.glib = FakeGLib()
+        self.clock = FakeTime()
+        (utils.GLib, utils.time, utils.threadMgr) = (self.glib, self.clock, threads.threadMgr)
+
+        # number of the items processed by every run in the main loop
+        self.runs = []
+        self.item_time = 0.001
+
+    def tearDown(self):
+        (utils.GLib, utils.time, utils.threadMgr) = self._saved
+
+    def _action(self, item, processed):
+        self.clock.now += self.item_time
+        processed.append(item)
+
+    def _batch_map(self, items, after_run=None, **kwargs):
+        """Run gtk_batch_map in a thread and its idle callbacks in this one."""
+
+        processed = []
+        result = []
+        worker = threading.Thread(target=lambda: result.append(
+            utils.gtk_batch_map(self._action, items, args=(processed,), **kwargs)))
+        worker.start()
+
+        while worker.is_alive() or self.glib.idle:
+            if not self.glib.idle:
+                time.sleep(0.001)
+                continue
+
+            # let the preprocessing finish so that the runs don't depend on it
+            threads.threadMgr.wait_all()
+            before = len(processed)
+            self.glib.run_once()
+            self.runs.append(len(processed) - before)
+            if after_run:
+                after_run()
+
+        worker.join()
+        return (result[0], processed)
+
+    def adaptive_test(self):
+        """Batches should fill the time of a run without checking it for every batch."""
+
+        (completed, processed) = self._batch_map(range(1000), batch_size=5)
+        self.assertTrue(completed)
+        self.assertEqual(processed, range(1000))
+
+        # every run but the last one fills the time, nothing more
+        per_run = int(round(NOTICEABLE_FREEZE / self.item_time))
+        for num in self.runs[:-1]:
+            self.assertIn(num, (per_run - 1, per_run))
+
+        # a batch of 5 items at a time would need more than 200 checks
+        self.assertLess(self.clock.calls, 100)
+
+    def slow_items_test(self):
+        """Runs should not take longer than noticeable if the items are slow."""
+
+        self.item_time = 0.03
+        (completed, processed) = self._batch_map(range(20), batch_size=1)
+        self.assertTrue(completed)
+        self.assertEqual(processed, range(20))
+        self.assertTrue(all(num * self.item_time <= NOTICEABLE_FREEZE for num in self.runs))
+
+    def cancel_test(self):
+        """No items should be processed after cancelling."""
+
+        token = utils.CancellationToken()
+        (completed, processed) = self._batch_map(range(1000), after_run=token.cancel,
+                                                 cancel_token=token)
+        self.assertFalse(completed)
+        self.assertEqual(processed, range(len(processed)))
+        self.assertEqual(len(processed), self.runs[0])
+        self.assertEqual(sum(self.runs[1:]), 0)
+
+        # cancelled before it even started
+        token = utils.CancellationToken()
+        token.cancel()
+        (completed, processed) = self._batch_map(range(1000), cancel_token=token)
+        self.assertFalse(completed)
+        self.assertEqual(processed, [])
@@ -0,0 +1,152 @@
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from pyanaconda import isoinspect, threads
+import unittest
+import os
+import shutil
+import struct
+from test_constants import ANACONDA_TEST_DIR
+
+DISCINFO = "1400000000.000000\nFedora 21\nx86_64\nALL\n"
+
+BLOCK = isoinspect.ISO_BLOCK_SIZE
+
+def _both(fmt, value):
+    return struct.pack("<" + fmt, value) + struct.pack(">" + fmt, value)
+
+def _record(name, extent, size, is_dir=False, system_use=""):
+    pad = "\0" if len(name) % 2 == 0 else ""
+    body = _both("I", extent) + _both("I", size) + "\0" * 7 + \
+           chr(0x2 if is_dir else 0) + "\0\0" + _both("H", 1) + \
+           chr(len(name)) + name + pad + system_use
+    return chr(len(body) + 2) + "\0" + body
+
+def _directory(extent, records):
+    data = _record("\0", extent, BLOCK, True) + _record("\1", extent, BLOCK, True) + \
+           "".join(records)
+    return data.ljust(BLOCK, "\0")
+
+def _descriptor(vd_type, root_extent, escape=""):
+    data = chr(vd_type) + "CD001\1"
+    data = data.ljust(88, "\0") + escape
+    data = data.ljust(156, "\0") + _record("\0", root_extent, BLOCK, True)
+    return data.ljust(BLOCK, "\0")
+
+def make_iso(path, discinfo_name=".discinfo", rock_ridge=False, joliet=False,
+             repodata=True):
+    """Write a minimal ISO 9660 image with .discinfo and repodata in its root."""
+    # blocks: 16 PVD, 17 SVD, 18 terminator, 19 root, 20 Joliet root,
+    # 21 .discinfo, 22 repodata
+    system_use = ""
+    if rock_ridge:
+        system_use = "NM" + chr(5 + len(".discinfo")) + "\1\0" + ".discinfo"
+    records = [_record(discinfo_name, 21, len(DISCINFO), system_use=system_use)]
+    joliet_records = [_record(".discinfo".encode("utf-16-be"), 21, len(DISCINFO))]
+    if repodata:
+        records.append(_record("REPODATA", 22, BLOCK, True))
+        joliet_records.append(_record("repodata".encode("utf-16-be"), 22, BLOCK, True))
+
+    blocks = ["\0" * BLOCK] * 16
+    blocks.append(_descriptor(1, 19))
+    if joliet:
+        blocks.append(_descriptor(2, 20, "%/E"))
+    else:
+        blocks.append("\0" * BLOCK)
+    blocks.append("\xffCD001\1".ljust(BLOCK, "\0"))
+    blocks.append(_directory(19, records))
+    blocks.append(_directory(20, joliet_records))
+    blocks.append(DISCINFO.ljust(BLOCK, "\0"))
+    blocks.append(_directory(22, []))
+
+    if not joliet:
+        # move the terminator right after the primary descriptor
+        blocks[17], blocks[18] = blocks[18], blocks[17]
+
+    with open(path, "wb") as f:
+        f.write("".join(blocks))
+
+class IsoInspectTests(unittest.TestCase):
+    def setUp(self):
+        threads.initThreading()
+        isoinspect.clear_cache()
+        if not os.path.exists(ANACONDA_TEST_DIR):
+            os.makedirs(ANACONDA_TEST_DIR)
+        self.iso = os.path.join(ANACONDA_TEST_DIR, "test.iso")
+
+    def tearDown(self):
+        shutil.rmtree(ANACONDA_TEST_DIR)
+
+    def plain_names_test(self):
+        """Plain ISO 9660 names should be mapped like the kernel does."""
+
+        make_iso(self.iso, discinfo_name=".DISCINFO.;1")
+        info = isoinspect.inspect_iso(self.iso)
+        self.assertEqual(info.discinfo, DISCINFO)
+        self.assertEqual(info.stamp, "1400000000.000000")
+        self.assertEqual(info.arch, "x86_64")
+        self.assertTrue(info.has_repodata)
+
+    def rock_ridge_joliet_test(self):
+        """Rock Ridge and Joliet names should be used."""
+
+        make_iso(self.iso, discinfo_name="_DISCINF.;1", rock_ridge=True)
+        self.assertEqual(isoinspect.inspect_iso(self.iso).arch, "x86_64")
+
+        isoinspect.clear_cache()
+        make_iso(self.iso, discinfo_name="_DISCINF.;1", joliet=True, repodata=False)
+        info = isoinspect.inspect_iso(self.iso)
+        self.assertEqual(info.arch, "x86_64")
+        self.assertFalse(info.has_repodata)
+
+        # no .discinfo at all
+        isoinspect.clear_cache()
+        make_iso(self.iso, discinfo_name="_DISCINF.;1")
+        info = isoinspect.inspect_iso(self.iso)
+        self.assertIsNone(info.discinfo)
+        self.assertIsNone(info.arch)
+
+    def cache_test(self):
+        """Results should be cached by path, modification time and size."""
+
+        make_iso(self.iso)
+        os.utime(self.iso, (1400000000, 1400000000))
+        self.assertTrue(isoinspect.inspect_iso(self.iso).has_repodata)
+
+        make_iso(self.iso, repodata=False)
+        os.utime(self.iso, (1400000000, 1400000000))
+        self.assertTrue(isoinspect.inspect_iso(self.iso).has_repodata)
+
+        os.utime(self.iso, (1400000010, 1400000010))
+        self.assertFalse(isoinspect.inspect_iso(self.iso).has_repodata)
+
+    def inspect_isos_test(self):
+        """Images that can't be inspected should give None."""
+
+        make_iso(self.iso)
+        not_iso = os.path.join(ANACONDA_TEST_DIR, "not.iso")
+        with open(not_iso, "w") as f:
+            f.write("\0" * 40 * BLOCK)
+        self.assertRaises(isoinspect.IsoInspectError, isoinspect.inspect_iso, not_iso)
+
+        paths = [not_iso, self.iso, os.path.join(ANACONDA_TEST_DIR, "missing.iso"),
+                 ANACONDA_TEST_DIR]
+        infos = isoinspect.inspect_isos(paths, limit=2)
+        self.assertEqual([info is not None for info in infos],
+                         [False, True, False, False])
+        self.assertEqual(infos[1].arch, "x86_64")
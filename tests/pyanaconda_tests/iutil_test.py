@@ -24,6 +24,8 @@ import unittest
 import types
 import os
 import shutil
+import threading
+import time
 from test_constants import ANACONDA_TEST_DIR
 
 class UpcaseFirstLetterTests(unittest.TestCase):
@@ -73,6 +75,18 @@ class RunProgramTests(unittest.TestCase):
         with self.assertRaises(OSError):
             iutil._run_program(['asdasdadasd'])
 
+    def run_program_parallel_test(self):
+        """Programs run from different threads should run at the same time."""
+
+        threads = [threading.Thread(target=iutil._run_program, args=(['sleep', '1'],))
+                   for _i in range(3)]
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(time.time() - start, 2.5)
+
     def exec_with_redirect_test(self):
         """Test execWithRedirect."""
         # correct calling should return rc==0
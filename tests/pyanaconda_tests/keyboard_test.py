@@ -20,6 +20,9 @@
 
 from pyanaconda import keyboard
 import unittest
+import os
+import shutil
+from test_constants import ANACONDA_TEST_DIR
 
 class ParsingAndJoiningTests(unittest.TestCase):
     def layout_variant_parsing_test(self):
@@ -84,3 +87,42 @@ class ParsingAndJoiningTests(unittest.TestCase):
         self.assertEqual(keyboard.normalize_layout_variant("cz(qwerty)"), "cz (qwerty)")
         self.assertEqual(keyboard.normalize_layout_variant("cz ( qwerty )"), "cz (qwerty)")
         self.assertEqual(keyboard.normalize_layout_variant("cz "), "cz")
+
+class LayoutCatalogTests(unittest.TestCase):
+    def setUp(self):
+        if not os.path.exists(ANACONDA_TEST_DIR):
+            os.makedirs(ANACONDA_TEST_DIR)
+        self.catalog_file = os.path.join(ANACONDA_TEST_DIR, "layouts.json")
+        self.catalog = keyboard.LayoutCatalog(
+            {"cz": keyboard.LayoutInfo("czech", "Czech"),
+             "cz (qwerty)": keyboard.LayoutInfo("czech", "Czech (qwerty)"),
+             "us": keyboard.LayoutInfo("english", "English (US)")},
+            {"grp:alt_shift_toggle": "Alt+Shift"})
+
+    def tearDown(self):
+        shutil.rmtree(ANACONDA_TEST_DIR)
+
+    def catalog_roundtrip_test(self):
+        """A stored catalog should only be loaded for the same version."""
+
+        self.catalog.save(self.catalog_file, "1")
+
+        catalog = keyboard.LayoutCatalog.load(self.catalog_file, "1")
+        self.assertEqual(catalog.layout_infos, self.catalog.layout_infos)
+        self.assertEqual(catalog.switch_opt_infos, self.catalog.switch_opt_infos)
+        self.assertIsInstance(catalog.layout_infos["cz"].desc, str)
+
+        self.assertIsNone(keyboard.LayoutCatalog.load(self.catalog_file, "2"))
+
+        with open(self.catalog_file, "w") as f:
+            f.write("{not json")
+        self.assertIsNone(keyboard.LayoutCatalog.load(self.catalog_file, "1"))
+
+    def search_test(self):
+        """Searching should find the layouts with all the words."""
+
+        self.assertEqual(self.catalog.search(""), set(["cz", "cz (qwerty)", "us"]))
+        self.assertEqual(self.catalog.search("cz"), set(["cz", "cz (qwerty)"]))
+        self.assertEqual(self.catalog.search("czech qw"), set(["cz (qwerty)"]))
+        self.assertEqual(self.catalog.search("czech qwertz"), set())
+        self.assertEqual(self.catalog.search("US"), set(["us"]))
@@ -139,3 +139,43 @@ class LangcodeLocaleMatchingTests(unittest.TestCase):
         # no matches
         self.assertIsNone(localization.find_best_locale_match("pt_BR", ["en_BR", "en"]))
         self.assertIsNone(localization.find_best_locale_match("cs_CZ.UTF-8", ["en", "en.UTF-8"]))
+
+class LocalizationCatalogTests(unittest.TestCase):
+    def setUp(self):
+        self.catalog = localization.LocalizationCatalog()
+
+    def cached_results_test(self):
+        """The catalog should return the results langtable returns."""
+
+        for locale in ("cs_CZ.UTF-8", "sr_RS.UTF-8@latin", "en"):
+            parts = localization.parse_langcode(locale)
+            self.assertEqual(self.catalog.locale_keyboards(locale),
+                             localization.langtable.list_keyboards(
+                                 languageId=parts["language"],
+                                 territoryId=parts["territory"] or "",
+                                 scriptId=parts["script"] or ""))
+
+            # the second query should give the same result
+            self.assertEqual(self.catalog.english_name(locale),
+                             self.catalog.english_name(locale))
+
+        self.assertEqual(self.catalog.language_locales("cs"),
+                         localization.langtable.list_locales(languageId="cs"))
+        self.assertEqual(self.catalog.native_name("cs"),
+                         localization.get_native_name("cs.UTF-8"))
+
+    def returned_lists_test(self):
+        """Modifying a returned list should not modify the cached one."""
+
+        locales = self.catalog.language_locales("cs")
+        locales.append("foo")
+        self.assertNotIn("foo", self.catalog.language_locales("cs"))
+
+    def invalid_locale_test(self):
+        """Invalid locales should be rejected."""
+
+        with self.assertRaises(localization.InvalidLocaleSpec):
+            self.catalog.locale_timezones("")
+
+        with self.assertRaises(localization.InvalidLocaleSpec):
+            self.catalog.language_locales("")
@@ -0,0 +1,118 @@
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+
+from pyanaconda.ui.tui.simpleline.base import Widget, InputReader
+from pyanaconda.ui.tui.simpleline.widgets import TextWidget, ColumnWidget
+from pyanaconda.ui.communication import hubQ
+import unittest
+import Queue
+import os
+import sys
+
+class WidgetTests(unittest.TestCase):
+    def write_test(self):
+        """Writing should wrap the text and handle newlines."""
+
+        w = Widget()
+        w.write(u"abcdefg\nhi", width=3)
+        self.assertEqual(w.get_lines(), [u"abc", u"def", u"g", u"hi"])
+        self.assertEqual(w.cursor, (3, 2))
+
+        w = Widget()
+        w.write(u"abcdef", row=1, col=2, width=2, block=True)
+        self.assertEqual(w.get_lines(), [u"", u"  ab", u"  cd", u"  ef"])
+        self.assertEqual(w.cursor, (4, 2))
+
+        # overwriting part of a line
+        w.write(u"XY", row=1, col=1)
+        self.assertEqual(w.get_lines()[1], u" XYb")
+
+    def draw_test(self):
+        """Drawing should copy the content of a widget."""
+
+        child = Widget(default=u"ab\ncd")
+        w = Widget(default=u"0123")
+        w.draw(child, row=0, col=6)
+        self.assertEqual(w.get_lines(), [u"0123  ab", u"      cd"])
+        self.assertEqual(w.cursor, (2, 0))
+
+    def damage_test(self):
+        """Only damaged widgets should be rendered again."""
+
+        t1 = TextWidget(u"first")
+        t2 = TextWidget(u"second")
+        cols = ColumnWidget([(10, [t1]), (10, [t2])], 1)
+        cols.render(80)
+        self.assertEqual(cols.get_lines(), [u"first      second"])
+        self.assertFalse(cols.damaged(80))
+        self.assertTrue(cols.damaged(40))
+
+        t2._text = u"changed"
+        cols.render(80)
+        self.assertEqual(cols.get_lines(), [u"first      second"])
+
+        t2.damage()
+        self.assertTrue(cols.damaged(80))
+        cols.render(80)
+        self.assertEqual(cols.get_lines(), [u"first      changed"])
+
+class InputReaderTests(unittest.TestCase):
+    def setUp(self):
+        (read_fd, self._write_fd) = os.pipe()
+        self._stdin = sys.stdin
+        sys.stdin = os.fdopen(read_fd)
+        self._queue = Queue.Queue()
+        self._reader = InputReader(self._queue)
+
+    def tearDown(self):
+        self._reader.stop()
+        sys.stdin.close()
+        sys.stdin = self._stdin
+        os.close(self._write_fd)
+
+    def _get_input(self):
+        event = self._queue.get(timeout=5)
+        self.assertEqual(event[0], hubQ.HUB_CODE_INPUT)
+        return event[1][0]
+
+    def read_test(self):
+        """Every request should read one line."""
+
+        os.write(self._write_fd, "first\nsecond\n")
+        self._reader.request("")
+        self.assertEqual(self._get_input(), "first")
+        self._reader.request("", hidden=True)
+        self.assertEqual(self._get_input(), "second")
+
+        self._reader.request("")
+        os.write(self._write_fd, "thi")
+        os.write(self._write_fd, "rd\n")
+        self.assertEqual(self._get_input(), "third")
+
+    def cancel_test(self):
+        """Cancelled requests should leave the input to the next ones."""
+
+        self._reader.request("")
+        self._reader.cancel()
+        os.write(self._write_fd, "input\n")
+        with self.assertRaises(Queue.Empty):
+            self._queue.get(timeout=0.2)
+
+        self._reader.request("")
+        self.assertEqual(self._get_input(), "input")
@@ -0,0 +1,129 @@
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from pyanaconda import storage_utils, threads
+from pyanaconda.ui import helpers
+from pyanaconda.ui.helpers import StorageChecker, CHECK_STORAGE_CACHE_SIZE
+from collections import OrderedDict
+import unittest
+
+class FakeFormat(object):
+    def __init__(self, fmt_type=None, **kwargs):
+        self.type = fmt_type
+        self.exists = False
+        self.__dict__.update(kwargs)
+
+class FakeDevice(object):
+    def __init__(self, name, fmt=None, parents=None, **kwargs):
+        self.name = name
+        self.type = "partition"
+        self.exists = False
+        self.size = 500
+        self.format = fmt or FakeFormat()
+        self.parents = parents or []
+        self.__dict__.update(kwargs)
+
+class FakeDeviceTree(object):
+    def __init__(self, devices):
+        self._devices = devices
+        self._actions = []
+
+class FakeStorage(object):
+    def __init__(self, devices):
+        self.devicetree = FakeDeviceTree(devices)
+        self.bootloader = None
+        self.encryptionPassphrase = ""
+        self.checks = 0
+
+    def sanityCheck(self):
+        self.checks += 1
+        return []
+
+def raid_storage(level, label_type="gpt", passphrase=None):
+    disks = [FakeDevice(name, fmt=FakeFormat("disklabel", labelType=label_type),
+                        type="disk", exists=True)
+             for name in ("sda", "sdb")]
+    luks = FakeDevice("luks", fmt=FakeFormat("luks", hasKey=bool(passphrase)),
+                      parents=disks[:1])
+    boot = FakeDevice("boot", fmt=FakeFormat("ext4", mountpoint="/boot"),
+                      parents=disks, type="mdarray", level=level)
+    return FakeStorage(disks + [luks, boot])
+
+class StorageRevisionTests(unittest.TestCase):
+    def revision_test(self):
+        """The revision should change with the properties the check reads."""
+
+        revision = storage_utils.storage_revision(raid_storage("raid1"))
+        self.assertEqual(storage_utils.storage_revision(raid_storage("raid1")),
+                         revision)
+
+        self.assertNotEqual(storage_utils.storage_revision(raid_storage("raid0")),
+                            revision)
+        self.assertNotEqual(storage_utils.storage_revision(raid_storage("raid1", "msdos")),
+                            revision)
+        self.assertNotEqual(storage_utils.storage_revision(raid_storage("raid1", passphrase="x")),
+                            revision)
+
+class StorageCheckerTests(unittest.TestCase):
+    def setUp(self):
+        threads.initThreading()
+        helpers.threadMgr = threads.threadMgr
+        StorageChecker._results = OrderedDict()
+
+    def tearDown(self):
+        StorageChecker._results = OrderedDict()
+
+    def _check(self, storage):
+        class Checker(StorageChecker):
+            @property
+            def storage(self):
+                return storage
+
+        Checker().checkStorage()
+
+    def cache_test(self):
+        """Sanity check results should be reused for the same configuration."""
+
+        storage = raid_storage("raid1")
+        self._check(storage)
+        self._check(storage)
+        self.assertEqual(storage.checks, 1)
+
+        # the same configuration with new device objects
+        other = raid_storage("raid1")
+        self._check(other)
+        self.assertEqual(other.checks, 0)
+
+        # the RAID level of /boot changed
+        storage.devicetree._devices[-1].level = "raid0"
+        self._check(storage)
+        self.assertEqual(storage.checks, 2)
+
+    def cache_size_test(self):
+        """Only the results of the recent checks should be kept."""
+
+        storages = [raid_storage("raid%d" % i) for i in range(10)]
+        for storage in storages:
+            self._check(storage)
+        self.assertEqual(len(StorageChecker._results), CHECK_STORAGE_CACHE_SIZE)
+
+        # the oldest results were dropped
+        self._check(storages[0])
+        self.assertEqual(storages[0].checks, 2)
+        self._check(storages[-1])
+        self.assertEqual(storages[-1].checks, 1)
@@ -0,0 +1,59 @@
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from pyanaconda import threads
+import threading
+import time
+import unittest
+
+class RunInParallelTests(unittest.TestCase):
+    def setUp(self):
+        threads.initThreading()
+
+    def results_test(self):
+        """Results and exceptions should be returned in the order of the items."""
+
+        def target(item):
+            if item == 3:
+                raise ValueError("three")
+            return item * 2
+
+        results = threads.run_in_parallel(target, range(6), 3)
+        self.assertEqual([r for (r, _e) in results], [0, 2, 4, None, 8, 10])
+        self.assertEqual([e is None for (_r, e) in results],
+                         [True, True, True, False, True, True])
+        self.assertIs(results[3][1][0], ValueError)
+        self.assertEqual(threads.threadMgr.running, 0)
+
+    def limit_test(self):
+        """No more than limit items should be processed at once."""
+
+        lock = threading.Lock()
+        running = [0]
+        maximum = [0]
+
+        def target(item):
+            with lock:
+                running[0] += 1
+                maximum[0] = max(maximum[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        threads.run_in_parallel(target, range(10), 3)
+        self.assertEqual(maximum[0], 3)
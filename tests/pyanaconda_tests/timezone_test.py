@@ -21,6 +21,7 @@
 from pyanaconda import timezone
 import unittest
 import mock
+import os
 
 class TimezonesListings(unittest.TestCase):
     def string_timezones_test(self):
@@ -38,6 +39,41 @@ class TimezonesListings(unittest.TestCase):
             for zone in zones:
                 self.assertTrue(timezone.is_valid_timezone(region + "/" + zone))
 
+class TimezoneCatalogTests(unittest.TestCase):
+    def setUp(self):
+        self._lang = os.environ.get("LANG")
+        os.environ["LANG"] = "en_US.UTF-8"
+
+    def tearDown(self):
+        if self._lang is None:
+            del os.environ["LANG"]
+        else:
+            os.environ["LANG"] = self._lang
+
+    def valid_timezones_test(self):
+        """Check the timezones recognized by the catalog."""
+
+        catalog = timezone.TimezoneCatalog()
+        self.assertTrue(catalog.is_valid("Europe/Prague"))
+        self.assertTrue(catalog.is_valid("Etc/GMT+1"))
+        self.assertFalse(catalog.is_valid("Europe/Nonexistent"))
+        self.assertFalse(catalog.is_valid("GMT+1"))
+
+    def sorted_xlated_test(self):
+        """Check the order of the translated regions and cities."""
+
+        catalog = timezone.TimezoneCatalog()
+        (regions, cities) = catalog.sorted_xlated()
+        self.assertEqual(regions[-1][0], "Etc")
+        self.assertEqual(set(r for (r, _xlated) in regions), set(catalog.regions.keys()))
+
+        # the GMT+-X "cities" are sorted by their numbers
+        gmt = [c for (c, _xlated) in cities if c.startswith("GMT") and c != "GMT"]
+        self.assertEqual(gmt, sorted(gmt, key=lambda c: int(c[3:])))
+
+        # the results are computed only once for a locale
+        self.assertIs(catalog.sorted_xlated()[1], cities)
+
 class TerritoryTimezones(unittest.TestCase):
     def string_valid_territory_zone_test(self):
         """Check if the returned value is string for a valid territory."""
@@ -0,0 +1,110 @@
+#
+# Copyright (C) 2014  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from pyanaconda.ui import common
+import unittest
+import os
+import shutil
+import sys
+from test_constants import ANACONDA_TEST_DIR
+
+MODULE_PATTERN = "collect_test_addon.%s"
+
+SPOKE_MODULE = """
+class FirstSpoke(object):
+    category = "system"
+
+class SecondSpoke(object):
+    category = "software"
+"""
+
+OTHER_MODULE = """
+class OtherSpoke(object):
+    category = "user"
+"""
+
+class CollectTests(unittest.TestCase):
+    def setUp(self):
+        self.module_dir = os.path.join(ANACONDA_TEST_DIR, "spokes")
+        os.makedirs(self.module_dir)
+        self.index_file = os.path.join(ANACONDA_TEST_DIR, "index.json")
+
+        with open(os.path.join(self.module_dir, "spoke.py"), "w") as f:
+            f.write(SPOKE_MODULE)
+        with open(os.path.join(self.module_dir, "other.py"), "w") as f:
+            f.write(OTHER_MODULE)
+
+    def tearDown(self):
+        for name in list(sys.modules.keys()):
+            if name.startswith("collect_test_addon"):
+                del sys.modules[name]
+        shutil.rmtree(ANACONDA_TEST_DIR)
+
+    def _collect(self, category, index):
+        return common.collect(MODULE_PATTERN, self.module_dir,
+                              lambda cls: getattr(cls, "category", None) == category,
+                              hint=lambda info: info["category"] == category,
+                              index=index)
+
+    def collect_test(self):
+        """Collect should find the matching classes and index all of them."""
+
+        index = common.DiscoveryIndex(index_file=self.index_file)
+        classes = self._collect("software", index)
+        self.assertEqual([cls.__name__ for cls in classes], ["SecondSpoke"])
+
+        classes = self._collect("user", index)
+        self.assertEqual([cls.__name__ for cls in classes], ["OtherSpoke"])
+
+        index = common.DiscoveryIndex(index_file=self.index_file)
+        info = index.get_classes(os.path.join(self.module_dir, "spoke.py"))
+        self.assertEqual(info["FirstSpoke"]["category"], "system")
+        self.assertIn("object", info["FirstSpoke"]["bases"])
+
+    def index_skip_test(self):
+        """Indexed modules without matching classes should not be imported."""
+
+        common.collect(MODULE_PATTERN, self.module_dir, lambda cls: True,
+                       index=common.DiscoveryIndex(index_file=self.index_file))
+
+        # simulate a restart of the installer
+        for name in list(sys.modules.keys()):
+            if name.startswith("collect_test_addon"):
+                del sys.modules[name]
+
+        index = common.DiscoveryIndex(index_file=self.index_file)
+        classes = self._collect("user", index)
+        self.assertEqual([cls.__name__ for cls in classes], ["OtherSpoke"])
+        self.assertIn(MODULE_PATTERN % "other", sys.modules)
+        self.assertNotIn(MODULE_PATTERN % "spoke", sys.modules)
+
+    def index_invalidation_test(self):
+        """Changed modules and directories should be indexed again."""
+
+        index = common.DiscoveryIndex(index_file=self.index_file)
+        self._collect("user", index)
+
+        with open(os.path.join(self.module_dir, "new.py"), "w") as f:
+            f.write(OTHER_MODULE.replace("OtherSpoke", "NewSpoke"))
+        # make sure the mtime changes on file systems with coarse timestamps
+        os.utime(self.module_dir, (0, 0))
+
+        index = common.DiscoveryIndex(index_file=self.index_file)
+        classes = self._collect("user", index)
+        self.assertEqual(sorted(cls.__name__ for cls in classes),
+                         ["NewSpoke", "OtherSpoke"])